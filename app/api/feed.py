@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, field_validator
 from typing import List, Literal, Optional
 from app.services.feed_service import FeedService
+from app.services import codec
+from app.services.feed_decoder import decode_entry
+from app.services.feed_recorder import FeedReplayer, list_recordings, resolve_recording
+from app.services.feed_writer import FeedStreamWriter
+from app.services.feed_worker import FeedWorkerProcess
+from app.services.stream_retention import StreamRetentionService
+from app.services.subscription_manager import SubscriptionManager
 
 router = APIRouter(prefix="/feed", tags=["Market Data Feed"])
 
@@ -16,6 +24,11 @@ class SubscribeRequest(BaseModel):
             return v.lower()
         return v
 
+class ReplayRequest(BaseModel):
+    """Recording name ("2025-12-05" or "feed-2025-12-05.rec.gz") + speed"""
+    file: str
+    speed: float = 1.0  # 1 = real-time, N = N× faster, 0 = max speed
+
 class UpdateSubscriptionsRequest(BaseModel):
     """Request model for update-subscriptions - mode is optional, defaults to 'full'"""
     instrument_keys: List[str]
@@ -33,6 +46,9 @@ async def connect_feed():
     try:
         result = await FeedService.connect()
         return result
+    except ValueError as e:
+        # Access token இல்லை - login பண்ண வேண்டும்
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -48,6 +64,8 @@ async def disconnect_feed():
 async def subscribe_feed(request: SubscribeRequest):
     try:
         result = await FeedService.subscribe(request.instrument_keys, request.mode)
+        # Manual subscribe - stream clients போனாலும் auto-unsubscribe ஆகாது
+        SubscriptionManager.pin(request.instrument_keys)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -82,8 +100,10 @@ async def update_subscriptions(request: UpdateSubscriptionsRequest):
     try:
         result = await FeedService.update_subscriptions(
             request.instrument_keys, 
-            request.mode
+            request.mode,
+            keep_keys=SubscriptionManager.held_keys()
         )
+        SubscriptionManager.pin(request.instrument_keys)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,9 +112,124 @@ async def update_subscriptions(request: UpdateSubscriptionsRequest):
 async def get_feed_status():
     try:
         is_connected = FeedService.is_connected()
-        return {"connected": is_connected}
+        connections = FeedService.get_connection_health()
+        downtime = round(sum(c.get("downtime_seconds", 0) for c in connections), 3)
+        if FeedWorkerProcess.is_active():
+            worker_status = FeedWorkerProcess.get_status()
+            return {
+                "connected": is_connected,
+                "mode": "process",
+                "downtime_seconds": downtime,
+                "connections": connections,
+                "writer": worker_status.get("writer", {})
+            }
+        return {
+            "connected": is_connected,
+            "mode": "in-process",
+            "downtime_seconds": downtime,
+            "connections": connections,
+            "writer": FeedStreamWriter.get_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/gaps")
+async def get_feed_gaps(
+    instruments: Optional[str] = Query(None, description="Comma-separated instrument keys")
+):
+    """Reconnect gap intervals per instrument (epoch ms)"""
+    try:
+        instrument_keys = instruments.split(",") if instruments else None
+        gaps = FeedService.get_gaps(instrument_keys)
+        return {"count": len(gaps), "gaps": gaps}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/record/start")
+async def start_recording():
+    """Inbound frames-ஐ FEED_RECORD_DIR-க்கு capture பண்ணும்"""
+    try:
+        return await FeedService.start_recording()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/record/stop")
+async def stop_recording():
+    try:
+        return await FeedService.stop_recording()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/record")
+async def get_recordings():
+    """Recorder status + available recordings"""
+    try:
+        return {
+            "recorder": FeedService.get_recording_stats(),
+            "recordings": await asyncio.to_thread(list_recordings)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/replay")
+async def start_replay(request: ReplayRequest):
+    """
+    Recording-ஐ market_feed-க்கு replay பண்ணும் (live ingest path)
+
+    Candles / VWAP / live SSE off-market-ல் drive ஆகும்.
+    """
+    try:
+        FeedReplayer.start(resolve_recording(request.file), request.speed)
+        return {"message": f"Replay started: {request.file}", "speed": request.speed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/replay/stop")
+async def stop_replay():
+    try:
+        await FeedReplayer.stop()
+        return FeedReplayer.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/replay")
+async def get_replay_status():
+    return FeedReplayer.get_stats()
+
+@router.get("/retention")
+async def get_retention_status():
+    """market_feed trim/archive counters"""
+    return StreamRetentionService.get_stats()
+
+@router.get("/archive")
+async def read_archive(
+    start: int = Query(..., description="Start time (epoch ms)"),
+    end: int = Query(..., description="End time (epoch ms)"),
+    instruments: Optional[str] = Query(None, description="Comma-separated instrument keys"),
+    limit: int = Query(1000, le=10000)
+):
+    """
+    Archived market_feed frames for a time range.
+
+    Redis-ல் இருந்து trim ஆன பழைய ticks disk archive-ல் இருந்து படிக்கப்படும்.
+    """
+    instrument_filter = set(instruments.split(",")) if instruments else None
+
+    def _read():
+        frames = []
+        archive = StreamRetentionService.get_archive()
+        for entry_id, fields in archive.read_range(start, end, limit):
+            frame = decode_entry(entry_id, fields)
+            if frame is None:
+                continue
+            payload = frame.to_json(instrument_filter)
+            if payload:
+                frames.append({"id": entry_id.decode(), "data": codec.loads(payload)})
+        return frames
+
+    try:
+        frames = await asyncio.to_thread(_read)
+        return {"count": len(frames), "frames": frames}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
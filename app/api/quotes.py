@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.services.quote_cache import QuoteCache
+
+router = APIRouter(prefix="/quotes", tags=["Quotes"])
+
+@router.get("")
+async def get_quotes(
+    instruments: Optional[str] = Query(
+        None,
+        description="Comma-separated instrument keys. Omit for every cached instrument. Example: NSE_FO|61755,NSE_FO|61756"
+    )
+):
+    """
+    Latest quote per instrument from the last-value cache (one call, many instruments)
+
+    Response:
+        quotes  → {instrument_key: feed} (/stream/live feed shape)
+        missing → keys with no tick yet
+    """
+    keys = [k for k in instruments.split(",") if k] if instruments else None
+    try:
+        frames = await QuoteCache.get_frames(keys)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    quotes = QuoteCache.snapshot_dict(frames)["feeds"]
+    return {
+        "count": len(quotes),
+        "quotes": quotes,
+        "missing": [k for k in keys if k not in quotes] if keys else [],
+    }
@@ -1,11 +1,22 @@
 import asyncio
-import json
+import time
 from typing import Optional, Set
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
-from app.db.redis import RedisClient
-from app.services.candle_aggregator import CandleAggregator, parse_raw_tick
-from app.services.candle_persistence import CandlePersistenceService
+from app.services import codec
+from app.services.candle_bus import CandleBus, CandleSubscription
+from app.services.candle_engine import CandleEngine
+from app.services.candle_rollup import BASE_TIMEFRAME, parse_timeframes
+from app.core.config import settings
+from app.services.tick_bus import SlowConsumerError, TickBus
+from app.services.tick_conflator import TickConflator
+from app.services.stream_resume import ResumableSubscription, event_id
+from app.services.depth_diff import DepthDeltaCursor, DepthDiffEngine, delta_payload, snapshot_fragment
+from app.services.quote_cache import QuoteCache
+from app.services.subscription_manager import SubscriptionManager
+from app.services.stream_clients import (
+    StreamCapacityError, StreamClient, StreamClientRegistry, slow_consumer_event
+)
 
 router = APIRouter(prefix="/stream", tags=["Live Stream"])
 
@@ -14,69 +25,197 @@ router = APIRouter(prefix="/stream", tags=["Live Stream"])
 # RAW TICKS SSE - Original market feed
 # ═══════════════════════════════════════════════════════════════════════════════
 
-async def event_generator(instrument_filter: Optional[Set[str]] = None):
+async def snapshot_event(
+    subscription: ResumableSubscription,
+    instrument_filter: Optional[Set[str]],
+    cursor: Optional[DepthDeltaCursor] = None
+) -> Optional[str]:
+    """
+    Fresh connect / resync → last-value cache snapshot (முதல் event, id இல்லை)
+
+    Resume (Last-Event-ID replay) ஆனால் தேவையில்லை - missed ticks வருகின்றன.
+    """
+    if subscription.resumed:
+        return None
+    frames = await QuoteCache.get_snapshot(instrument_filter)
+    payload = QuoteCache.snapshot_json(frames, snapshot_fragment(cursor) if cursor is not None else None)
+    return f"data: {payload}\n\n" if payload else None
+
+
+async def event_generator(
+    instrument_filter: Optional[Set[str]] = None,
+    last_event_id: Optional[str] = None,
+    depth_delta: bool = False,
+    client: Optional[StreamClient] = None
+):
     """
     Raw market feed SSE generator
     
     Args:
         instrument_filter: Optional set of instrument keys to include.
                           If None, all instruments are returned.
+        last_event_id: Reconnect-ல் browser அனுப்பும் Last-Event-ID -
+                       அதன் பிறகு வந்த ticks முதலில் replay ஆகும்
+        depth_delta: marketLevel-க்கு பதில் மாறிய price levels மட்டும்
+                     (app/services/depth_diff.py)
     """
-    redis = RedisClient.get_pool()
-    last_id = "$"
+    subscription = await ResumableSubscription.open(instrument_filter, last_event_id, client=client)
+    cursor = DepthDeltaCursor() if depth_delta else None
     
     try:
+        if subscription.resync:
+            yield f"event: resync\ndata: {codec.dumps(subscription.resync)}\n\n"
+        snapshot = await snapshot_event(subscription, instrument_filter, cursor)
+        if snapshot:
+            yield snapshot
+        
         while True:
             try:
-                streams = await redis.xread(
-                    streams={"market_feed": last_id},
-                    count=1,
-                    block=1000
-                )
+                frames = await subscription.get(timeout=1.0)
                 
-                if not streams:
+                if frames is None:
                     yield ": keep-alive\n\n"
-                    await asyncio.sleep(1)
                     continue
 
-                for stream_name, messages in streams:
-                    for message_id, fields in messages:
-                        last_id = message_id
-                        data = fields.get("data")
-                        if data:
-                            # If no filter, send all
-                            if not instrument_filter:
-                                yield f"data: {data}\n\n"
-                            else:
-                                # Parse and filter feeds
-                                try:
-                                    parsed = json.loads(data)
-                                    feeds = parsed.get("feeds", {})
-                                    filtered_feeds = {
-                                        k: v for k, v in feeds.items() 
-                                        if k in instrument_filter
-                                    }
-                                    if filtered_feeds:
-                                        parsed["feeds"] = filtered_feeds
-                                        yield f"data: {json.dumps(parsed)}\n\n"
-                                except json.JSONDecodeError:
-                                    yield f"data: {data}\n\n"
+                for frame in frames:
+                    if frame.gap:
+                        # Reconnect gap - client knows ticks were missed
+                        gap_keys = frame.gap_instruments(instrument_filter)
+                        if gap_keys:
+                            gap = dict(frame.gap, instruments=gap_keys)
+                            yield f"id: {event_id(frame)}\nevent: gap\ndata: {codec.dumps(gap)}\n\n"
+                        continue
+
+                    # JSON SSE edge-ல் மட்டும் (filtered feeds only)
+                    if cursor is not None:
+                        payload = delta_payload(frame, instrument_filter, cursor)
+                    else:
+                        payload = frame.to_json(instrument_filter)
+                    if payload:
+                        yield f"id: {event_id(frame)}\ndata: {payload}\n\n"
                             
             except asyncio.CancelledError:
                 raise
+            except SlowConsumerError as e:
+                yield slow_consumer_event(client, e)
+                return
             except Exception:
                 await asyncio.sleep(1)
                 
     except asyncio.CancelledError:
         raise
+    finally:
+        subscription.close()
+
+
+async def conflated_event_generator(
+    instrument_filter: Optional[Set[str]],
+    max_hz: float,
+    last_event_id: Optional[str] = None,
+    client: Optional[StreamClient] = None
+):
+    """
+    Conflated market feed SSE generator (?max_hz=)
+
+    Per instrument latest state மட்டும் வைத்து max_hz rate-ல் flush பண்ணும்.
+    Gap markers உடனே போகும்.
+    """
+    subscription = await ResumableSubscription.open(instrument_filter, last_event_id, client=client)
+    conflator = TickConflator(instrument_filter, max_hz)
+    interval = conflator.interval
+    next_flush = time.monotonic() + interval
+    last_sent = time.monotonic()
+    
+    try:
+        if subscription.resync:
+            yield f"event: resync\ndata: {codec.dumps(subscription.resync)}\n\n"
+        snapshot = await snapshot_event(subscription, instrument_filter)
+        if snapshot:
+            yield snapshot
+        
+        while True:
+            try:
+                frames = await subscription.get(timeout=max(0.001, next_flush - time.monotonic()))
+                
+                for frame in frames or ():
+                    if frame.gap:
+                        gap_keys = frame.gap_instruments(instrument_filter)
+                        if gap_keys:
+                            gap = dict(frame.gap, instruments=gap_keys)
+                            yield f"id: {event_id(frame)}\nevent: gap\ndata: {codec.dumps(gap)}\n\n"
+                            last_sent = time.monotonic()
+                        continue
+                    conflator.add(frame)
+                
+                now = time.monotonic()
+                if now < next_flush:
+                    continue
+                next_flush += interval
+                if next_flush < now:
+                    # Slow client - skip missed slots instead of bursting
+                    next_flush = now + interval
+                
+                # Latest contributing frame-ன் ID - resume அங்கிருந்து
+                frame_id = event_id(conflator.header_frame) if conflator.header_frame else None
+                payload = conflator.flush()
+                if payload:
+                    yield f"id: {frame_id}\ndata: {payload}\n\n"
+                    last_sent = now
+                elif now - last_sent >= 1.0:
+                    yield ": keep-alive\n\n"
+                    last_sent = now
+                            
+            except asyncio.CancelledError:
+                raise
+            except SlowConsumerError as e:
+                yield slow_consumer_event(client, e)
+                return
+            except Exception:
+                await asyncio.sleep(1)
+                
+    except asyncio.CancelledError:
+        raise
+    finally:
+        conflator.close()
+        subscription.close()
+
+
+def _register_client(kind: str, request: Request, instrument_filter: Optional[Set[str]] = None) -> StreamClient:
+    """Admission control - STREAM_MAX_CLIENTS நிரம்பினால் 503"""
+    try:
+        return StreamClientRegistry.register(kind, request.client.host if request.client else "", instrument_filter)
+    except StreamCapacityError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def _require_feed_stream(instrument_filter: Optional[Set[str]]):
+    """Filter இல்லாத tick stream market_feed-ஐ read பண்ணும் - combined off-ல் 400"""
+    if not instrument_filter and not settings.FEED_COMBINED_STREAM:
+        raise HTTPException(
+            status_code=400,
+            detail="instruments is required (FEED_COMBINED_STREAM=false, only per-instrument streams are written)"
+        )
 
 
 @router.get("/live")
 async def sse_stream(
+    request: Request,
     instruments: Optional[str] = Query(
         None, 
         description="Comma-separated instrument keys to filter. Example: NSE_FO|61755,NSE_FO|61756"
-    )
+    ),
+    max_hz: Optional[float] = Query(
+        None,
+        gt=0,
+        le=50,
+        description="Conflate to at most N events/sec (latest state per instrument). Example: 4"
+    ),
+    depth: str = Query(
+        "full",
+        pattern="^(full|delta)$",
+        description="full = bidAskQuote as received, delta = changed price levels with seq numbers"
+    ),
+    last_event_id: Optional[str] = Header(None)
 ):
     """
     Raw market feed SSE endpoint
@@ -92,33 +231,82 @@ async def sse_stream(
         
         # Options மட்டும்
         GET /api/v1/stream/live?instruments=NSE_FO|61755,NSE_FO|61756
+        
+        # UI - ஒரு second-க்கு 4 snapshots (latest per instrument)
+        GET /api/v1/stream/live?max_hz=4
+        
+        # 30-depth book - மாறிய levels மட்டும் (feed["depth"] = {seq, prev_seq, bids, asks})
+        GET /api/v1/stream/live?depth=delta
+    
+    Resume:
+        ஒவ்வொரு event-ன் `id:` = market_feed entry ID. EventSource reconnect-ல்
+        Last-Event-ID header தானாக வரும் → missed ticks முதலில் replay ஆகும்.
+        Cap தாண்டினால் `event: resync` (history reload பண்ணவும்).
     """
     instrument_filter: Optional[Set[str]] = None
     if instruments:
         instrument_filter = set(instruments.split(","))
     
+    if max_hz and depth == "delta":
+        # Conflation skips updates - delta seq chain ஒவ்வொரு flush-லும் உடையும்
+        raise HTTPException(status_code=400, detail="depth=delta cannot be combined with max_hz")
+    _require_feed_stream(instrument_filter)
+    
+    client = _register_client("live", request, instrument_filter)
+    if max_hz:
+        generator = conflated_event_generator(instrument_filter, max_hz, last_event_id, client=client)
+    else:
+        generator = event_generator(instrument_filter, last_event_id, depth_delta=depth == "delta", client=client)
+    
     return StreamingResponse(
-        event_generator(instrument_filter), 
+        StreamClientRegistry.track(client, generator), 
         media_type="text/event-stream"
     )
 
 
+@router.get("/depth")
+async def get_depth_books(
+    instruments: Optional[str] = Query(
+        None,
+        description="Comma-separated instrument keys (optional)"
+    )
+):
+    """
+    Current full books for ?depth=delta clients (HTTP resync)
+
+    Response: {instrument_key: {seq, prev_seq, snapshot, bids, asks}}
+    இந்த seq-க்கு பிறகு வரும் deltas-ஐ apply பண்ணலாம்.
+    """
+    instrument_filter = set(instruments.split(",")) if instruments else None
+    return DepthDiffEngine.get_books(instrument_filter)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 1-MINUTE CANDLE SSE - Aggregated candles
 # ═══════════════════════════════════════════════════════════════════════════════
 
-async def candle_event_generator(instrument_filter: Optional[Set[str]] = None):
+async def candle_event_generator(
+    instrument_filter: Optional[Set[str]] = None,
+    last_event_id: Optional[str] = None,
+    client: Optional[StreamClient] = None,
+    timeframe: str = BASE_TIMEFRAME,
+    partial: bool = False
+):
     """
-    1-Minute Candle SSE Generator
+    Candle SSE Generator
     
-    Reads ticks from Redis, aggregates into 1-minute candles,
-    and emits completed candles at minute boundaries.
+    CandleEngine publish பண்ணும் `candles` / `candles:{tf}` stream-ஐ read மட்டும்
+    பண்ணும் - aggregation / persistence client-க்கு இல்லை (app/services/candle_engine.py).
     
     Args:
         instrument_filter: Optional set of instrument keys to include.
                           If None, all instruments are processed.
                           Example: {"NSE_FO|61755", "NSE_FO|61756"}
+        last_event_id: Reconnect resume point (candles stream ID) - அதன் பிறகு
+                       publish ஆன candles முதலில் வரும்.
+        timeframe: "1m" (default) அல்லது CANDLE_TIMEFRAMES-ல் ஒன்று
+        partial: Forming candles-ம் `event: candle_partial` ஆக (id: இல்லை -
+                 resume completed candles-க்கு மட்டும்)
     
     Usage:
         # எல்லா instruments
@@ -127,87 +315,58 @@ async def candle_event_generator(instrument_filter: Optional[Set[str]] = None):
         # Specific instruments மட்டும்
         /api/v1/stream/candles?instruments=NSE_FO|61755,NSE_FO|61756
     """
-    redis = RedisClient.get_pool()
-    last_id = "$"
-    aggregator = CandleAggregator()
+    subscription = await CandleSubscription.open(
+        instrument_filter, last_event_id, client=client, timeframe=timeframe, partial=partial
+    )
     
     try:
+        if subscription.resync:
+            yield f"event: resync\ndata: {codec.dumps(subscription.resync)}\n\n"
+        
         while True:
             try:
-                streams = await redis.xread(
-                    streams={"market_feed": last_id},
-                    count=10,
-                    block=1000
-                )
+                events = await subscription.get(timeout=1.0)
                 
-                if not streams:
+                if events is None:
                     yield ": keep-alive\n\n"
                     continue
                 
-                for stream_name, messages in streams:
-                    for message_id, fields in messages:
-                        last_id = message_id
-                        raw_data = fields.get("data")
-                        
-                        if not raw_data:
-                            continue
-                        
-                        try:
-                            data = json.loads(raw_data)
-                            feeds = data.get("feeds", {})
-                            
-                            for instrument_key, feed_data in feeds.items():
-                                # 🔥 Filter: Skip if not in filter set
-                                if instrument_filter and instrument_key not in instrument_filter:
-                                    continue
-                                
-                                full_feed = feed_data.get("fullFeed", {})
-                                market_ff = full_feed.get("marketFF")
-                                
-                                if not market_ff:
-                                    continue
-                                
-                                tick = parse_raw_tick(instrument_key, market_ff)
-                                candle = aggregator.add_tick(instrument_key, tick)
-                                
-                                if candle:
-                                    # Persist to DB (Full JSON)
-                                    await CandlePersistenceService.save_candle(candle)
-                                    
-                                    candle_json = candle.model_dump_json()
-                                    yield f"event: candle\ndata: {candle_json}\n\n"
-                        
-                        except json.JSONDecodeError:
-                            continue
-                        except Exception:
-                            continue
+                for event in events:
+                    candle_json = codec.encode_model(event.candle)
+                    if event.partial:
+                        yield f"event: candle_partial\ndata: {candle_json}\n\n"
+                    else:
+                        yield f"id: {event.entry_id}\nevent: candle\ndata: {candle_json}\n\n"
                 
             except asyncio.CancelledError:
-                for candle in aggregator.flush_all():
-                    # Persist flushed candles too
-                    await CandlePersistenceService.save_candle(candle)
-                    
-                    candle_json = candle.model_dump_json()
-                    yield f"event: candle\ndata: {candle_json}\n\n"
                 raise
+            except SlowConsumerError as e:
+                yield slow_consumer_event(client, e)
+                return
             except Exception:
                 await asyncio.sleep(1)
                 
     except asyncio.CancelledError:
         raise
+    finally:
+        subscription.close()
 
 
 @router.get("/candles")
 async def sse_candle_stream(
+    request: Request,
     instruments: Optional[str] = Query(
         None, 
         description="Comma-separated instrument keys to filter. Example: NSE_FO|61755,NSE_FO|61756"
-    )
+    ),
+    tf: str = Query(BASE_TIMEFRAME, description="Timeframe: 1m or one of CANDLE_TIMEFRAMES (3m, 5m, 15m, 30m, 1h)"),
+    partial: bool = Query(True, description="Also stream the forming candle as `event: candle_partial` (throttled)"),
+    last_event_id: Optional[str] = Header(None)
 ):
     """
-    1-Minute Candle SSE Endpoint
+    Candle SSE Endpoint (1m + rollup timeframes)
     
-    Streams completed 1-minute candles with metrics:
+    Streams completed candles with metrics:
     - Price OHLC + diff
     - Bid/Ask walls (qty > 2000)
     - Spread, Greeks, ATP, VTT, OI, IV, TBQ, TSQ + diffs
@@ -216,6 +375,10 @@ async def sse_candle_stream(
         instruments: Comma-separated instrument keys (optional)
             - If provided: Only streams candles for specified instruments
             - If omitted: Streams candles for ALL instruments
+        tf: Timeframe (default 1m). Higher timeframes 1m candles-ல் இருந்து rollup;
+            candle-ன் `timeframe` field-லும் இருக்கும்
+        partial: Forming candle `event: candle_partial` ஆக, CANDLE_PARTIAL_INTERVAL_MS-க்கு
+            ஒரு முறை (default true; `candle` listener மட்டும் உள்ள clients பாதிக்காது)
     
     Examples:
         # எல்லா instruments
@@ -226,14 +389,27 @@ async def sse_candle_stream(
         
         # ஒரே ஒரு instrument
         GET /api/v1/stream/candles?instruments=NSE_FO|61755
+        
+        # 5-minute candles
+        GET /api/v1/stream/candles?tf=5m&instruments=NSE_FO|61755
     """
+    if tf != BASE_TIMEFRAME and tf not in parse_timeframes(settings.CANDLE_TIMEFRAMES):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown timeframe '{tf}'. Available: {[BASE_TIMEFRAME] + parse_timeframes(settings.CANDLE_TIMEFRAMES)}"
+        )
+    
     # Parse comma-separated instruments into a set
     instrument_filter: Optional[Set[str]] = None
     if instruments:
         instrument_filter = set(instruments.split(","))
     
+    client = _register_client("candles", request, instrument_filter)
     return StreamingResponse(
-        candle_event_generator(instrument_filter), 
+        StreamClientRegistry.track(
+            client,
+            candle_event_generator(instrument_filter, last_event_id, client=client, timeframe=tf, partial=partial)
+        ),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -258,16 +434,16 @@ async def order_update_generator():
     
     try:
         async for update in OrderUpdateService.stream_updates():
-            yield f"event: order\ndata: {json.dumps(update)}\n\n"
+            yield f"event: order\ndata: {codec.dumps(update)}\n\n"
     except asyncio.CancelledError:
         await OrderUpdateService.stop()
         raise
     except Exception as e:
-        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        yield f"event: error\ndata: {codec.dumps({'error': str(e)})}\n\n"
 
 
 @router.get("/orders")
-async def sse_order_stream():
+async def sse_order_stream(request: Request):
     """
     Order Update SSE Endpoint
     
@@ -286,8 +462,9 @@ async def sse_order_stream():
         GTT order execute ஆனவுடன் இங்கே notification வரும்.
         Order status: PENDING → OPEN → COMPLETE / REJECTED
     """
+    client = _register_client("orders", request)
     return StreamingResponse(
-        order_update_generator(),
+        StreamClientRegistry.track(client, order_update_generator()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -301,27 +478,33 @@ async def sse_order_stream():
 # VWAP STREAM SSE - Real-time VWAP Calculation
 # ═══════════════════════════════════════════════════════════════════════════════
 
-async def vwap_generator(instrument_filter: Optional[Set[str]] = None):
+async def vwap_generator(
+    instrument_filter: Optional[Set[str]] = None,
+    last_event_id: Optional[str] = None,
+    client: Optional[StreamClient] = None
+):
     """
     VWAP SSE Generator
     """
     from app.services.vwap_service import VwapService
     
     try:
-        async for data in VwapService.stream_vwap(instrument_filter):
+        async for data in VwapService.stream_vwap(instrument_filter, last_event_id, client=client):
             yield data
     except asyncio.CancelledError:
         raise
     except Exception as e:
-        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        yield f"event: error\ndata: {codec.dumps({'error': str(e)})}\n\n"
 
 
 @router.get("/vwap")
 async def sse_vwap_stream(
+    request: Request,
     instruments: Optional[str] = Query(
         None, 
         description="Comma-separated instrument keys to filter (optional)"
-    )
+    ),
+    last_event_id: Optional[str] = Header(None)
 ):
     """
     Real-time VWAP Stream
@@ -334,9 +517,11 @@ async def sse_vwap_stream(
     instrument_filter: Optional[Set[str]] = None
     if instruments:
         instrument_filter = set(instruments.split(","))
+    _require_feed_stream(instrument_filter)
         
+    client = _register_client("vwap", request, instrument_filter)
     return StreamingResponse(
-        vwap_generator(instrument_filter),
+        StreamClientRegistry.track(client, vwap_generator(instrument_filter, last_event_id, client=client)),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -344,3 +529,36 @@ async def sse_vwap_stream(
             "X-Accel-Buffering": "no"
         }
     )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STREAM STATS - Tick bus fan-out counters
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@router.get("/stats")
+async def stream_stats():
+    """Tick bus fan-out, conflated (?max_hz=) clients, depth delta savings"""
+    return {
+        "clients": StreamClientRegistry.get_stats(),
+        "tick_bus": TickBus.get_stats(),
+        "quote_cache": QuoteCache.get_stats(),
+        "upstream_interest": SubscriptionManager.get_stats(),
+        "candle_engine": CandleEngine.get_stats(),
+        "candle_bus": CandleBus.get_stats(),
+        "conflation": TickConflator.get_all_stats(),
+        "depth": DepthDiffEngine.get_stats(),
+    }
+
+
+@router.get("/clients")
+async def stream_clients():
+    """
+    Connected stream clients - slow consumers கண்டுபிடிக்க
+
+    ஒவ்வொரு client-க்கும்: kind, remote, events/bytes sent, lag_ms
+    (stream append → client pull), queue_depth, dropped, stalled_seconds.
+    """
+    return {
+        "summary": StreamClientRegistry.get_stats(),
+        "clients": StreamClientRegistry.get_clients(),
+    }
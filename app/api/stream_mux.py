@@ -0,0 +1,399 @@
+"""
+Multiplexed Stream - One WebSocket for Ticks, Candles, VWAP, Orders
+====================================================================
+
+Dashboard-ல் liveFeed / candles / vwap / orders ஒவ்வொன்றும் தனி EventSource
+திறந்தால் HTTP/1.1 6-connection limit அடிக்கும். இந்த endpoint ஒரே socket-ல்
+எல்லா channels-ம் carry பண்ணும்; instruments / channels runtime-ல்
+reconnect இல்லாமல் மாற்றலாம்.
+
+Endpoint:
+    WS /api/v1/stream/ws
+    WS /api/v1/stream/ws?format=msgpack      (binary - app/services/stream_encoding.py)
+    WS /api/v1/stream/ws?format=protobuf     (binary StreamMessage)
+
+    Sec-WebSocket-Protocol: msgpack / protobuf / json-ம் negotiate ஆகும்.
+    Binary formats-லும் client ops JSON text தான்.
+
+Client → Server:
+    {"op": "subscribe",   "channels": ["tick", "candle"], "instruments": ["NSE_FO|61755"]}
+    {"op": "unsubscribe", "channels": ["candle"], "instruments": ["NSE_FO|61755"]}
+    {"op": "ping"}
+
+    முதல் subscribe-ல் instruments இல்லை → எல்லா instruments (wildcard, SSE no-filter மாதிரி)
+    instruments கொடுத்தால் filtered; unsubscribe-ல் கடைசி instrument போனால்
+    market data நின்றுவிடும் (wildcard ஆகாது).
+    channels / instruments → list of strings; தவறான message → error channel
+
+Server → Client (json format; msgpack அதே envelope):
+    {"ch": "tick",   "data": {...}}     # /stream/live payload
+                                        # subscribe-ல் முதலில் type "initial_feed" (last-value cache)
+    {"ch": "candle", "data": {...}}     # Candle1M
+    {"ch": "candle_partial", "data": {...}}  # Forming Candle1M (CANDLE_PARTIAL_INTERVAL_MS throttle)
+    {"ch": "vwap",   "data": {...}}
+    {"ch": "order",  "data": {...}}
+    {"ch": "gap",    "data": {"start", "end", "instruments"}}
+    {"ch": "ack",    "data": {"channels": [...], "instruments": [...], "wildcard": bool}}
+    {"ch": "error",  "data": {"error": "..."}}
+
+Slow consumer (STREAM_SLOW_CLIENT_POLICY=disconnect) → error
+{"error": "slow_consumer"} அனுப்பி close 1008. Client cap நிரம்பினால் close 1013.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.services import codec
+from app.services.candle_bus import CandleBus
+from app.services.feed_decoder import FeedFrame
+from app.services.stream_clients import StreamCapacityError, StreamClient, StreamClientRegistry
+from app.services.quote_cache import QuoteCache
+from app.services.stream_encoding import Payload, negotiate_format
+from app.services.stream_resume import parse_stream_id
+from app.services.tick_bus import SlowConsumerError, TickBus, TickSubscription
+from app.services.vwap_service import VwapService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/stream", tags=["Live Stream"])
+
+MARKET_CHANNELS = {"tick", "candle", "candle_partial", "vwap"}
+# TickBus frames தேவைப்படும் channels - candle `candles` stream-ல் இருந்து (CandleBus)
+TICK_CHANNELS = {"tick", "vwap"}
+CANDLE_CHANNELS = {"candle", "candle_partial"}
+CHANNELS = MARKET_CHANNELS | {"order"}
+# Subscribe-ல் last-value cache snapshot அனுப்பும் channels
+SNAPSHOT_CHANNELS = {"tick", "vwap"}
+
+
+def _string_list(message: Dict[str, Any], field: str) -> Optional[Set[str]]:
+    """Optional list-of-strings field → set (தவறான type → None)"""
+    value = message.get(field, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        return None
+    return set(value)
+
+
+class MuxSession:
+    """
+    One /stream/ws connection
+
+    tick / vwap ஒரே TickBus subscription share பண்ணும்; candle தனி CandleBus
+    subscription. Filter மாறும்போது subscriptions re-index ஆகும் (queue அப்படியே).
+    """
+
+    def __init__(self, websocket: WebSocket, encoder: Any, client: Optional[StreamClient] = None):
+        self.websocket = websocket
+        self.encoder = encoder
+        self.client = client
+        self.channels: Set[str] = set()
+        self.instruments: Set[str] = set()
+        # எல்லா instruments - "filtered to an empty set"-ல் இருந்து வேறு
+        self.wildcard = False
+        self.subscription: Optional[TickSubscription] = None
+        self.candle_subscription: Optional[TickSubscription] = None
+        self.candle_task: Optional[asyncio.Task] = None
+        self.candle_partial = False
+        self.vwap_state: Dict[str, Dict] = {}
+        self.order_task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    @property
+    def instrument_filter(self) -> Optional[Set[str]]:
+        """None = wildcard; filtered session-க்கு அதன் keys (empty ஆக இருக்கலாம்)"""
+        return None if self.wildcard else set(self.instruments)
+
+    @property
+    def has_instruments(self) -> bool:
+        return self.wildcard or bool(self.instruments)
+
+    async def send_payload(self, payload: Payload):
+        async with self._send_lock:
+            if self.client is not None:
+                self.client.on_sending()
+            if isinstance(payload, bytes):
+                await self.websocket.send_bytes(payload)
+            else:
+                await self.websocket.send_text(payload)
+            if self.client is not None:
+                self.client.on_sent(len(payload))
+
+    async def send(self, channel: str, data: Any):
+        await self.send_payload(self.encoder.message(channel, data))
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CONTROL
+    # ═══════════════════════════════════════════════════════════════════════
+
+    async def handle(self, message: Any):
+        if not isinstance(message, dict):
+            await self.send("error", {"error": "Message must be a JSON object"})
+            return
+        op = message.get("op")
+        channels = _string_list(message, "channels")
+        instruments = _string_list(message, "instruments")
+        if channels is None or instruments is None:
+            await self.send("error", {"error": "channels and instruments must be lists of strings"})
+            return
+
+        unknown = channels - CHANNELS
+        if unknown:
+            await self.send("error", {"error": f"Unknown channels: {sorted(unknown)}"})
+            return
+
+        if op == "ping":
+            await self.send("pong", {})
+            return
+        if op == "subscribe":
+            wildcard = not instruments and not self.instruments
+            if wildcard and (channels | self.channels) & TICK_CHANNELS and not settings.FEED_COMBINED_STREAM:
+                await self.send("error", {"error": "instruments is required (FEED_COMBINED_STREAM=false)"})
+                return
+            snapshot_channels = channels & SNAPSHOT_CHANNELS
+            # Wildcard → filtered மாறினால் பழைய state எல்லா instruments-க்கும் இருக்காது
+            snapshot_keys = instruments - self.instruments
+            if snapshot_keys:
+                snapshot_channels |= self.channels & SNAPSHOT_CHANNELS
+            self.channels |= channels
+            self.instruments |= instruments
+            self.wildcard = wildcard
+        elif op == "unsubscribe":
+            self.channels -= channels
+            self.instruments -= instruments
+            # State for removed instruments is no longer needed
+            for key in instruments:
+                self.vwap_state.pop(key, None)
+        else:
+            await self.send("error", {"error": f"Unknown op: {op}"})
+            return
+
+        if op == "subscribe" and snapshot_channels and self.has_instruments:
+            # Bus filter-ல் சேர்க்கும் முன் - snapshot எப்போதும் live frames-க்கு முன்
+            await self._send_snapshot(snapshot_channels, snapshot_keys or self.instrument_filter)
+        self._sync_bus()
+        self._sync_candles()
+        self._sync_orders()
+        await self.send("ack", {
+            "channels": sorted(self.channels),
+            "instruments": sorted(self.instruments),
+            "wildcard": self.wildcard,
+        })
+
+    async def _send_snapshot(self, channels: Set[str], instrument_filter: Optional[Set[str]]):
+        """Last-value cache → tick (initial_feed) / vwap"""
+        frames = await QuoteCache.get_snapshot(instrument_filter)
+        if not frames:
+            return
+        if "tick" in channels:
+            await self.send("tick", QuoteCache.snapshot_dict(frames))
+        if "vwap" in channels:
+            for frame in frames.values():
+                for vwap_data in VwapService.vwap_updates(self.vwap_state, frame, instrument_filter):
+                    await self.send("vwap", vwap_data)
+
+    def _sync_bus(self):
+        wants_market = bool(self.channels & TICK_CHANNELS) and self.has_instruments
+        if not wants_market:
+            if self.subscription is not None:
+                TickBus.unsubscribe(self.subscription)
+                self.subscription = None
+                if self.client is not None:
+                    self.client.subscription = None
+            return
+
+        if self.subscription is None:
+            self.subscription = TickBus.subscribe(self.instrument_filter)
+            if self.client is not None:
+                self.client.subscription = self.subscription
+        elif self.subscription.instrument_filter != self.instrument_filter:
+            TickBus.update_filter(self.subscription, self.instrument_filter)
+
+    def _stop_candles(self):
+        if self.candle_task is not None:
+            self.candle_task.cancel()
+            self.candle_task = None
+        if self.candle_subscription is not None:
+            CandleBus.unsubscribe(self.candle_subscription)
+            self.candle_subscription = None
+
+    def _sync_candles(self):
+        wanted = self.channels & CANDLE_CHANNELS if self.has_instruments else set()
+        partial = "candle_partial" in wanted
+        if self.candle_subscription is not None and (not wanted or partial != self.candle_partial):
+            # Partial streams சேர்க்க / நீக்க புது subscription
+            self._stop_candles()
+        if not wanted:
+            return
+
+        if self.candle_subscription is None:
+            self.candle_partial = partial
+            self.candle_subscription = CandleBus.subscribe(self.instrument_filter, partial=partial)
+            self.candle_task = asyncio.create_task(self._pump_candles())
+        elif self.candle_subscription.instrument_filter != self.instrument_filter:
+            CandleBus.update_filter(self.candle_subscription, self.instrument_filter)
+
+    def _sync_orders(self):
+        if "order" in self.channels and self.order_task is None:
+            self.order_task = asyncio.create_task(self._pump_orders())
+        elif "order" not in self.channels and self.order_task is not None:
+            self.order_task.cancel()
+            self.order_task = None
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # PUMPS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    async def _process_frame(self, frame: FeedFrame):
+        instrument_filter = self.instrument_filter
+
+        if frame.gap:
+            gap_keys = frame.gap_instruments(instrument_filter)
+            if gap_keys:
+                await self.send("gap", dict(frame.gap, instruments=gap_keys))
+
+        if "tick" in self.channels and not frame.gap:
+            # Encoded once per frame (per filter) - shared across sessions
+            payload = self.encoder.tick(frame, instrument_filter)
+            if payload:
+                await self.send_payload(payload)
+
+        if "vwap" in self.channels:
+            for vwap_data in VwapService.vwap_updates(self.vwap_state, frame, instrument_filter):
+                await self.send("vwap", vwap_data)
+
+    async def pump_market(self):
+        while True:
+            subscription = self.subscription
+            if subscription is None:
+                await asyncio.sleep(0.2)
+                continue
+
+            try:
+                frames = await subscription.get(timeout=1.0)
+            except SlowConsumerError as e:
+                await self._close_slow_consumer(e)
+                return
+            if frames is None:
+                continue
+            entry_id = parse_stream_id(frames[-1].entry_id)
+            if self.client is not None and entry_id is not None:
+                self.client.on_frames(entry_id[0])
+            for frame in frames:
+                try:
+                    await self._process_frame(frame)
+                except (WebSocketDisconnect, RuntimeError):
+                    raise
+                except Exception as e:
+                    logger.error(f"Mux frame processing failed: {e}")
+
+    async def _pump_candles(self):
+        subscription = self.candle_subscription
+        try:
+            while True:
+                try:
+                    events = await subscription.get(timeout=1.0)
+                except SlowConsumerError as e:
+                    await self._close_slow_consumer(e)
+                    return
+                for event in events or []:
+                    if event.partial:
+                        await self.send_payload(self.encoder.candle(event.candle, partial=True))
+                    elif "candle" in self.channels:
+                        await self.send_payload(self.encoder.candle(event.candle))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Mux candle pump failed: {e}")
+
+    async def _close_slow_consumer(self, error: SlowConsumerError):
+        if self.client is not None:
+            self.client.disconnect_reason = "slow_consumer"
+        logger.warning(f"Disconnecting slow /stream/ws client: {error}")
+        await self.send("error", {"error": "slow_consumer", "detail": str(error)})
+        await self.websocket.close(code=1008)
+
+    async def _pump_orders(self):
+        from app.services.order_update_service import OrderUpdateService
+
+        updates = OrderUpdateService.stream_updates()
+        try:
+            async for update in updates:
+                await self.send("order", update)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self.send("error", {"error": str(e)})
+        finally:
+            await updates.aclose()
+
+    async def close(self):
+        if self.subscription is not None:
+            TickBus.unsubscribe(self.subscription)
+            self.subscription = None
+        self._stop_candles()
+        if self.order_task is not None:
+            self.order_task.cancel()
+            self.order_task = None
+
+
+@router.websocket("/ws")
+async def stream_mux(
+    websocket: WebSocket,
+    format: Optional[str] = Query(None, description="json | msgpack | protobuf")
+):
+    """
+    Multiplexed stream - ticks / candles / VWAP / orders on one socket
+
+    Example:
+        ws = new WebSocket("ws://localhost:8000/api/v1/stream/ws")
+        ws.send(JSON.stringify({op: "subscribe", channels: ["tick", "vwap"], instruments: ["NSE_FO|61755"]}))
+
+        # Binary (Python strategy client)
+        ws = new WebSocket("ws://localhost:8000/api/v1/stream/ws", ["msgpack"])
+    """
+    try:
+        encoder, subprotocol = negotiate_format(format, websocket.scope.get("subprotocols", []))
+    except ValueError as e:
+        await websocket.accept()
+        await websocket.send_text(codec.dumps({"ch": "error", "data": {"error": str(e)}}))
+        await websocket.close(code=1003)
+        return
+
+    await websocket.accept(subprotocol=subprotocol)
+    try:
+        client = StreamClientRegistry.register(
+            "ws", websocket.client.host if websocket.client else ""
+        )
+    except StreamCapacityError as e:
+        await websocket.send_text(codec.dumps({"ch": "error", "data": {"error": str(e)}}))
+        await websocket.close(code=1013)
+        return
+
+    # Idle reaper இந்த task-ஐ cancel பண்ணும் (send stalled)
+    client.task = asyncio.current_task()
+    session = MuxSession(websocket, encoder, client)
+    market_task = asyncio.create_task(session.pump_market())
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = codec.loads(raw)
+            except ValueError:
+                await session.send("error", {"error": "Invalid JSON"})
+                continue
+            await session.handle(message)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Stream mux error: {e}")
+    finally:
+        market_task.cancel()
+        await session.close()
+        StreamClientRegistry.unregister(client)
@@ -10,6 +10,8 @@ class Settings(BaseSettings):
     UPSTOX_API_SECRET: str = ""
     UPSTOX_REDIRECT_URI: str = ""
     UPSTOX_ACCESS_TOKEN: str = ""
+    # Point at app/mock/upstox_feed.py for local load tests
+    UPSTOX_FEED_AUTHORIZE_URL: str = "https://api.upstox.com/v3/feed/market-data-feed/authorize"
     
     # Sandbox Mode - Real money இல்லாம testing
     UPSTOX_SANDBOX_MODE: bool = False
@@ -17,7 +19,68 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str
-    
+
+    # Market Feed Stream
+    # "json" = MessageToDict + json.dumps (legacy), "protobuf" = raw FeedResponse bytes
+    FEED_STREAM_FORMAT: str = "json"
+    # market_feed (all instruments) - unfiltered stream clients need this
+    FEED_COMBINED_STREAM: bool = True
+    # market_feed:{instrument_key} - filtered clients XREAD only their keys
+    FEED_SHARDED_STREAMS: bool = False
+
+    # Stream Retention - Redis memory flat-ஆ இருக்க
+    FEED_STREAM_MAXLEN: int = 200_000  # XADD MAXLEN ~ (combined stream), 0 = unbounded
+    FEED_SHARD_MAXLEN: int = 5_000  # XADD MAXLEN ~ per instrument shard
+    FEED_STREAM_RETENTION_SECONDS: int = 0  # XTRIM MINID ~ now - N, 0 = disabled
+    FEED_ARCHIVE_ENABLED: bool = False  # Trimmed ranges → gzip segments on disk
+    FEED_ARCHIVE_DIR: str = "data/archive"
+    FEED_ARCHIVE_INTERVAL_SECONDS: int = 30
+    FEED_ARCHIVE_SEGMENT_MB: int = 256
+
+    # Ingest Writer - WebSocket recv → bounded queue → pipelined XADD batches
+    FEED_WRITER_QUEUE_SIZE: int = 10_000  # Full ஆனா oldest message drop
+    FEED_WRITER_BATCH_SIZE: int = 200
+    FEED_WRITER_FLUSH_MS: int = 5
+    # WebSocket recv + decode + XADD in a separate worker process (opt-in)
+    FEED_INGEST_PROCESS: bool = False
+    # Connection pool - instrument keys shard ஆகும்
+    FEED_CONNECTIONS: int = 1
+    FEED_MAX_KEYS_PER_CONNECTION: int = 0  # Broker per-connection cap, 0 = unlimited
+    # Reconnect backoff - jittered exponential, base doubles per attempt up to max
+    FEED_RECONNECT_BASE_MS: int = 500
+    FEED_RECONNECT_MAX_MS: int = 30_000
+    # Raw frame capture for offline replay (python main.py replay ...)
+    FEED_RECORD_ENABLED: bool = False
+    FEED_RECORD_DIR: str = "data/recordings"
+    # Tick bus - one market_feed reader per process, per-client frame queues
+    TICK_BUS_QUEUE_SIZE: int = 1_000
+    TICK_BUS_READ_COUNT: int = 500
+    # SSE Last-Event-ID resume - beyond either cap the client gets `event: resync`
+    STREAM_RESUME_MAX_AGE_SECONDS: int = 300
+    STREAM_RESUME_MAX_ENTRIES: int = 20_000
+    # /stream/live?depth=delta - full book snapshot every N updates per instrument
+    DEPTH_SNAPSHOT_EVERY: int = 100
+    # Stream clients' instrument filters drive upstream subscriptions (ref-counted)
+    FEED_AUTO_SUBSCRIBE: bool = True
+    FEED_AUTO_SUBSCRIBE_MODE: str = "full"
+    FEED_UNSUBSCRIBE_GRACE_SECONDS: int = 30  # Last client gone → unsubscribe after N seconds
+    # Serialization backend for SSE / JSON stream entries / JSONB (app/services/codec.py)
+    CODEC: str = "auto"  # auto = orjson if installed, else json
+    # Last-value cache (market_quotes hash) - GET /quotes + stream connect snapshot
+    QUOTE_CACHE_ENABLED: bool = True
+    # Stream admission / slow consumers (SSE + /stream/ws)
+    STREAM_MAX_CLIENTS: int = 200  # 0 = unlimited, full → 503
+    STREAM_SLOW_CLIENT_POLICY: str = "drop"  # drop = oldest frames dropped, disconnect = close on overflow
+    STREAM_IDLE_TIMEOUT_SECONDS: int = 60  # One send blocked for N seconds (dead TCP) → client disconnected
+    # Candle engine - one leader (Redis lock) aggregates market_feed → `candles` stream + candles_json
+    CANDLE_ENGINE_ENABLED: bool = True  # false → this process only reads the candles stream
+    CANDLE_STREAM_MAXLEN: int = 100_000  # XADD MAXLEN ~ on `candles` and each `candles:{tf}`
+    CANDLE_TIMEFRAMES: str = "3m,5m,15m,30m,1h"  # Rolled up from 1m, session-aligned (09:15 IST)
+    CANDLE_CLOSE_GRACE_MS: int = 2000  # Minute closes for every instrument at boundary + grace (late ticks)
+    CANDLE_GAP_FILL: bool = True  # Flat zero-volume candle for session minutes with no trades
+    CANDLE_PARTIAL_INTERVAL_MS: int = 500  # Forming-candle (candle_partial) publish throttle, 0 = off
+    CANDLE_PARTIAL_STREAM_MAXLEN: int = 10_000  # XADD MAXLEN ~ on candles:partial[:{tf}] (live only, no resume)
+
     # PostgreSQL
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
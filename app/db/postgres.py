@@ -58,6 +58,13 @@ class PostgresClient:
                 
                 CREATE INDEX IF NOT EXISTS idx_candles_json_key_ts ON candles_json(instrument_key, timestamp);
             """)
+            
+            # Rollup timeframes (1m candles-ல் இருந்து) - existing rows 1m
+            await conn.execute("""
+                ALTER TABLE candles_json ADD COLUMN IF NOT EXISTS timeframe VARCHAR(8) NOT NULL DEFAULT '1m';
+                
+                CREATE INDEX IF NOT EXISTS idx_candles_json_key_tf_ts ON candles_json(instrument_key, timeframe, timestamp);
+            """)
 
 async def get_postgres() -> asyncpg.Pool:
     return PostgresClient.get_pool()
@@ -3,6 +3,7 @@ from app.core.config import settings
 
 class RedisClient:
     _pool: redis.Redis | None = None
+    _binary_pool: redis.Redis | None = None
 
     @classmethod
     def get_pool(cls) -> redis.Redis:
@@ -14,11 +15,24 @@ class RedisClient:
             )
         return cls._pool
 
+    @classmethod
+    def get_binary_pool(cls) -> redis.Redis:
+        """Raw bytes client - market_feed protobuf frames utf-8 decode ஆகாது"""
+        if cls._binary_pool is None:
+            cls._binary_pool = redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=False
+            )
+        return cls._binary_pool
+
     @classmethod
     async def close_pool(cls):
         if cls._pool:
             await cls._pool.close()
             cls._pool = None
+        if cls._binary_pool:
+            await cls._binary_pool.close()
+            cls._binary_pool = None
 
 async def get_redis() -> redis.Redis:
     return RedisClient.get_pool()
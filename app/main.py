@@ -12,6 +12,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.db.redis import RedisClient
 from app.db.postgres import PostgresClient
+from app.services.stream_retention import StreamRetentionService
+from app.services.feed_worker import FeedWorkerProcess
+from app.services.feed_recorder import FeedReplayer
+from app.services.candle_engine import CandleEngine
+from app.services.feed_stream import check_feed_streams
 
 # Configure logging
 logging.basicConfig(
@@ -24,7 +29,9 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown"""
-    # Startup
+    # Startup - stream flags வேலை செய்யாத combination-ல் இங்கேயே fail
+    check_feed_streams()
+    
     try:
         await RedisClient.get_pool().ping()
         logger.info("Redis connected")
@@ -37,10 +44,23 @@ async def lifespan(app: FastAPI):
         logger.info("PostgreSQL connected")
     except Exception as e:
         logger.error(f"Postgres connection failed: {e}")
+    
+    # market_feed trim + archive (FEED_ARCHIVE_ENABLED / FEED_STREAM_RETENTION_SECONDS)
+    StreamRetentionService.start()
+    
+    # Feed ingest in a separate process (FEED_INGEST_PROCESS)
+    FeedWorkerProcess.start()
+    
+    # One candle aggregator across workers (Redis leader lock) → candles stream + candles_json
+    CandleEngine.start()
         
     yield
     
     # Shutdown
+    await CandleEngine.stop()
+    await FeedReplayer.stop()
+    await FeedWorkerProcess.stop()
+    await StreamRetentionService.stop()
     await RedisClient.close_pool()
     await PostgresClient.close_pool()
 
@@ -61,20 +81,24 @@ app.add_middleware(
 from app.api.auth import router as auth_router
 from app.api.feed import router as feed_router
 from app.api.stream import router as stream_router
+from app.api.stream_mux import router as stream_mux_router
 from app.api.instrument import router as instrument_router
 from app.api.gtt import router as gtt_router
 from app.api.portfolio import router as portfolio_router
 from app.api.order import router as order_router
 from app.api.history import router as history_router
+from app.api.quotes import router as quotes_router
 
 app.include_router(auth_router, prefix=settings.API_V1_STR)
 app.include_router(feed_router, prefix=settings.API_V1_STR)
 app.include_router(stream_router, prefix=settings.API_V1_STR)
+app.include_router(stream_mux_router, prefix=settings.API_V1_STR)
 app.include_router(instrument_router, prefix=settings.API_V1_STR)
 app.include_router(gtt_router, prefix=settings.API_V1_STR)
 app.include_router(portfolio_router, prefix=settings.API_V1_STR)
 app.include_router(order_router, prefix=settings.API_V1_STR)
 app.include_router(history_router, prefix=settings.API_V1_STR)
+app.include_router(quotes_router, prefix=settings.API_V1_STR)
 
 
 @app.get("/callback")
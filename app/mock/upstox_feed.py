@@ -0,0 +1,275 @@
+"""
+Mock Upstox V3 Market Data Feed - Local Load Testing
+=====================================================
+
+Network இல்லாமல் முழு pipeline-ஐ (ingest → Redis → candles/VWAP → SSE)
+stress பண்ண Upstox V3 feed-க்கு local stand-in.
+
+Endpoints:
+    GET /v3/feed/market-data-feed/authorize  → authorized_redirect_uri (ws://)
+    WS  /v3/feed/market-data-feed            → sub / unsub / change_mode JSON
+    GET /mock/instruments                    → synthetic instrument universe
+    GET /mock/stats                          → frames / ticks sent
+
+Emission:
+    ஒவ்வொரு socket-ம் rate frames/sec அனுப்பும்; ஒவ்வொரு frame-லும்
+    subscribed keys-ல் இருந்து batch instruments (round-robin).
+    Ticks/sec per socket = rate × batch
+
+    full     → marketFF, 5 depth levels (depth override பண்ணலாம்)
+    full_d30 → marketFF, 30 depth levels
+    ltpc     → ltpc only
+    NSE_INDEX|* → indexFF
+
+Run:
+    python main.py mock-feed --rate 100 --batch 200 --instruments 2000 --depth 30
+
+    # Backend .env
+    UPSTOX_FEED_AUTHORIZE_URL=http://localhost:9000/v3/feed/market-data-feed/authorize
+    UPSTOX_ACCESS_TOKEN=mock
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+
+from app.proto import MarketDataFeedV3_pb2 as pb
+
+logger = logging.getLogger(__name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIG - main.py mock-feed arguments
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class MockFeedConfig:
+    rate: float = 10.0        # Frames per second per socket
+    batch: int = 100          # Instruments per frame
+    instruments: int = 500    # Size of /mock/instruments universe
+    depth: int = 0            # 0 = mode default (full → 5, full_d30 → 30)
+    seed: int = 42
+
+
+config = MockFeedConfig()
+
+MODE_DEPTH = {"full": 5, "full_d30": 30}
+MODE_REQUEST = {"ltpc": pb.ltpc, "full": pb.full_d5, "full_d30": pb.full_d30}
+
+_stats: Dict[str, int] = {"clients": 0, "connections": 0, "frames": 0, "ticks": 0, "late_frames": 0}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SYNTHETIC MARKET - random walk per instrument
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def instrument_universe(count: int) -> List[str]:
+    return [f"NSE_FO|{60000 + i}" for i in range(count)]
+
+
+class SyntheticMarket:
+    """Per-socket instrument state (deterministic for a given seed)"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.state: Dict[str, Dict[str, float]] = {}
+
+    def _instrument(self, key: str) -> Dict[str, float]:
+        state = self.state.get(key)
+        if state is None:
+            ltp = round(self.rng.uniform(20, 500), 2) if key.startswith("NSE_FO") else 24000.0
+            state = {
+                "ltp": ltp,
+                "cp": ltp,
+                "vtt": self.rng.randint(10_000, 1_000_000),
+                "oi": self.rng.randint(10_000, 1_000_000),
+                "value": 0.0,
+            }
+            state["value"] = ltp * state["vtt"]
+            self.state[key] = state
+        return state
+
+    def fill(self, feed, key: str, mode: str, now_ms: int):
+        """One tick for `key` into a Feed message"""
+        rng = self.rng
+        s = self._instrument(key)
+        s["ltp"] = max(0.05, round(s["ltp"] * (1 + rng.gauss(0, 0.0008)), 2))
+        ltq = rng.choice((25, 50, 75, 150, 300))
+        s["vtt"] += ltq
+        s["value"] += s["ltp"] * ltq
+        s["oi"] = max(0, s["oi"] + rng.randint(-300, 300))
+        ltp = s["ltp"]
+
+        feed.requestMode = MODE_REQUEST.get(mode, pb.full_d5)
+
+        if mode == "ltpc":
+            feed.ltpc.ltp = ltp
+            feed.ltpc.ltt = now_ms
+            feed.ltpc.ltq = ltq
+            feed.ltpc.cp = s["cp"]
+            return
+
+        if key.startswith("NSE_INDEX"):
+            ltpc = feed.fullFeed.indexFF.ltpc
+            ltpc.ltp = ltp
+            ltpc.ltt = now_ms
+            ltpc.cp = s["cp"]
+            return
+
+        market_ff = feed.fullFeed.marketFF
+        market_ff.ltpc.ltp = ltp
+        market_ff.ltpc.ltt = now_ms
+        market_ff.ltpc.ltq = ltq
+        market_ff.ltpc.cp = s["cp"]
+
+        depth = config.depth or MODE_DEPTH.get(mode, 5)
+        for level in range(depth):
+            q = market_ff.marketLevel.bidAskQuote.add()
+            q.bidQ = rng.randint(25, 5000)
+            q.bidP = round(max(0.05, ltp - 0.05 * (level + 1)), 2)
+            q.askQ = rng.randint(25, 5000)
+            q.askP = round(ltp + 0.05 * (level + 1), 2)
+
+        greeks = market_ff.optionGreeks
+        greeks.delta = round(rng.uniform(0.05, 0.95), 4)
+        greeks.theta = round(rng.uniform(-20, -1), 4)
+        greeks.gamma = round(rng.uniform(0.0001, 0.005), 6)
+        greeks.vega = round(rng.uniform(1, 15), 4)
+        greeks.rho = round(rng.uniform(0, 0.1), 4)
+
+        market_ff.atp = round(s["value"] / s["vtt"], 2)
+        market_ff.vtt = s["vtt"]
+        market_ff.oi = s["oi"]
+        market_ff.iv = round(rng.uniform(0.1, 0.3), 4)
+        market_ff.tbq = rng.randint(10_000, 500_000)
+        market_ff.tsq = rng.randint(10_000, 500_000)
+
+
+def market_info_frame() -> bytes:
+    response = pb.FeedResponse(type=pb.market_info, currentTs=int(time.time() * 1000))
+    for segment in ("NSE_FO", "NSE_EQ", "NSE_INDEX"):
+        response.marketInfo.segmentStatus[segment] = pb.NORMAL_OPEN
+    return response.SerializeToString()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MOCK SERVER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+app = FastAPI(title="Mock Upstox Market Data Feed")
+
+
+@app.get("/v3/feed/market-data-feed/authorize")
+async def authorize(request: Request):
+    """FeedService.get_authorized_url response shape"""
+    host = request.headers.get("host", f"{request.url.hostname}:{request.url.port}")
+    return {
+        "status": "success",
+        "data": {
+            "authorized_redirect_uri": f"ws://{host}/v3/feed/market-data-feed",
+        }
+    }
+
+
+@app.get("/mock/instruments")
+async def get_instruments():
+    keys = instrument_universe(config.instruments)
+    return {"count": len(keys), "instrument_keys": keys}
+
+
+@app.get("/mock/stats")
+async def get_stats():
+    return dict(_stats, rate=config.rate, batch=config.batch, depth=config.depth)
+
+
+async def _emit(websocket: WebSocket, subscriptions: Dict[str, str], market: SyntheticMarket):
+    """rate frames/sec, drift-corrected; slow client → late_frames ஏறும்"""
+    interval = 1 / config.rate if config.rate > 0 else 0
+    cursor = 0
+    next_at = time.monotonic()
+
+    while True:
+        if interval:
+            next_at += interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                _stats["late_frames"] += 1
+                if delay < -1:
+                    # More than a second behind - don't burst to catch up
+                    next_at = time.monotonic()
+                await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(0)
+
+        if not subscriptions:
+            continue
+
+        keys = list(subscriptions.keys())
+        count = min(config.batch, len(keys))
+        now_ms = int(time.time() * 1000)
+        response = pb.FeedResponse(type=pb.live_feed, currentTs=now_ms)
+        for i in range(count):
+            key = keys[(cursor + i) % len(keys)]
+            market.fill(response.feeds[key], key, subscriptions[key], now_ms)
+        cursor = (cursor + count) % len(keys)
+
+        await websocket.send_bytes(response.SerializeToString())
+        _stats["frames"] += 1
+        _stats["ticks"] += count
+
+
+@app.websocket("/v3/feed/market-data-feed")
+async def market_data_feed(websocket: WebSocket):
+    await websocket.accept()
+    _stats["clients"] += 1
+    _stats["connections"] += 1
+    subscriptions: Dict[str, str] = {}
+    market = SyntheticMarket(config.seed + _stats["connections"])
+
+    await websocket.send_bytes(market_info_frame())
+    emitter = asyncio.create_task(_emit(websocket, subscriptions, market))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            raw = message.get("bytes") or message.get("text")
+            if not raw:
+                continue
+            try:
+                request = json.loads(raw)
+            except ValueError:
+                continue
+
+            method = request.get("method")
+            data = request.get("data", {})
+            keys = data.get("instrumentKeys", [])
+            if method in ("sub", "change_mode"):
+                mode = data.get("mode", "full")
+                for key in keys:
+                    subscriptions[key] = mode
+                # Upstox sends a snapshot right after subscribing
+                if method == "sub" and keys:
+                    snapshot = pb.FeedResponse(type=pb.initial_feed, currentTs=int(time.time() * 1000))
+                    for key in keys:
+                        market.fill(snapshot.feeds[key], key, mode, snapshot.currentTs)
+                    await websocket.send_bytes(snapshot.SerializeToString())
+            elif method == "unsub":
+                for key in keys:
+                    subscriptions.pop(key, None)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        emitter.cancel()
+        _stats["clients"] -= 1
@@ -9,8 +9,8 @@ Author: Antony HFT System
 """
 
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -83,6 +83,8 @@ class Candle1M(BaseModel):
     # 🔑 Identification
     instrument_key: str = Field(..., description="Instrument key (e.g., NSE_FO|61755)")
     timestamp: datetime = Field(..., description="Candle close time (IST, minute-aligned)")
+    # 1m = tick-built; 3m / 5m / ... = 1m candles-ல் இருந்து rollup (app/services/candle_rollup.py)
+    timeframe: str = Field("1m", description="Candle timeframe (1m, 5m, 15m, 1h, ...)")
     
     # ═══════════════════════════════════════════════════════════════════════════
     # 1️⃣ PRICE - OHLC + Diff
@@ -128,7 +130,7 @@ class Candle1M(BaseModel):
     # 5️⃣ VTT (Volume Traded Today) + Volume in this minute
     # ═══════════════════════════════════════════════════════════════════════════
     vtt: int = Field(0, description="Volume Traded Today (cumulative)")
-    volume_1m: int = Field(0, description="Volume traded in this 1-min candle")
+    volume_1m: int = Field(0, description="Volume traded in this candle (1-min, or the whole timeframe for rollups)")
     volume_diff: int = Field(0, description="Volume change (current 1m Vol - previous 1m Vol)")
     
     # ═══════════════════════════════════════════════════════════════════════════
@@ -155,6 +157,12 @@ class Candle1M(BaseModel):
     tsq: int = Field(0, description="Total Sell Quantity at close")
     tsq_diff: int = Field(0, description="TSQ change")
 
+    # Feed reconnect gap overlapped this minute - ticks may be missing
+    gap: bool = Field(False, description="True if a feed gap overlapped this candle")
+
+    # codec.encode_model cache - SSE / ws / persistence ஒரே encoded payload share
+    _encoded: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # RAW TICK MODEL - For parsing incoming TBT data
@@ -162,9 +170,9 @@ class Candle1M(BaseModel):
 
 class BidAskQuote(BaseModel):
     """Single bid/ask level from 30-depth"""
-    bidQ: str = "0"  # Upstox sends as string
+    bidQ: int = 0  # Upstox JSON sends as string - coerced; protobuf sends int64
     bidP: float = 0.0
-    askQ: str = "0"
+    askQ: int = 0
     askP: float = 0.0
 
 
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: AntonyStreamV1.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14\x41ntonyStreamV1.proto\x12\x10\x61ntony.stream.v1\"\"\n\x04Wall\x12\r\n\x05price\x18\x01 \x01(\x01\x12\x0b\n\x03qty\x18\x02 \x01(\x03\"\xf8\x01\n\x06\x42idAsk\x12)\n\tbid_walls\x18\x01 \x03(\x0b\x32\x16.antony.stream.v1.Wall\x12)\n\task_walls\x18\x02 \x03(\x0b\x32\x16.antony.stream.v1.Wall\x12\x16\n\x0e\x62\x65st_bid_price\x18\x03 \x01(\x01\x12\x14\n\x0c\x62\x65st_bid_qty\x18\x04 \x01(\x03\x12\x16\n\x0e\x62\x65st_ask_price\x18\x05 \x01(\x01\x12\x14\n\x0c\x62\x65st_ask_qty\x18\x06 \x01(\x03\x12\x0e\n\x06spread\x18\x07 \x01(\x01\x12\x15\n\rtotal_bid_qty\x18\x08 \x01(\x03\x12\x15\n\rtotal_ask_qty\x18\t \x01(\x03\"P\n\x06Greeks\x12\r\n\x05\x64\x65lta\x18\x01 \x01(\x01\x12\r\n\x05theta\x18\x02 \x01(\x01\x12\r\n\x05gamma\x18\x03 \x01(\x01\x12\x0c\n\x04vega\x18\x04 \x01(\x01\x12\x0b\n\x03rho\x18\x05 \x01(\x01\"\xca\x04\n\x06\x43\x61ndle\x12\x16\n\x0einstrument_key\x18\x01 \x01(\t\x12\x11\n\ttimestamp\x18\x02 \x01(\x03\x12\x0c\n\x04open\x18\x03 \x01(\x01\x12\x0c\n\x04high\x18\x04 \x01(\x01\x12\x0b\n\x03low\x18\x05 \x01(\x01\x12\r\n\x05\x63lose\x18\x06 \x01(\x01\x12\x12\n\nprev_close\x18\x07 \x01(\x01\x12\x12\n\nprice_diff\x18\x08 \x01(\x01\x12)\n\x07\x62id_ask\x18\t \x01(\x0b\x32\x18.antony.stream.v1.BidAsk\x12\x13\n\x0bspread_diff\x18\n \x01(\x01\x12(\n\x06greeks\x18\x0b \x01(\x0b\x32\x18.antony.stream.v1.Greeks\x12\x12\n\ndelta_diff\x18\x0c \x01(\x01\x12\x12\n\ntheta_diff\x18\r \x01(\x01\x12\x12\n\ngamma_diff\x18\x0e \x01(\x01\x12\x11\n\tvega_diff\x18\x0f \x01(\x01\x12\x10\n\x08rho_diff\x18\x10 \x01(\x01\x12\x0b\n\x03\x61tp\x18\x11 \x01(\x01\x12\x10\n\x08\x61tp_diff\x18\x12 \x01(\x01\x12\x0b\n\x03vtt\x18\x13 \x01(\x03\x12\x11\n\tvolume_1m\x18\x14 \x01(\x03\x12\x13\n\x0bvolume_diff\x18\x15 \x01(\x03\x12\n\n\x02oi\x18\x16 \x01(\x03\x12\x0f\n\x07oi_diff\x18\x17 \x01(\x03\x12\n\n\x02iv\x18\x18 \x01(\x01\x12\x0f\n\x07iv_diff\x18\x19 \x01(\x01\x12\x0b\n\x03tbq\x18\x1a \x01(\x03\x12\x10\n\x08tbq_diff\x18\x1b \x01(\x03\x12\x0b\n\x03tsq\x18\x1c \x01(\x03\x12\x10\n\x08tsq_diff\x18\x1d \x01(\x03\x12\x0b\n\x03gap\x18\x1e \x01(\x08\x12\x11\n\ttimeframe\x18\x1f \x01(\t\"\\\n\x04Vwap\x12\x16\n\x0einstrument_key\x18\x01 \x01(\t\x12\x11\n\ttimestamp\x18\x02 \x01(\x03\x12\x0c\n\x04vwap\x18\x03 \x01(\x01\x12\x0b\n\x03ltp\x18\x04 \x01(\x01\x12\x0e\n\x06volume\x18\x05 \x01(\x03\"6\n\x03Gap\x12\r\n\x05start\x18\x01 \x01(\x03\x12\x0b\n\x03\x65nd\x18\x02 \x01(\x03\x12\x13\n\x0binstruments\x18\x03 \x03(\t\"\xfc\x01\n\rStreamMessage\x12\x0e\n\x04\x66\x65\x65\x64\x18\x01 \x01(\x0cH\x00\x12*\n\x06\x63\x61ndle\x18\x02 \x01(\x0b\x32\x18.antony.stream.v1.CandleH\x00\x12&\n\x04vwap\x18\x03 \x01(\x0b\x32\x16.antony.stream.v1.VwapH\x00\x12$\n\x03gap\x18\x04 \x01(\x0b\x32\x15.antony.stream.v1.GapH\x00\x12\x0f\n\x05order\x18\x05 \x01(\tH\x00\x12\x11\n\x07\x63ontrol\x18\x06 \x01(\tH\x00\x12\x32\n\x0e\x63\x61ndle_partial\x18\x07 \x01(\x0b\x32\x18.antony.stream.v1.CandleH\x00\x42\t\n\x07payloadb\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'AntonyStreamV1_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _WALL._serialized_start=42
+  _WALL._serialized_end=76
+  _BIDASK._serialized_start=79
+  _BIDASK._serialized_end=327
+  _GREEKS._serialized_start=329
+  _GREEKS._serialized_end=409
+  _CANDLE._serialized_start=412
+  _CANDLE._serialized_end=998
+  _VWAP._serialized_start=1000
+  _VWAP._serialized_end=1092
+  _GAP._serialized_start=1094
+  _GAP._serialized_end=1148
+  _STREAMMESSAGE._serialized_start=1151
+  _STREAMMESSAGE._serialized_end=1403
+# @@protoc_insertion_point(module_scope)
@@ -9,11 +9,18 @@ Time Alignment:
     9:30:00 - 9:30:59.999 → 9:30:00 candle
     9:31:00 - 9:31:59.999 → 9:31:00 candle
 
+Real-time path tick list வைக்காது - instrument-க்கு ஒரு CandleState
+(OHLC + first/last tick). Memory, minute close cost tick count-ஐ பொறுத்தது இல்லை.
+
+Minute close timer-driven (close_due): minute + grace கடந்ததும் எல்லா
+instruments-ம் ஒரே நேரத்தில் close; trade இல்லாத minutes-க்கு flat candle.
+
 Author: Antony HFT System
 """
 
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from toolz import curry, pipe, groupby, valmap
 import pytz
 
@@ -33,6 +40,10 @@ from app.models.candle import (
 
 IST = pytz.timezone('Asia/Kolkata')
 MINUTE_MS = 60_000  # 60 seconds in milliseconds
+DAY_MS = 86_400_000
+IST_OFFSET_MS = 19_800_000  # +05:30
+SESSION_OPEN_MS = (9 * 60 + 15) * MINUTE_MS  # 09:15 IST (ms since IST midnight)
+SESSION_CLOSE_MS = (15 * 60 + 30) * MINUTE_MS  # 15:30 IST
 WALL_THRESHOLD = 2000  # Qty > 2000 = Wall
 
 
@@ -51,6 +62,17 @@ def floor_minute_ms(timestamp_ms: int) -> int:
     return (timestamp_ms // MINUTE_MS) * MINUTE_MS
 
 
+def session_day(timestamp_ms: int) -> int:
+    """IST calendar day number (same-session check)"""
+    return (timestamp_ms + IST_OFFSET_MS) // DAY_MS
+
+
+def in_session(minute_ts: int) -> bool:
+    """09:15 - 15:29 IST minute (flat candles இந்த range-ல் மட்டும்)"""
+    local = (minute_ts + IST_OFFSET_MS) % DAY_MS
+    return SESSION_OPEN_MS <= local < SESSION_CLOSE_MS
+
+
 def ms_to_datetime(timestamp_ms: int) -> datetime:
     """Milliseconds → IST datetime"""
     return datetime.fromtimestamp(timestamp_ms / 1000, tz=IST)
@@ -188,13 +210,168 @@ def build_bid_ask_snapshot(quotes: List[BidAskQuote]) -> BidAskSnapshot:
     )
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# CANDLE STATE - Streaming accumulator (O(1) memory per instrument)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CandleState:
+    """
+    ஒரு instrument-ன் open minute - tick list இல்லை
+
+    Tick வரும்போது OHLC, tick count update; first / last tick reference
+    மட்டும் வைக்கும் (open + latest 30-depth snapshot). எவ்வளவு liquid
+    instrument-ஆனாலும் memory constant, minute close cost flat.
+
+    Usage:
+        state = CandleState(minute_ts, tick)
+        state.update(next_tick)
+        candle = state.to_candle(instrument_key, prev_volume)
+    """
+
+    __slots__ = ("minute_ts", "first", "last", "high", "low", "ticks")
+
+    def __init__(self, minute_ts: int, tick: RawTick):
+        self.minute_ts = minute_ts
+        self.first = tick
+        self.last = tick
+        self.high = tick.ltp
+        self.low = tick.ltp
+        self.ticks = 1
+
+    def update(self, tick: RawTick):
+        self.last = tick
+        ltp = tick.ltp
+        if ltp > self.high:
+            self.high = ltp
+        elif ltp < self.low:
+            self.low = ltp
+        self.ticks += 1
+
+    def to_candle(self, instrument_key: str, prev_volume: int = 0) -> Candle1M:
+        """
+        State → Candle1M
+
+        Logic:
+            First tick = Open values
+            Last tick = Close values
+            Running max/min = High/Low
+            diffs = Close - Open
+        """
+        first = self.first
+        last = self.last
+        
+        # OHLC from LTP
+        open_price = first.ltp
+        close_price = last.ltp
+        
+        # Price diff
+        price_diff = round(close_price - open_price, 2)
+        
+        # Bid/Ask snapshot from last tick
+        bid_ask = build_bid_ask_snapshot(last.bid_ask_quote)
+        
+        # Spread diff (if first tick also has quotes)
+        open_spread = 0.0
+        if first.bid_ask_quote:
+            first_snapshot = build_bid_ask_snapshot(first.bid_ask_quote)
+            open_spread = first_snapshot.spread
+        spread_diff = round(bid_ask.spread - open_spread, 2)
+        
+        # Greeks
+        greeks = GreeksSnapshot(
+            delta=last.delta,
+            theta=last.theta,
+            gamma=last.gamma,
+            vega=last.vega,
+            rho=last.rho,
+        )
+        
+        # Greek diffs
+        delta_diff = round(last.delta - first.delta, 4)
+        theta_diff = round(last.theta - first.theta, 4)
+        gamma_diff = round(last.gamma - first.gamma, 6)
+        vega_diff = round(last.vega - first.vega, 4)
+        rho_diff = round(last.rho - first.rho, 4)
+        
+        # ATP diff
+        atp_diff = round(last.atp - first.atp, 2)
+        
+        # Volume in this minute
+        volume_1m = last.vtt - first.vtt
+        
+        # Volume Diff (Change from prev candle)
+        # If prev_volume is 0 (first candle), diff is 0 or volume itself? 
+        # Usually diff should be 0 if no prev context.
+        volume_diff = volume_1m - prev_volume if prev_volume > 0 else 0
+        
+        # OI diff
+        oi_diff = last.oi - first.oi
+        
+        # IV diff
+        iv_diff = round(last.iv - first.iv, 6)
+        
+        # TBQ/TSQ diffs
+        tbq_diff = last.tbq - first.tbq
+        tsq_diff = last.tsq - first.tsq
+        
+        return Candle1M(
+            instrument_key=instrument_key,
+            timestamp=floor_minute_datetime(self.minute_ts),
+            
+            # 1. Price
+            open=open_price,
+            high=self.high,
+            low=self.low,
+            close=close_price,
+            prev_close=last.cp,
+            price_diff=price_diff,
+            
+            # 2. Bid/Ask
+            bid_ask=bid_ask,
+            spread_diff=spread_diff,
+            
+            # 3. Greeks
+            greeks=greeks,
+            delta_diff=delta_diff,
+            theta_diff=theta_diff,
+            gamma_diff=gamma_diff,
+            vega_diff=vega_diff,
+            rho_diff=rho_diff,
+            
+            # 4. ATP
+            atp=last.atp,
+            atp_diff=atp_diff,
+            
+            # 5. VTT / Volume
+            vtt=last.vtt,
+            volume_1m=volume_1m,
+            volume_diff=volume_diff,
+            
+            # 6. OI
+            oi=last.oi,
+            oi_diff=oi_diff,
+            
+            # 7. IV
+            iv=last.iv,
+            iv_diff=iv_diff,
+            
+            # 8. TBQ
+            tbq=last.tbq,
+            tbq_diff=tbq_diff,
+            
+            # 9. TSQ
+            tsq=last.tsq,
+            tsq_diff=tsq_diff,
+        )
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CANDLE BUILDER - Multiple Ticks → Candle1M
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def build_candle(instrument_key: str, minute_ts: int, ticks: List[RawTick], prev_volume: int = 0) -> Candle1M:
     """
-    ஒரு minute's ticks → Candle1M object
+    ஒரு minute's ticks → Candle1M object (batch / historical path)
     
     Args:
         instrument_key: Instrument identifier
@@ -202,124 +379,50 @@ def build_candle(instrument_key: str, minute_ts: int, ticks: List[RawTick], prev
         ticks: List of ticks within this minute
         prev_volume: Volume of the previous candle (for diff calculation)
     
-    Logic:
-        First tick = Open values
-        Last tick = Close values
-        Max/Min = High/Low
-        diffs = Close - Open
+    Real-time path CandleState-ஐ tick-by-tick update பண்ணும்; இங்கே அதே
+    state list மேல் fold ஆகும் - இரண்டும் ஒரே candle தரும்.
     """
     if not ticks:
         raise ValueError("Cannot build candle from empty tick list")
     
-    first = ticks[0]
-    last = ticks[-1]
-    
-    # OHLC from LTP
-    prices = [t.ltp for t in ticks]
-    open_price = first.ltp
-    high_price = max(prices)
-    low_price = min(prices)
-    close_price = last.ltp
-    
-    # Price diff
-    price_diff = round(close_price - open_price, 2)
-    
-    # Bid/Ask snapshot from last tick
-    bid_ask = build_bid_ask_snapshot(last.bid_ask_quote)
-    
-    # Spread diff (if first tick also has quotes)
-    open_spread = 0.0
-    if first.bid_ask_quote:
-        first_snapshot = build_bid_ask_snapshot(first.bid_ask_quote)
-        open_spread = first_snapshot.spread
-    spread_diff = round(bid_ask.spread - open_spread, 2)
-    
-    # Greeks
-    greeks = GreeksSnapshot(
-        delta=last.delta,
-        theta=last.theta,
-        gamma=last.gamma,
-        vega=last.vega,
-        rho=last.rho,
-    )
-    
-    # Greek diffs
-    delta_diff = round(last.delta - first.delta, 4)
-    theta_diff = round(last.theta - first.theta, 4)
-    gamma_diff = round(last.gamma - first.gamma, 6)
-    vega_diff = round(last.vega - first.vega, 4)
-    rho_diff = round(last.rho - first.rho, 4)
-    
-    # ATP diff
-    atp_diff = round(last.atp - first.atp, 2)
-    
-    # Volume in this minute
-    volume_1m = last.vtt - first.vtt
-    
-    # Volume Diff (Change from prev candle)
-    # If prev_volume is 0 (first candle), diff is 0 or volume itself? 
-    # Usually diff should be 0 if no prev context.
-    volume_diff = volume_1m - prev_volume if prev_volume > 0 else 0
-    
-    # OI diff
-    oi_diff = last.oi - first.oi
-    
-    # IV diff
-    iv_diff = round(last.iv - first.iv, 6)
-    
-    # TBQ/TSQ diffs
-    tbq_diff = last.tbq - first.tbq
-    tsq_diff = last.tsq - first.tsq
+    state = CandleState(minute_ts, ticks[0])
+    for tick in ticks[1:]:
+        state.update(tick)
+    return state.to_candle(instrument_key, prev_volume)
+
+
+def flat_candle(prev: Candle1M, minute_ts: int) -> Candle1M:
+    """
+    Trade இல்லாத minute → flat candle (gap fill)
     
-    return Candle1M(
-        instrument_key=instrument_key,
-        timestamp=floor_minute_datetime(minute_ts),
-        
-        # 1. Price
-        open=open_price,
-        high=high_price,
-        low=low_price,
-        close=close_price,
-        prev_close=last.cp,
-        price_diff=price_diff,
-        
-        # 2. Bid/Ask
-        bid_ask=bid_ask,
-        spread_diff=spread_diff,
-        
-        # 3. Greeks
-        greeks=greeks,
-        delta_diff=delta_diff,
-        theta_diff=theta_diff,
-        gamma_diff=gamma_diff,
-        vega_diff=vega_diff,
-        rho_diff=rho_diff,
-        
-        # 4. ATP
-        atp=last.atp,
-        atp_diff=atp_diff,
-        
-        # 5. VTT / Volume
-        vtt=last.vtt,
-        volume_1m=volume_1m,
-        volume_diff=volume_diff,
-        
-        # 6. OI
-        oi=last.oi,
-        oi_diff=oi_diff,
-        
-        # 7. IV
-        iv=last.iv,
-        iv_diff=iv_diff,
-        
-        # 8. TBQ
-        tbq=last.tbq,
-        tbq_diff=tbq_diff,
-        
-        # 9. TSQ
-        tsq=last.tsq,
-        tsq_diff=tsq_diff,
-    )
+    OHLC = previous close, volume 0, diffs 0; bid/ask, greeks, OI போன்ற
+    close values previous candle-ல் இருந்து carry. எல்லா instruments-ம்
+    ஒரே timestamps-ல் line up ஆகும்.
+    """
+    candle = prev.model_copy(update={
+        "timestamp": floor_minute_datetime(minute_ts),
+        "open": prev.close,
+        "high": prev.close,
+        "low": prev.close,
+        "price_diff": 0.0,
+        "spread_diff": 0.0,
+        "delta_diff": 0.0,
+        "theta_diff": 0.0,
+        "gamma_diff": 0.0,
+        "vega_diff": 0.0,
+        "rho_diff": 0.0,
+        "atp_diff": 0.0,
+        "volume_1m": 0,
+        "volume_diff": -prev.volume_1m,
+        "oi_diff": 0,
+        "iv_diff": 0.0,
+        "tbq_diff": 0,
+        "tsq_diff": 0,
+        "gap": False,
+    })
+    # model_copy private attrs share பண்ணும் - தனி encode cache
+    candle._encoded = {}
+    return candle
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -330,25 +433,99 @@ class CandleAggregator:
     """
     Real-time candle aggregator
     
-    Ticks-ஐ collect பண்ணி, minute boundary-ல candle emit பண்ணும்
+    Instrument-க்கு ஒரு CandleState update பண்ணி, minute boundary-ல candle emit பண்ணும்
     
     Usage:
-        aggregator = CandleAggregator()
+        aggregator = CandleAggregator(gap_fill=True)
         
         # Add each incoming tick
         candle = aggregator.add_tick(instrument_key, raw_tick)
         
         # If minute boundary crossed, returns completed Candle1M
         # Otherwise returns None
+        
+        # Timer (every ~1s) - minute + grace கடந்த எல்லா open candles,
+        # trade இல்லாத minutes-க்கு flat candles
+        candles = aggregator.close_due(grace_ms=2000)
+        
+        # Throttled (every ~500ms) - forming candles of updated instruments
+        partials = aggregator.partial_candles()
+        
+        # Feed reconnect gap - closes the open candle, flags gap minutes
+        candle = aggregator.mark_gap(instrument_key, start_ms, end_ms)
+    
+    Clock:
+        Event time (max ltt seen) + அதன் பிறகு கடந்த wall time. Live-ல்
+        wall clock மாதிரி; replay-ல் recorded session time-ஐ follow பண்ணும்.
+    
+    Stale ltt:
+        Ltt ஏற்கனவே close ஆன minute-ல் இருந்தால் (illiquid strike-ன் பழைய
+        last trade, அல்லது grace-க்கு பிறகு வந்த tick) current clock minute-க்கு
+        போகும் - close ஆன candle மீண்டும் emit ஆகாது.
     """
     
-    def __init__(self):
-        # {instrument_key: {current_minute_ts: [ticks]}}
-        self._buffers: Dict[str, Dict[int, List[RawTick]]] = {}
-        # {instrument_key: last_completed_minute_ts}
-        self._last_candle_minute: Dict[str, int] = {}
-        # {instrument_key: last_completed_candle_volume}
-        self._last_candle_volume: Dict[str, int] = {}
+    def __init__(self, gap_fill: bool = False):
+        self.gap_fill = gap_fill
+        # {instrument_key: open minute state}
+        self._states: Dict[str, CandleState] = {}
+        # Timer wheel - {minute_ts: instruments with an open state in that minute}
+        self._wheel: Dict[int, Set[str]] = {}
+        # {instrument_key: last emitted candle} - volume diff + flat candles
+        self._last_candle: Dict[str, Candle1M] = {}
+        self._last_minute: Dict[str, int] = {}
+        # {instrument_key: (first_gap_minute_ts, last_gap_minute_ts)}
+        self._gaps: Dict[str, tuple[int, int]] = {}
+        # கடைசி partial_candles() call-க்கு பிறகு tick வந்த instruments
+        self._dirty: Set[str] = set()
+        # Timer இந்த minute வரை (inclusive) close பண்ணிவிட்டது
+        self.closed_through: Optional[int] = None
+        self.watermark_ms = 0
+        self._watermark_at = 0.0
+        self.stats: Dict[str, int] = {"flat_candles": 0, "timer_closes": 0, "stale_ticks": 0, "dropped_ticks": 0}
+    
+    def _flag_gap(self, instrument_key: str, candle: Candle1M, minute_ts: int) -> Candle1M:
+        """Gap minutes-க்குள் வரும் candle-ஐ gap=True ஆக mark பண்ணும்"""
+        gap = self._gaps.get(instrument_key)
+        if gap is None:
+            return candle
+        gap_from, gap_to = gap
+        if gap_from <= minute_ts <= gap_to:
+            candle.gap = True
+        if minute_ts >= gap_to:
+            del self._gaps[instrument_key]
+        return candle
+    
+    def _open(self, instrument_key: str, minute_ts: int, tick: RawTick):
+        self._states[instrument_key] = CandleState(minute_ts, tick)
+        self._wheel.setdefault(minute_ts, set()).add(instrument_key)
+    
+    def _remove(self, instrument_key: str) -> Optional[CandleState]:
+        state = self._states.pop(instrument_key, None)
+        if state is not None:
+            slot = self._wheel.get(state.minute_ts)
+            if slot is not None:
+                slot.discard(instrument_key)
+                if not slot:
+                    del self._wheel[state.minute_ts]
+        return state
+    
+    def _emitted(self, instrument_key: str, candle: Candle1M, minute_ts: int) -> Candle1M:
+        self._last_candle[instrument_key] = candle
+        self._last_minute[instrument_key] = minute_ts
+        return self._flag_gap(instrument_key, candle, minute_ts)
+    
+    def _close(self, instrument_key: str, state: CandleState) -> Candle1M:
+        """Open state → completed candle (prev volume diff + gap flag)"""
+        prev = self._last_candle.get(instrument_key)
+        candle = state.to_candle(instrument_key, prev.volume_1m if prev else 0)
+        return self._emitted(instrument_key, candle, state.minute_ts)
+    
+    def seed(self, candle: Candle1M):
+        """Already published candle (engine restart) - volume diff / flat fill context மட்டும்"""
+        minute_ts = int(candle.timestamp.timestamp() * 1000)
+        if minute_ts >= self._last_minute.get(candle.instrument_key, minute_ts):
+            self._last_candle[candle.instrument_key] = candle
+            self._last_minute[candle.instrument_key] = minute_ts
     
     def add_tick(self, instrument_key: str, tick: RawTick) -> Optional[Candle1M]:
         """
@@ -357,73 +534,147 @@ class CandleAggregator:
         Returns:
             Candle1M if minute boundary crossed, else None
         """
+        if tick.ltt > self.watermark_ms:
+            self.watermark_ms = tick.ltt
+            self._watermark_at = time.monotonic()
+        
         tick_minute = floor_minute_ms(tick.ltt)
+        closed = max(self._last_minute.get(instrument_key, -1), self.closed_through or -1)
+        if tick_minute <= closed:
+            # Stale ltt - இந்த minute-ன் candle ஏற்கனவே போய்விட்டது
+            tick_minute = floor_minute_ms(self.watermark_ms)
+            if tick_minute <= closed:
+                self.stats["dropped_ticks"] += 1
+                return None
+            self.stats["stale_ticks"] += 1
+        
+        self._dirty.add(instrument_key)
+        state = self._states.get(instrument_key)
         
-        # Initialize buffer for new instrument
-        if instrument_key not in self._buffers:
-            self._buffers[instrument_key] = {}
+        if state is None:
+            self._open(instrument_key, tick_minute, tick)
+            return None
+        
+        if tick_minute == state.minute_ts:
+            state.update(tick)
+            return None
         
-        buffer = self._buffers[instrument_key]
+        if tick_minute < state.minute_ts:
+            # Open candle-ஐ விட பழைய minute - open candle-ஐ மாற்றாது
+            self.stats["dropped_ticks"] += 1
+            return None
         
-        # Check if we crossed into a new minute
-        completed_candle = None
+        # New minute started - emit previous candle
+        self._remove(instrument_key)
+        self._open(instrument_key, tick_minute, tick)
+        return self._close(instrument_key, state)
+    
+    def clock_ms(self) -> int:
+        """Event time + அதன் பிறகு கடந்த wall time (0 = இன்னும் tick இல்லை)"""
+        if not self.watermark_ms:
+            return 0
+        return self.watermark_ms + int((time.monotonic() - self._watermark_at) * 1000)
+    
+    def close_due(self, grace_ms: int) -> List[Candle1M]:
+        """
+        Timer - minute + grace_ms கடந்த minutes-ஐ எல்லா instruments-க்கும் close
         
-        if instrument_key in self._last_candle_minute:
-            last_minute = self._last_candle_minute[instrument_key]
-            
-            # New minute started - emit previous candle
-            if tick_minute > last_minute and last_minute in buffer:
-                ticks = buffer[last_minute]
-                if ticks:
-                    # Get prev volume for diff
-                    prev_vol = self._last_candle_volume.get(instrument_key, 0)
-                    
-                    completed_candle = build_candle(instrument_key, last_minute, ticks, prev_vol)
-                    
-                    # Update last volume
-                    self._last_candle_volume[instrument_key] = completed_candle.volume_1m
-                    
-                # Clear old buffer
-                del buffer[last_minute]
-        
-        # Add tick to current minute buffer
-        if tick_minute not in buffer:
-            buffer[tick_minute] = []
-        buffer[tick_minute].append(tick)
-        
-        # Update last candle minute
-        self._last_candle_minute[instrument_key] = tick_minute
-        
-        return completed_candle
+        Minute வாரியாக (timestamp order): open candles close, பிறகு gap_fill
+        இருந்தால் அந்த minute-ல் candle இல்லாத instruments-க்கு flat candle
+        (session hours-க்குள், அதே நாள் candle இருந்தால் மட்டும்).
+        
+        Returns:
+            Closed + flat candles
+        """
+        clock = self.clock_ms()
+        if not clock:
+            return []
+        cutoff = floor_minute_ms(clock - grace_ms) - MINUTE_MS
+        if self.closed_through is None:
+            # First run - ஏற்கனவே close ஆக வேண்டிய open minutes-ம் சேர்த்து
+            first = min(self._wheel, default=cutoff)
+            self.closed_through = min(first, cutoff) - MINUTE_MS
+        if cutoff <= self.closed_through:
+            return []
+        
+        completed: List[Candle1M] = []
+        minute_ts = self.closed_through + MINUTE_MS
+        if not self.gap_fill:
+            # Wheel-ல் இல்லாத minutes skip
+            minute_ts = max(minute_ts, min(self._wheel, default=cutoff))
+        while minute_ts <= cutoff:
+            for instrument_key in self._wheel.pop(minute_ts, ()):
+                state = self._states.pop(instrument_key)
+                completed.append(self._close(instrument_key, state))
+                self.stats["timer_closes"] += 1
+            if self.gap_fill and in_session(minute_ts):
+                completed.extend(self._fill(minute_ts))
+            minute_ts += MINUTE_MS
+        self.closed_through = cutoff
+        return completed
+    
+    def _fill(self, minute_ts: int) -> List[Candle1M]:
+        flats: List[Candle1M] = []
+        day = session_day(minute_ts)
+        for instrument_key, last_minute in self._last_minute.items():
+            if last_minute >= minute_ts or session_day(last_minute) != day:
+                continue
+            candle = flat_candle(self._last_candle[instrument_key], minute_ts)
+            flats.append(candle)
+        for candle in flats:
+            self._emitted(candle.instrument_key, candle, minute_ts)
+        self.stats["flat_candles"] += len(flats)
+        return flats
+    
+    def partial_candles(self) -> List[Candle1M]:
+        """
+        Forming (open) candles - கடைசி call-க்கு பிறகு tick வந்த instruments மட்டும்
+        
+        State மாறாது; candle close ஆகும்போது வரும் final candle தனி.
+        """
+        partials: List[Candle1M] = []
+        for instrument_key in self._dirty:
+            state = self._states.get(instrument_key)
+            if state is None:
+                continue
+            prev = self._last_candle.get(instrument_key)
+            partials.append(state.to_candle(instrument_key, prev.volume_1m if prev else 0))
+        self._dirty.clear()
+        return partials
     
     def flush(self, instrument_key: str) -> Optional[Candle1M]:
         """
         Force emit current candle (use at market close or disconnect)
         
         Returns:
-            Candle1M if buffer has data, else None
+            Candle1M if an open candle exists, else None
         """
-        if instrument_key not in self._buffers:
+        state = self._remove(instrument_key)
+        if state is None:
             return None
+        return self._close(instrument_key, state)
+    
+    def mark_gap(self, instrument_key: str, start_ms: int, end_ms: int) -> Optional[Candle1M]:
+        """
+        Feed gap (reconnect) notification
         
-        buffer = self._buffers[instrument_key]
-        
-        if not buffer:
-            return None
+        Gap overlap ஆகும் minutes-ல் build ஆகும் candles gap=True ஆகும்.
+        Open candle-ன் minute gap முடிவதற்கு முன்னே முடிந்திருந்தால் அதற்கு
+        இனி ticks வராது - உடனே close பண்ணி return பண்ணும்.
         
-        # Get the most recent minute's data
-        latest_minute = max(buffer.keys())
-        ticks = buffer[latest_minute]
+        Returns:
+            The closed candle, if one was open before the gap
+        """
+        gap_from = floor_minute_ms(start_ms)
+        gap_to = floor_minute_ms(end_ms)
+        self._gaps[instrument_key] = (gap_from, gap_to)
         
-        if not ticks:
+        state = self._states.get(instrument_key)
+        if state is None or state.minute_ts >= gap_to:
             return None
         
-        candle = build_candle(instrument_key, latest_minute, ticks)
-        
-        # Clear buffer
-        buffer.clear()
-        
-        return candle
+        self._remove(instrument_key)
+        return self._close(instrument_key, state)
     
     def flush_all(self) -> List[Candle1M]:
         """
@@ -433,7 +684,7 @@ class CandleAggregator:
             List of all pending candles
         """
         candles = []
-        for instrument_key in list(self._buffers.keys()):
+        for instrument_key in list(self._states.keys()):
             candle = self.flush(instrument_key)
             if candle:
                 candles.append(candle)
@@ -0,0 +1,333 @@
+"""
+Candle Bus - `candles` Stream Reader per Process, Fan-Out to Clients
+=====================================================================
+
+CandleEngine (ஒரே leader) completed candles-ஐ Redis `candles` stream-க்கு
+publish பண்ணும். /stream/candles, /stream/ws candle channel இங்கே read
+மட்டும் - client-க்கு aggregator / persistence இல்லை.
+
+    candles ───────────┐
+    candles:5m ────────┤
+    candles:partial ───┼─XREAD─→ CandleBus reader (one per worker process)
+    candles:partial:5m ┘            │  decode once (Candle1M, encoded JSON cached)
+                                    └─→ stream + instrument filter → subscriber queues
+
+Streams:
+    candles                → 1m (tick-built)
+    candles:{tf}           → rollups (CANDLE_TIMEFRAMES)
+    candles:partial[:{tf}] → forming candles (CANDLE_PARTIAL_INTERVAL_MS throttle),
+                             event.partial=True; resume / dedupe இல்லை
+    Subscribers உள்ள streams மட்டும் read ஆகும்.
+
+Entry format:
+    instrument_key → "NSE_FO|61755"
+    data           → Candle1M JSON (codec.encode_model - SSE payload அப்படியே)
+
+Resume:
+    SSE `id:` = candles entry ID. Last-Event-ID → XRANGE (id, +] முதலில்,
+    பிறகு live (dedupe). STREAM_RESUME_MAX_AGE_SECONDS /
+    STREAM_RESUME_MAX_ENTRIES தாண்டினால் `event: resync`.
+
+Filtered subscriptions upstream feed interest எடுக்கும் (SubscriptionManager) -
+candle மட்டும் பார்க்கும் client-க்கும் instruments தானாக subscribe ஆகும்.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.models.candle import Candle1M
+from app.services import codec
+from app.services.candle_rollup import BASE_TIMEFRAME
+from app.services.stream_resume import StreamId, parse_stream_id
+from app.services.subscription_manager import SubscriptionManager
+from app.services.tick_bus import TickSubscription
+
+logger = logging.getLogger(__name__)
+
+CANDLE_STREAM = "candles"
+PARTIAL_STREAM = f"{CANDLE_STREAM}:partial"
+READ_COUNT = 500
+
+
+def candle_stream_name(timeframe: str = BASE_TIMEFRAME, partial: bool = False) -> str:
+    """"1m" → candles, "5m" → candles:5m, partial "5m" → candles:partial:5m"""
+    base = PARTIAL_STREAM if partial else CANDLE_STREAM
+    return base if timeframe == BASE_TIMEFRAME else f"{base}:{timeframe}"
+
+
+class CandleEvent:
+    """One `candles` stream entry - எல்லா subscribers-ம் share பண்ணும்"""
+
+    __slots__ = ("entry_id", "instrument_key", "candle", "partial")
+
+    def __init__(self, entry_id: str, instrument_key: str, candle: Candle1M, partial: bool = False):
+        self.entry_id = entry_id
+        self.instrument_key = instrument_key
+        self.candle = candle
+        self.partial = partial
+
+
+def candle_entry(candle: Candle1M) -> Dict[str, str | bytes]:
+    """Candle1M → XADD fields"""
+    return {"instrument_key": candle.instrument_key, "data": codec.encode_model(candle)}
+
+
+def decode_candle_entry(entry_id: Any, fields: Dict[bytes, bytes], partial: bool = False) -> Optional[CandleEvent]:
+    """XREAD / XRANGE entry → CandleEvent (decode error → None)"""
+    try:
+        data = fields[b"data"].decode()
+        candle = Candle1M.model_validate_json(data)
+    except Exception as e:
+        logger.warning(f"Skipping undecodable candle entry {entry_id}: {e}")
+        return None
+    # Stream-ல் உள்ள JSON-ஐயே SSE / ws-க்கு - re-encode இல்லை
+    candle._encoded[codec.text_codec.name] = data
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    return CandleEvent(entry_id, candle.instrument_key, candle, partial)
+
+
+def _matches(subscription: TickSubscription, instrument_key: str) -> bool:
+    return not subscription.instrument_filter or instrument_key in subscription.instrument_filter
+
+
+class CandleBus:
+    """
+    Process-wide `candles` fan-out
+
+    Reader task முதல் subscriber வரும்போது start ஆகும், கடைசி subscriber
+    போனதும் stop ஆகும். Candles minute-க்கு instrument-க்கு ஒன்று மட்டும் -
+    per-instrument index தேவையில்லை.
+
+    Usage:
+        subscription = CandleBus.subscribe(instrument_filter, "5m", partial=True)
+        try:
+            events = await subscription.get(timeout=1.0)
+        finally:
+            CandleBus.unsubscribe(subscription)
+    """
+
+    _task: Optional[asyncio.Task] = None
+    # {stream_name: subscriptions}
+    _subscriptions: Dict[str, Set[TickSubscription]] = {}
+    _streams: Dict[TickSubscription, Tuple[str, ...]] = {}
+    # {stream_name: last read id} - subscribers உள்ள streams மட்டும்
+    _last_ids: Dict[str, str | bytes] = {}
+    _stats: Dict[str, int] = {"candles": 0, "partials": 0, "deliveries": 0, "errors": 0}
+
+    @classmethod
+    def subscribe(
+        cls,
+        instrument_filter: Optional[Set[str]] = None,
+        timeframe: str = BASE_TIMEFRAME,
+        partial: bool = False
+    ) -> TickSubscription:
+        """partial=True → completed candles-உடன் forming candles-ம் (event.partial)"""
+        subscription = TickSubscription(
+            instrument_filter,
+            settings.TICK_BUS_QUEUE_SIZE,
+            settings.STREAM_SLOW_CLIENT_POLICY
+        )
+        SubscriptionManager.acquire(instrument_filter)
+        streams = (candle_stream_name(timeframe),)
+        if partial:
+            streams += (candle_stream_name(timeframe, partial=True),)
+        now_id = f"{int(time.time() * 1000)}-0"
+        for stream_name in streams:
+            # Candles sparse - "$" வைத்தால் reader அடுத்த XREAD வரை வந்தவை miss ஆகும்;
+            # IDs timestamp-based என்பதால் subscribe நேரத்தில் இருந்து read
+            cls._last_ids.setdefault(stream_name, now_id)
+            cls._subscriptions.setdefault(stream_name, set()).add(subscription)
+        cls._streams[subscription] = streams
+        cls._ensure_reader()
+        return subscription
+
+    @classmethod
+    def update_filter(cls, subscription: TickSubscription, instrument_filter: Optional[Set[str]]):
+        """Runtime filter change (/stream/ws) - queue அப்படியே இருக்கும்"""
+        SubscriptionManager.release(subscription.instrument_filter)
+        subscription.instrument_filter = instrument_filter
+        SubscriptionManager.acquire(instrument_filter)
+
+    @classmethod
+    def unsubscribe(cls, subscription: TickSubscription):
+        streams = cls._streams.pop(subscription, None)
+        if streams is None:
+            return
+        for stream_name in streams:
+            subscriptions = cls._subscriptions[stream_name]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del cls._subscriptions[stream_name]
+                cls._last_ids.pop(stream_name, None)
+        SubscriptionManager.release(subscription.instrument_filter)
+        if not cls._subscriptions and cls._task is not None:
+            cls._task.cancel()
+            cls._task = None
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return dict(
+            cls._stats,
+            running=cls._task is not None and not cls._task.done(),
+            subscribers=len(cls._streams),
+            streams={name: len(subscriptions) for name, subscriptions in cls._subscriptions.items()},
+        )
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # READER
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    def _ensure_reader(cls):
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._task = asyncio.create_task(cls._run_loop())
+
+    @classmethod
+    async def _run_loop(cls):
+        last_ids = cls._last_ids
+        while True:
+            try:
+                redis = RedisClient.get_binary_pool()
+                streams = await redis.xread(streams=dict(last_ids), count=READ_COUNT, block=1000)
+                for stream_name, messages in streams or []:
+                    if isinstance(stream_name, bytes):
+                        stream_name = stream_name.decode()
+                    partial = stream_name.startswith(PARTIAL_STREAM)
+                    for entry_id, fields in messages:
+                        if stream_name not in last_ids:
+                            break  # Stream-ன் கடைசி subscriber போய்விட்டார்
+                        last_ids[stream_name] = entry_id
+                        event = decode_candle_entry(entry_id, fields, partial)
+                        if event is not None:
+                            cls._dispatch(stream_name, event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cls._stats["errors"] += 1
+                logger.error(f"Candle bus read failed: {e}")
+                await asyncio.sleep(1)
+
+    @classmethod
+    def _dispatch(cls, stream_name: str, event: CandleEvent):
+        cls._stats["partials" if event.partial else "candles"] += 1
+        for subscription in cls._subscriptions.get(stream_name, ()):
+            if _matches(subscription, event.instrument_key):
+                subscription.put(event)
+                cls._stats["deliveries"] += 1
+
+
+class CandleSubscription:
+    """
+    CandleBus subscription + Last-Event-ID catch-up (candles stream IDs)
+
+    Usage:
+        subscription = await CandleSubscription.open(instrument_filter, last_event_id, timeframe="5m", partial=True)
+        try:
+            if subscription.resync:
+                ...
+            events = await subscription.get(timeout=1.0)
+        finally:
+            subscription.close()
+    """
+
+    def __init__(
+        self,
+        instrument_filter: Optional[Set[str]],
+        subscription: TickSubscription,
+        client: Any = None,
+        timeframe: str = BASE_TIMEFRAME
+    ):
+        self.instrument_filter = instrument_filter
+        self.timeframe = timeframe
+        self.subscription = subscription
+        self.client = client
+        self.resync: Optional[Dict[str, Any]] = None
+        self.replayed = 0
+        self._backlog: List[CandleEvent] = []
+        self._high_water: Optional[StreamId] = None
+
+    @classmethod
+    async def open(
+        cls,
+        instrument_filter: Optional[Set[str]] = None,
+        last_event_id: Optional[str] = None,
+        client: Any = None,
+        timeframe: str = BASE_TIMEFRAME,
+        partial: bool = False
+    ) -> "CandleSubscription":
+        # Subscribe first - catch-up நடக்கும்போது வரும் live candles இழக்காமல் இருக்க
+        subscription = CandleBus.subscribe(instrument_filter, timeframe, partial)
+        resumable = cls(instrument_filter, subscription, client, timeframe)
+        if client is not None:
+            client.subscription = resumable.subscription
+        resume_id = parse_stream_id(last_event_id)
+        if resume_id is not None:
+            try:
+                await resumable._catch_up(resume_id)
+            except Exception as e:
+                logger.error(f"Candle resume from {last_event_id} failed: {e}")
+                resumable.resync = {"reason": "error", "last_event_id": last_event_id}
+        return resumable
+
+    async def _catch_up(self, resume_id: StreamId):
+        last_event_id = f"{resume_id[0]}-{resume_id[1]}"
+        if int(time.time() * 1000) - resume_id[0] > settings.STREAM_RESUME_MAX_AGE_SECONDS * 1000:
+            self.resync = {
+                "reason": "too_old",
+                "last_event_id": last_event_id,
+                "max_age_seconds": settings.STREAM_RESUME_MAX_AGE_SECONDS,
+            }
+            return
+
+        max_entries = settings.STREAM_RESUME_MAX_ENTRIES
+        redis = RedisClient.get_binary_pool()
+        entries = await redis.xrange(candle_stream_name(self.timeframe), min=f"({last_event_id}", max="+", count=max_entries + 1)
+        if len(entries) > max_entries:
+            self.resync = {"reason": "too_many", "last_event_id": last_event_id, "max_entries": max_entries}
+            return
+
+        events = [
+            event for event in (decode_candle_entry(entry_id, fields) for entry_id, fields in entries)
+            if event is not None and _matches(self.subscription, event.instrument_key)
+        ]
+        self._backlog = events
+        self._high_water = parse_stream_id(entries[-1][0]) if entries else resume_id
+        self.replayed = len(events)
+
+    async def get(self, timeout: float = 1.0) -> Optional[List[CandleEvent]]:
+        """
+        Catch-up candles முதலில், பிறகு live (duplicates நீக்கி;
+        forming candles replay / dedupe இல்லாமல் அப்படியே)
+
+        Raises:
+            SlowConsumerError: disconnect policy-ல் client queue overflow
+        """
+        if self._backlog:
+            events, self._backlog = self._backlog, []
+            return events
+
+        events = await self.subscription.get(timeout)
+        if events and self.client is not None:
+            entry_id = parse_stream_id(events[-1].entry_id)
+            if entry_id is not None:
+                self.client.on_frames(entry_id[0])
+        if events is None or self._high_water is None:
+            return events
+
+        high_water = self._high_water
+        fresh = [event for event in events if event.partial or parse_stream_id(event.entry_id) > high_water]
+        if any(not event.partial for event in fresh):
+            # Stream order - முதல் புது completed candle-க்கு பிறகு duplicates இல்லை
+            self._high_water = None
+        return fresh
+
+    def close(self):
+        CandleBus.unsubscribe(self.subscription)
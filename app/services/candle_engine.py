@@ -0,0 +1,315 @@
+"""
+Candle Engine - Singleton market_feed → 1-Minute Candles
+=========================================================
+
+முன்பு ஒவ்வொரு /stream/candles client-ம் தன் சொந்த CandleAggregator வைத்து
+அதே ticks-ல் இருந்து அதே candles build பண்ணி save_candle call பண்ணியது -
+N clients = candles_json-ல் N duplicate rows.
+
+இப்போது app lifespan-ல் ஒரு engine:
+
+    market_feed ──TickBus (wildcard)──→ CandleEngine (leader மட்டும்)
+                                          │  CandleAggregator (ஒன்று, timer close + flat fill)
+                                          ├─→ CandleRollup (1m → 3m / 5m / ... / 1h)
+                                          ├─→ XADD candles, candles:{tf}  (CandleBus → clients)
+                                          ├─→ XADD candles:partial[:{tf}] (forming, throttled)
+                                          └─→ candles_json        (ஒரு முறை மட்டும், timeframe column)
+
+Leader election:
+    பல uvicorn workers-ல் ஒவ்வொன்றும் engine start பண்ணும்; Redis lock
+    (SET NX EX) பிடித்தவர் மட்டும் aggregate பண்ணுவார். Lock LOCK_RENEW_SECONDS-க்கு
+    ஒரு முறை renew; leader process போனால் LOCK_TTL_SECONDS-க்குள் இன்னொருவர்.
+
+Minute close:
+    ஒவ்வொரு loop-லும் (ticks இல்லாத 1s timeout-லும்) aggregator.close_due() -
+    minute boundary + CANDLE_CLOSE_GRACE_MS கடந்ததும் எல்லா open candles-ம்
+    ஒன்றாக close; trade இல்லாத instruments-க்கு flat candle. அடுத்த tick-க்கு
+    காத்திருக்க வேண்டாம், எல்லா instruments-ம் ஒரே timestamps.
+
+Forming candles:
+    CANDLE_PARTIAL_INTERVAL_MS-க்கு ஒரு முறை, கடைசி publish-க்கு பிறகு tick
+    வந்த instruments-ன் open candle (+ rollup timeframes) partial streams-க்கு.
+    Browser raw feed-ல் இருந்து current bar aggregate பண்ண வேண்டாம்.
+    Persist / checkpoint இல்லை; warmup replay-ல் publish இல்லை.
+
+Checkpoint:
+    கடைசியாக process ஆன market_feed entry ID Redis-ல். புது leader அந்த minute
+    தொடக்கத்தில் இருந்து replay பண்ணி open candle rebuild பண்ணும்; checkpoint
+    வரை உள்ள frames warmup (ஏற்கனவே publish ஆன candles மீண்டும் வராது).
+    Timer close ஆன கடைசி minute (CLOSED_KEY) அதே pipeline-ல் - restart-க்கு பிறகு
+    அந்த minutes மீண்டும் close / fill ஆகாது.
+    Rollup buckets, ஒவ்வொரு instrument-ன் கடைசி 1m candle (volume diff / flat
+    fill) `candles` stream-ல் இருந்து rebuild.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.models.candle import Candle1M
+from app.services.candle_aggregator import MINUTE_MS, CandleAggregator
+from app.services.candle_bus import CANDLE_STREAM, candle_entry, candle_stream_name, decode_candle_entry
+from app.services.candle_persistence import CandlePersistenceService
+from app.services.candle_rollup import CandleRollup, parse_timeframes
+from app.services.feed_decoder import FeedFrame
+from app.services.stream_resume import ResumableSubscription
+from app.services.tick_bus import POLICY_DROP
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = f"{CANDLE_STREAM}:engine:lock"
+CHECKPOINT_KEY = f"{CANDLE_STREAM}:engine:last_id"
+CLOSED_KEY = f"{CANDLE_STREAM}:engine:closed_through"
+LOCK_TTL_SECONDS = 10
+LOCK_RENEW_SECONDS = 3
+CHECKPOINT_INTERVAL = 1.0  # seconds - candles publish ஆகும் batch-ல் எப்போதும்
+QUEUE_SIZE = 20_000  # frames - engine எந்த client-ஐ விடவும் பெரிய buffer
+
+
+def candles_from_frame(
+    aggregator: CandleAggregator,
+    frame: FeedFrame,
+    instrument_filter: Optional[Set[str]] = None
+) -> List[Candle1M]:
+    """One bus frame → completed candles (gap frames open candle-ஐ close பண்ணும்)"""
+    completed: List[Candle1M] = []
+
+    # Feed gap - open candle close ஆகும், gap minutes flag ஆகும்
+    for instrument_key in frame.gap_instruments(instrument_filter):
+        candle = aggregator.mark_gap(instrument_key, frame.gap["start"], frame.gap["end"])
+        if candle:
+            completed.append(candle)
+
+    for instrument_key, tick in frame.iter_market_ticks(instrument_filter):
+        candle = aggregator.add_tick(instrument_key, tick)
+        if candle:
+            completed.append(candle)
+    return completed
+
+
+class CandleEngine:
+    """
+    Background task - app lifespan-ல் start/stop ஆகும்
+
+    Usage:
+        CandleEngine.start()       # lifespan startup
+        await CandleEngine.stop()  # lifespan shutdown
+    """
+
+    _task: Optional[asyncio.Task] = None
+    _owner: str = uuid.uuid4().hex
+    _leader: bool = False
+    _stats: Dict[str, Any] = {
+        "frames": 0,
+        "candles": 0,
+        "timer_candles": 0,
+        "partials": 0,
+        "persisted": 0,
+        "persist_errors": 0,
+        "leader_terms": 0,
+        "errors": 0,
+        "last_entry_id": None,
+    }
+
+    @classmethod
+    def start(cls):
+        if cls._task or not settings.CANDLE_ENGINE_ENABLED:
+            return
+        cls._task = asyncio.create_task(cls._run_loop())
+        logger.info("Candle engine started")
+
+    @classmethod
+    async def stop(cls):
+        if cls._task:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return dict(
+            cls._stats,
+            enabled=settings.CANDLE_ENGINE_ENABLED,
+            leader=cls._leader,
+            timeframes=parse_timeframes(settings.CANDLE_TIMEFRAMES),
+            close_grace_ms=settings.CANDLE_CLOSE_GRACE_MS,
+            gap_fill=settings.CANDLE_GAP_FILL,
+            partial_interval_ms=settings.CANDLE_PARTIAL_INTERVAL_MS,
+        )
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # LEADER ELECTION
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    async def _run_loop(cls):
+        while True:
+            try:
+                redis = RedisClient.get_binary_pool()
+                if await redis.set(LOCK_KEY, cls._owner, nx=True, ex=LOCK_TTL_SECONDS):
+                    await cls._lead(redis)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cls._stats["errors"] += 1
+                logger.error(f"Candle engine failed: {e}")
+            await asyncio.sleep(LOCK_RENEW_SECONDS)
+
+    @classmethod
+    async def _renew(cls, redis) -> bool:
+        """Lock இன்னும் நம்முடையது என்றால் TTL extend"""
+        if await redis.get(LOCK_KEY) != cls._owner.encode():
+            return False
+        await redis.expire(LOCK_KEY, LOCK_TTL_SECONDS)
+        return True
+
+    @classmethod
+    async def _release(cls, redis):
+        try:
+            if await redis.get(LOCK_KEY) == cls._owner.encode():
+                await redis.delete(LOCK_KEY)
+        except Exception as e:
+            logger.warning(f"Candle engine lock release failed: {e}")
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # AGGREGATION (leader)
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    async def _lead(cls, redis):
+        # Leader மட்டும் publish பண்ணுவதால் warm-up-க்கும் subscribe-க்கும் இடையே புது 1m candles இல்லை
+        rollup = CandleRollup(parse_timeframes(settings.CANDLE_TIMEFRAMES))
+        aggregator = CandleAggregator(gap_fill=settings.CANDLE_GAP_FILL)
+        closed_through = await redis.get(CLOSED_KEY)
+        if closed_through:
+            aggregator.closed_through = int(closed_through)
+        await cls._warm(redis, aggregator, rollup)
+
+        checkpoint = await redis.get(CHECKPOINT_KEY)
+        subscription = await ResumableSubscription.open(
+            None,
+            checkpoint.decode() if checkpoint else None,
+            rewind_minute=True,
+            maxsize=QUEUE_SIZE,
+            policy=POLICY_DROP
+        )
+        if subscription.resync:
+            logger.warning(f"Candle engine checkpoint not replayable, starting live: {subscription.resync}")
+        cls._leader = True
+        cls._stats["leader_terms"] += 1
+        logger.info(f"Candle engine is leader (resume from {checkpoint!r})")
+
+        renewed_at = checkpointed_at = partial_at = time.monotonic()
+        partial_interval = settings.CANDLE_PARTIAL_INTERVAL_MS / 1000
+        last_id = checkpoint
+        warmup = False
+        try:
+            while True:
+                frames = await subscription.get(timeout=1.0)
+
+                now = time.monotonic()
+                if now - renewed_at >= LOCK_RENEW_SECONDS:
+                    if not await cls._renew(redis):
+                        logger.warning("Candle engine lost leadership")
+                        return
+                    renewed_at = now
+
+                completed: List[Candle1M] = []
+                for frame in frames or ():
+                    candles = candles_from_frame(aggregator, frame)
+                    warmup = subscription.is_warmup(frame)
+                    if not warmup:
+                        completed.extend(candles)
+                    last_id = frame.entry_id
+                cls._stats["frames"] += len(frames or ())
+
+                # Ticks வராவிட்டாலும் minute + grace-ல் close
+                closed = aggregator.close_due(settings.CANDLE_CLOSE_GRACE_MS)
+                cls._stats["timer_candles"] += len(closed)
+                completed.extend(closed)
+                completed.extend([rolled for candle in completed for rolled in rollup.add(candle)])
+                if aggregator.closed_through is not None:
+                    # 15:15 30m / 1h - 15:30-க்கு பிறகு 1m candle வராது
+                    completed.extend(rollup.close_due(aggregator.closed_through))
+
+                if last_id is not None and (completed or now - checkpointed_at >= CHECKPOINT_INTERVAL):
+                    await cls._publish(redis, completed, last_id, aggregator.closed_through)
+                    checkpointed_at = now
+
+                if partial_interval and now - partial_at >= partial_interval:
+                    partials = aggregator.partial_candles()
+                    if partials and not warmup:
+                        partials.extend([rolled for candle in partials for rolled in rollup.partial(candle)])
+                        await cls._publish_partials(redis, partials)
+                    partial_at = now
+        finally:
+            cls._leader = False
+            subscription.close()
+            await cls._release(redis)
+
+    @classmethod
+    async def _warm(cls, redis, aggregator: CandleAggregator, rollup: CandleRollup):
+        """
+        ஏற்கனவே publish ஆன 1m candles-ல் இருந்து rebuild (emit இல்லை):
+        open rollup buckets + ஒவ்வொரு instrument-ன் கடைசி candle
+        """
+        now_ms = int(time.time() * 1000)
+        # Gap fill-ல் ஒவ்வொரு instrument-க்கும் minute-க்கு ஒரு candle - கடைசி closed minute போதும்
+        start_ms = min(rollup.earliest_bucket_ms(now_ms), aggregator.closed_through or now_ms - 2 * MINUTE_MS)
+        entries = await redis.xrange(CANDLE_STREAM, min=f"{start_ms}-0", max="+")
+        for entry_id, fields in entries:
+            event = decode_candle_entry(entry_id, fields)
+            if event is not None:
+                aggregator.seed(event.candle)
+                rollup.add(event.candle)
+        if entries:
+            logger.info(f"Candle engine warmed from {len(entries)} 1m candles ({rollup.open_buckets()} open buckets)")
+
+    @classmethod
+    async def _publish_partials(cls, redis, candles: List[Candle1M]):
+        """Forming candles → candles:partial[:{tf}] (best effort, persistence இல்லை)"""
+        maxlen = settings.CANDLE_PARTIAL_STREAM_MAXLEN or None
+        pipe = redis.pipeline(transaction=False)
+        for candle in candles:
+            pipe.xadd(
+                candle_stream_name(candle.timeframe, partial=True),
+                candle_entry(candle),
+                maxlen=maxlen,
+                approximate=True
+            )
+        await pipe.execute()
+        cls._stats["partials"] += len(candles)
+
+    @classmethod
+    async def _publish(cls, redis, candles: List[Candle1M], last_id: Any, closed_through: Optional[int] = None):
+        """XADD candles / candles:{tf} + checkpoint ஒரே pipeline, பிறகு candles_json (ஒரு முறை)"""
+        maxlen = settings.CANDLE_STREAM_MAXLEN or None
+        pipe = redis.pipeline(transaction=False)
+        for candle in candles:
+            pipe.xadd(candle_stream_name(candle.timeframe), candle_entry(candle), maxlen=maxlen, approximate=True)
+        pipe.set(CHECKPOINT_KEY, last_id)
+        if closed_through is not None:
+            pipe.set(CLOSED_KEY, closed_through)
+        await pipe.execute()
+
+        cls._stats["last_entry_id"] = last_id.decode() if isinstance(last_id, bytes) else last_id
+        if not candles:
+            return
+        cls._stats["candles"] += len(candles)
+
+        try:
+            await CandlePersistenceService.save_candles_batch(candles)
+            cls._stats["persisted"] += len(candles)
+        except Exception as e:
+            # Postgres down - stream clients பாதிக்கப்படக்கூடாது
+            cls._stats["persist_errors"] += len(candles)
+            logger.error(f"Candle persistence failed ({len(candles)} candles): {e}")
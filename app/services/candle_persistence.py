@@ -1,7 +1,7 @@
-import json
 from datetime import datetime
 from app.models.candle import Candle1M
 from app.db.postgres import PostgresClient
+from app.services import codec
 
 class CandlePersistenceService:
     """
@@ -11,24 +11,25 @@ class CandlePersistenceService:
     @staticmethod
     async def save_candle(candle: Candle1M):
         """
-        Save a single candle to candles_json table as JSONB
+        Save a single candle (any timeframe) to candles_json table as JSONB
         """
         pool = PostgresClient.get_pool()
         
-        # Serialize Pydantic model to dict, handling datetime
-        candle_data = candle.model_dump(mode='json')
+        # Encoded once per candle - SSE / ws clients reuse the same payload
+        candle_data = codec.encode_model(candle)
         
         query = """
-            INSERT INTO candles_json (instrument_key, timestamp, data)
-            VALUES ($1, $2, $3)
+            INSERT INTO candles_json (instrument_key, timeframe, timestamp, data)
+            VALUES ($1, $2, $3, $4)
         """
         
         async with pool.acquire() as conn:
             await conn.execute(
                 query,
                 candle.instrument_key,
+                candle.timeframe,
                 candle.timestamp,
-                json.dumps(candle_data)
+                candle_data
             )
 
     @staticmethod
@@ -41,12 +42,12 @@ class CandlePersistenceService:
 
         pool = PostgresClient.get_pool()
         query = """
-            INSERT INTO candles_json (instrument_key, timestamp, data)
-            VALUES ($1, $2, $3)
+            INSERT INTO candles_json (instrument_key, timeframe, timestamp, data)
+            VALUES ($1, $2, $3, $4)
         """
         
         values = [
-            (c.instrument_key, c.timestamp, json.dumps(c.model_dump(mode='json')))
+            (c.instrument_key, c.timeframe, c.timestamp, codec.encode_model(c))
             for c in candles
         ]
         
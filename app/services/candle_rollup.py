@@ -0,0 +1,282 @@
+"""
+Candle Rollup - Completed 1m Candles → Higher Timeframes
+=========================================================
+
+CandleEngine ஒவ்வொரு completed 1m candle-ஐயும் இங்கே fold பண்ணும் -
+raw ticks மீண்டும் process ஆகாது. Timeframe-க்கு instrument-க்கு ஒரு
+RollupState (first / last 1m candle + running high/low) மட்டும்.
+
+Timeframes (CANDLE_TIMEFRAMES):
+    "3m", "5m", "15m", "30m", "1h"  → minutes / hours
+
+Bucket alignment (IST, NSE session open 09:15):
+    5m   → 09:15, 09:20, ...
+    30m  → 09:15, 09:45, ...      (Upstox 30minute candles-உடன் match)
+    1h   → 09:15, 10:15, ...
+
+Close:
+    Bucket end = min(bucket start + timeframe, 15:30 IST) - 15:15 30m / 1h
+    bucket-ன் கடைசி minute 15:29.
+    Bucket-ன் கடைசி minute candle வந்ததும் உடனே; அந்த minute வராமல்
+    அடுத்த bucket candle வந்தால் அப்போது, அல்லது 1m timer அந்த end-ஐ
+    தாண்டியதும் (close_due - missing minutes / session close).
+
+Forming:
+    partial() - open bucket + forming 1m candle → forming timeframe candle
+    (candle_partial events); rollup state மாறாது.
+
+Diff fields (bucket open → close):
+    Opening value = first 1m candle's value - அதன் diff
+    (delta, theta, gamma, vega, rho, atp, oi, iv, tbq, tsq, spread)
+    volume_1m   → bucket-ன் 1m candles volume_1m sum (1m bars-ன் total-உடன் எப்போதும் match)
+    volume_diff → அதே timeframe-ன் முந்தைய candle-உடன்
+
+Author: Antony HFT System
+"""
+
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from app.models.candle import Candle1M
+from app.services.candle_aggregator import (
+    DAY_MS, IST_OFFSET_MS, MINUTE_MS, SESSION_CLOSE_MS, SESSION_OPEN_MS, ms_to_datetime
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_TIMEFRAME = "1m"
+
+
+def timeframe_minutes(timeframe: str) -> int:
+    """
+    "5m" → 5, "1h" → 60
+
+    Raises:
+        ValueError: unknown format
+    """
+    unit = timeframe[-1:]
+    try:
+        value = int(timeframe[:-1])
+    except ValueError:
+        value = 0
+    if value <= 0 or unit not in ("m", "h"):
+        raise ValueError(f"Invalid timeframe '{timeframe}' (expected e.g. 5m, 1h)")
+    return value * 60 if unit == "h" else value
+
+
+def parse_timeframes(spec: str) -> List[str]:
+    """CANDLE_TIMEFRAMES "3m,5m,1h" → validated rollup timeframes (1m / invalid skip)"""
+    timeframes = []
+    for timeframe in (tf.strip() for tf in spec.split(",")):
+        if not timeframe or timeframe == BASE_TIMEFRAME:
+            continue
+        try:
+            timeframe_minutes(timeframe)
+        except ValueError as e:
+            logger.warning(f"Skipping candle timeframe: {e}")
+            continue
+        if timeframe not in timeframes:
+            timeframes.append(timeframe)
+    return timeframes
+
+
+def bucket_start_ms(minute_ms: int, minutes: int) -> int:
+    """Minute timestamp → session-aligned bucket start (ms)"""
+    size = minutes * MINUTE_MS
+    local = minute_ms + IST_OFFSET_MS - SESSION_OPEN_MS
+    return minute_ms - local % size
+
+
+def bucket_end_ms(bucket_ms: int, minutes: int) -> int:
+    """Bucket end (exclusive) - session-க்குள் தொடங்கிய bucket 15:30-ஐ தாண்டாது"""
+    end_ms = bucket_ms + minutes * MINUTE_MS
+    session_close = bucket_ms - (bucket_ms + IST_OFFSET_MS) % DAY_MS + SESSION_CLOSE_MS
+    if bucket_ms < session_close:
+        return min(end_ms, session_close)
+    return end_ms
+
+
+def candle_minute_ms(candle: Candle1M) -> int:
+    return int(candle.timestamp.timestamp() * 1000)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ROLLUP STATE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class RollupState:
+    """One instrument's open bucket for one timeframe"""
+
+    __slots__ = ("bucket_ms", "first", "last", "high", "low", "volume", "gap")
+
+    def __init__(self, bucket_ms: int, candle: Candle1M):
+        self.bucket_ms = bucket_ms
+        self.first = candle
+        self.last = candle
+        self.high = candle.high
+        self.low = candle.low
+        self.volume = candle.volume_1m
+        self.gap = candle.gap
+
+    def update(self, candle: Candle1M):
+        self.last = candle
+        if candle.high > self.high:
+            self.high = candle.high
+        if candle.low < self.low:
+            self.low = candle.low
+        self.volume += candle.volume_1m
+        self.gap = self.gap or candle.gap
+
+    def extended(self, candle: Candle1M) -> "RollupState":
+        """இந்த bucket + இன்னும் ஒரு (forming) 1m candle - self மாறாது"""
+        state = RollupState(self.bucket_ms, self.first)
+        state.high = self.high
+        state.low = self.low
+        state.volume = self.volume
+        state.gap = self.gap
+        state.update(candle)
+        return state
+
+    def to_candle(self, timeframe: str, prev_volume: int = 0) -> Candle1M:
+        first = self.first
+        last = self.last
+        open_greeks = first.greeks
+        volume = self.volume
+        open_spread = first.bid_ask.spread - first.spread_diff
+
+        # Close-side fields (bid_ask, greeks, atp, vtt, oi, iv, tbq, tsq, prev_close) last minute-ல் இருந்து
+        candle = last.model_copy(update={
+            "timeframe": timeframe,
+            "timestamp": ms_to_datetime(self.bucket_ms),
+            "open": first.open,
+            "high": self.high,
+            "low": self.low,
+            "price_diff": round(last.close - first.open, 2),
+            "spread_diff": round(last.bid_ask.spread - open_spread, 2),
+            "delta_diff": round(last.greeks.delta - (open_greeks.delta - first.delta_diff), 4),
+            "theta_diff": round(last.greeks.theta - (open_greeks.theta - first.theta_diff), 4),
+            "gamma_diff": round(last.greeks.gamma - (open_greeks.gamma - first.gamma_diff), 6),
+            "vega_diff": round(last.greeks.vega - (open_greeks.vega - first.vega_diff), 4),
+            "rho_diff": round(last.greeks.rho - (open_greeks.rho - first.rho_diff), 4),
+            "atp_diff": round(last.atp - (first.atp - first.atp_diff), 2),
+            "volume_1m": volume,
+            "volume_diff": volume - prev_volume if prev_volume > 0 else 0,
+            "oi_diff": last.oi - (first.oi - first.oi_diff),
+            "iv_diff": round(last.iv - (first.iv - first.iv_diff), 6),
+            "tbq_diff": last.tbq - (first.tbq - first.tbq_diff),
+            "tsq_diff": last.tsq - (first.tsq - first.tsq_diff),
+            "gap": self.gap,
+        })
+        # model_copy private attrs share பண்ணும் - rollup-க்கு தனி encode cache
+        candle._encoded = {}
+        return candle
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ROLLUP
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CandleRollup:
+    """
+    Incremental 1m → N timeframes
+
+    Usage:
+        rollup = CandleRollup(["5m", "15m"])
+        for candle in completed_1m:
+            for rolled in rollup.add(candle):
+                publish(rolled)          # rolled.timeframe == "5m" / "15m"
+    """
+
+    def __init__(self, timeframes: Iterable[str]):
+        self.timeframes: List[Tuple[str, int]] = [(tf, timeframe_minutes(tf)) for tf in timeframes]
+        self._minutes: Dict[str, int] = dict(self.timeframes)
+        # {(timeframe, instrument_key): open bucket}
+        self._states: Dict[Tuple[str, str], RollupState] = {}
+        # {(timeframe, instrument_key): last completed candle volume}
+        self._last_volume: Dict[Tuple[str, str], int] = {}
+
+    def _close(self, key: Tuple[str, str], state: RollupState) -> Candle1M:
+        candle = state.to_candle(key[0], self._last_volume.get(key, 0))
+        self._last_volume[key] = candle.volume_1m
+        return candle
+
+    def add(self, candle: Candle1M) -> List[Candle1M]:
+        """
+        Completed 1m candle → closed higher-timeframe candles (may be empty)
+        """
+        minute_ms = candle_minute_ms(candle)
+        completed: List[Candle1M] = []
+
+        for timeframe, minutes in self.timeframes:
+            key = (timeframe, candle.instrument_key)
+            bucket_ms = bucket_start_ms(minute_ms, minutes)
+            state = self._states.get(key)
+
+            if state is not None and bucket_ms < state.bucket_ms:
+                # Closed bucket-க்கான late candle
+                continue
+            if state is not None and bucket_ms > state.bucket_ms:
+                # Bucket-ன் கடைசி minute(s) வரவில்லை - இருப்பதை வைத்து close
+                completed.append(self._close(key, state))
+                state = None
+
+            if state is None:
+                state = RollupState(bucket_ms, candle)
+                self._states[key] = state
+            else:
+                state.update(candle)
+
+            if minute_ms + MINUTE_MS >= bucket_end_ms(bucket_ms, minutes):
+                del self._states[key]
+                completed.append(self._close(key, state))
+
+        return completed
+
+    def close_due(self, closed_through: int) -> List[Candle1M]:
+        """
+        1m timer closed_through minute வரை close பண்ணிவிட்டது - அதற்குள்
+        முடிந்த buckets-ஐ close (கடைசி minute candle வராத instruments, session close)
+        """
+        due = [
+            key for key, state in self._states.items()
+            if bucket_end_ms(state.bucket_ms, self._minutes[key[0]]) <= closed_through + MINUTE_MS
+        ]
+        return [self._close(key, self._states.pop(key)) for key in due]
+
+    def partial(self, candle: Candle1M) -> List[Candle1M]:
+        """
+        Forming 1m candle → forming higher-timeframe candles (rollup state மாறாது)
+        """
+        minute_ms = candle_minute_ms(candle)
+        partials: List[Candle1M] = []
+
+        for timeframe, minutes in self.timeframes:
+            key = (timeframe, candle.instrument_key)
+            bucket_ms = bucket_start_ms(minute_ms, minutes)
+            state = self._states.get(key)
+
+            if state is not None and bucket_ms < state.bucket_ms:
+                continue
+            if state is None or bucket_ms > state.bucket_ms:
+                state = RollupState(bucket_ms, candle)
+            else:
+                state = state.extended(candle)
+            partials.append(state.to_candle(timeframe, self._last_volume.get(key, 0)))
+
+        return partials
+
+    def flush_all(self) -> List[Candle1M]:
+        """Open buckets → candles (market close)"""
+        completed = [self._close(key, state) for key, state in self._states.items()]
+        self._states.clear()
+        return completed
+
+    def open_buckets(self) -> int:
+        return len(self._states)
+
+    def earliest_bucket_ms(self, now_ms: int) -> int:
+        """Longest timeframe-ன் current bucket start - warm-up இங்கிருந்து"""
+        if not self.timeframes:
+            return now_ms
+        minutes = max(minutes for _, minutes in self.timeframes)
+        return bucket_start_ms(now_ms - now_ms % MINUTE_MS, minutes)
@@ -0,0 +1,174 @@
+"""
+Codec - Pluggable Serialization for Streams and Persistence
+============================================================
+
+Hot paths (ingest JSON entries, SSE generators, VWAP stream, candle
+persistence, /stream/ws) எல்லாம் இங்கே வழியாக serialize பண்ணும்.
+Backend config-ல் மாற்றலாம்; call sites மாறாது.
+
+Backends:
+    json     → stdlib (default fallback, எப்போதும் இருக்கும்)
+    orjson   → Rust JSON, same wire format (compact separators)
+    msgpack  → binary (/stream/ws?format=msgpack)
+
+Config:
+    CODEC=auto | json | orjson     SSE / Redis JSON entries / JSONB text
+    auto → orjson installed ஆனால் அது, இல்லையென்றால் json
+
+Encode-once:
+    FeedFrame.encoded(...)   → frame payloads, எல்லா clients-க்கும் ஒரு முறை
+    encode_model(candle)     → model-லேயே cache (SSE + persistence + ws share)
+
+Optional dependencies:
+    uv sync --extra stream
+
+Benchmark: scripts/bench_codecs.py
+
+Author: Antony HFT System
+"""
+
+import json
+import logging
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BACKENDS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class JsonCodec:
+    """stdlib json - text"""
+
+    name = "json"
+    binary = False
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+    def dumps_model(self, model: BaseModel) -> str:
+        # pydantic-core serializer - model_dump() + json.dumps-ஐ விட வேகம்
+        return model.model_dump_json()
+
+
+class OrjsonCodec:
+    """orjson - text, compact separators"""
+
+    name = "orjson"
+    binary = False
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, data: str | bytes) -> Any:
+        return orjson.loads(data)
+
+    def dumps_model(self, model: BaseModel) -> str:
+        return model.model_dump_json()
+
+
+class MsgpackCodec:
+    """msgpack - binary"""
+
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        self.packer = msgpack.Packer()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.packer.pack(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data)
+
+    def dumps_model(self, model: BaseModel) -> bytes:
+        return self.packer.pack(model.model_dump(mode="json"))
+
+
+_CODECS: Dict[str, Any] = {"json": JsonCodec()}
+if HAS_ORJSON:
+    _CODECS["orjson"] = OrjsonCodec()
+if HAS_MSGPACK:
+    _CODECS["msgpack"] = MsgpackCodec()
+
+
+def available_codecs() -> List[str]:
+    return list(_CODECS)
+
+
+def get_codec(name: str) -> Any:
+    """
+    Raises:
+        ValueError: backend இந்த environment-ல் install ஆகவில்லை
+    """
+    codec = _CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Codec '{name}' not available. Available: {available_codecs()}")
+    return codec
+
+
+def _resolve_text_codec() -> Any:
+    name = settings.CODEC
+    if name == "auto":
+        return _CODECS["orjson"] if HAS_ORJSON else _CODECS["json"]
+    codec = _CODECS.get(name)
+    if codec is None or codec.binary:
+        logger.warning(f"CODEC={name} unavailable or not a text codec, falling back to json")
+        return _CODECS["json"]
+    return codec
+
+
+# Import நேரத்தில் ஒரு முறை - per-call settings lookup இல்லை
+text_codec = _resolve_text_codec()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HOT PATH HELPERS - configured text codec
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def dumps(obj: Any) -> str:
+    return text_codec.dumps(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    return text_codec.loads(data)
+
+
+def encode_model(model: BaseModel, codec: Any = None) -> str | bytes:
+    """
+    Pydantic model → encoded payload, model-லேயே cache (codec வாரியாக)
+
+    ஒரே candle-ஐ SSE, /stream/ws, persistence எல்லாம் share பண்ணும் -
+    model_dump_json ஒரு முறை மட்டும். Model-ல் `_encoded` private attr
+    இல்லை என்றால் cache இல்லாமல் encode.
+    """
+    codec = codec or text_codec
+    cache = getattr(model, "_encoded", None)
+    if cache is None:
+        return codec.dumps_model(model)
+    encoded = cache.get(codec.name)
+    if encoded is None:
+        encoded = codec.dumps_model(model)
+        cache[codec.name] = encoded
+    return encoded
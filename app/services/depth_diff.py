@@ -0,0 +1,303 @@
+"""
+Depth Diff Engine - Price-Level Deltas Instead of Full 30-Level Books
+======================================================================
+
+full_d30 tick ஒவ்வொன்றும் 30 bid + 30 ask levels முழுசா அனுப்பும்; பெரும்பாலான
+levels மாறியிருக்காது. /stream/live?depth=delta-ல் மாறிய levels மட்டும்:
+
+    bids / asks: [[price, qty], ...]    qty 0 → level delete
+                                        மற்றவை → insert / update
+
+Sequencing (per instrument, process-wide):
+    seq       → இந்த update-ன் number
+    prev_seq  → இதற்கு முந்தைய update (client-ன் last seq == prev_seq இல்லை → gap)
+    snapshot  → true எனில் bids/asks முழு book (delta இல்லை)
+
+    DEPTH_SNAPSHOT_EVERY updates-க்கு ஒரு முறை engine தானே full snapshot
+    அனுப்பும். Client-க்கு gap ஆனால் (queue drop / புது client) server அந்த
+    client-க்கு மட்டும் snapshot அனுப்பும். HTTP resync: GET /stream/depth.
+
+Engine ஒரு frame-ஐ ஒரு முறை மட்டும் apply பண்ணும் (FeedFrame.encoded cache);
+அதே frame-ஐ பெறும் எல்லா delta clients-ம் அதே DepthUpdate share பண்ணும்.
+Book மாறவில்லை என்றால் அந்த instrument-ன் last update திரும்ப வரும் - அதே
+content வேறு FeedFrame object-ஆக (combined + shard stream) வந்தாலும் அந்த
+client-க்கு update போகும்; ஏற்கனவே அந்த seq பெற்ற cursor skip பண்ணும்.
+
+Unsubscribe ஆன instruments-ன் book evict (FeedService.unsubscribe);
+திரும்ப subscribe ஆனால் seq அங்கிருந்து தொடரும் (snapshot).
+
+Author: Antony HFT System
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.services import codec
+from app.core.config import settings
+from app.services.feed_decoder import FeedFrame
+
+Levels = Dict[float, int]
+
+
+def _sorted_levels(levels: Levels, descending: bool) -> List[List[float]]:
+    return [[price, qty] for price, qty in sorted(levels.items(), reverse=descending)]
+
+
+def _diff_levels(old: Levels, new: Levels) -> List[List[float]]:
+    changes = [[price, qty] for price, qty in new.items() if old.get(price) != qty]
+    changes.extend([price, 0] for price in old if price not in new)
+    return changes
+
+
+class DepthUpdate:
+    """
+    One instrument's book change for one frame
+
+    bids/asks dicts அந்த seq-ன் முழு book - engine புது dicts உருவாக்கும்,
+    mutate பண்ணாது, அதனால் பின்னால் snapshot எடுத்தாலும் சரியான state.
+    """
+
+    __slots__ = (
+        "instrument_key", "seq", "prev_seq", "is_snapshot",
+        "bid_changes", "ask_changes", "bids", "asks", "_delta_json", "_snapshot_json",
+    )
+
+    def __init__(
+        self,
+        instrument_key: str,
+        seq: int,
+        prev_seq: int,
+        is_snapshot: bool,
+        bid_changes: List[List[float]],
+        ask_changes: List[List[float]],
+        bids: Levels,
+        asks: Levels
+    ):
+        self.instrument_key = instrument_key
+        self.seq = seq
+        self.prev_seq = prev_seq
+        self.is_snapshot = is_snapshot
+        self.bid_changes = bid_changes
+        self.ask_changes = ask_changes
+        self.bids = bids
+        self.asks = asks
+        self._delta_json: Optional[str] = None
+        self._snapshot_json: Optional[str] = None
+
+    def snapshot_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "prev_seq": self.prev_seq,
+            "snapshot": True,
+            "bids": _sorted_levels(self.bids, descending=True),
+            "asks": _sorted_levels(self.asks, descending=False),
+        }
+
+    def snapshot_json(self) -> str:
+        if self._snapshot_json is None:
+            self._snapshot_json = codec.dumps(self.snapshot_dict())
+        return self._snapshot_json
+
+    def delta_json(self) -> str:
+        """Engine snapshot interval-ல் இது full book; மற்றபடி changes மட்டும்"""
+        if self.is_snapshot:
+            return self.snapshot_json()
+        if self._delta_json is None:
+            self._delta_json = codec.dumps({
+                "seq": self.seq,
+                "prev_seq": self.prev_seq,
+                "bids": self.bid_changes,
+                "asks": self.ask_changes,
+            })
+        return self._delta_json
+
+
+# Frame cache-ல் "no depth / no change" — None cache ஆகாது என்பதால் sentinel
+NO_UPDATE = DepthUpdate("", 0, 0, False, [], [], {}, {})
+
+
+class DepthDiffEngine:
+    """
+    Process-wide last book per instrument
+
+    Usage:
+        update = DepthDiffEngine.update(frame, instrument_key)
+        if update is not None:
+            payload = update.delta_json()
+    """
+
+    _books: Dict[str, DepthUpdate] = {}
+    # Evict ஆன instruments-ன் last seq - பழைய cursors புது book-ஐ delta-ஆக எடுக்காது
+    _evicted_seq: Dict[str, int] = {}
+    _stats: Dict[str, int] = {"updates": 0, "snapshots": 0, "levels_sent": 0, "levels_total": 0}
+
+    @classmethod
+    def update(cls, frame: FeedFrame, instrument_key: str) -> Optional[DepthUpdate]:
+        """
+        Frame-ன் book-ஐ apply (ஒரு frame-க்கு ஒரு முறை)
+
+        Returns:
+            DepthUpdate (book மாறவில்லை → last update), or None if the feed has no depth
+        """
+        update = frame.encoded(("depth", instrument_key), lambda: cls._apply(frame, instrument_key))
+        return None if update is NO_UPDATE else update
+
+    @classmethod
+    def _apply(cls, frame: FeedFrame, instrument_key: str) -> DepthUpdate:
+        tick = frame.market_tick(instrument_key)
+        if tick is None or not tick.bid_ask_quote:
+            return NO_UPDATE
+
+        bids: Levels = {}
+        asks: Levels = {}
+        for quote in tick.bid_ask_quote:
+            if quote.bidP > 0 and quote.bidQ > 0:
+                bids[quote.bidP] = quote.bidQ
+            if quote.askP > 0 and quote.askQ > 0:
+                asks[quote.askP] = quote.askQ
+
+        previous = cls._books.get(instrument_key)
+        if previous is None:
+            seq = cls._evicted_seq.pop(instrument_key, 0) + 1
+            is_snapshot = True
+            bid_changes = ask_changes = []
+        else:
+            bid_changes = _diff_levels(previous.bids, bids)
+            ask_changes = _diff_levels(previous.asks, asks)
+            if not bid_changes and not ask_changes:
+                return previous
+            seq = previous.seq + 1
+            is_snapshot = settings.DEPTH_SNAPSHOT_EVERY > 0 and seq % settings.DEPTH_SNAPSHOT_EVERY == 0
+
+        update = DepthUpdate(
+            instrument_key, seq, seq - 1, is_snapshot,
+            bid_changes, ask_changes, bids, asks
+        )
+        cls._books[instrument_key] = update
+
+        stats = cls._stats
+        stats["updates"] += 1
+        stats["levels_total"] += len(bids) + len(asks)
+        if is_snapshot:
+            stats["snapshots"] += 1
+            stats["levels_sent"] += len(bids) + len(asks)
+        else:
+            stats["levels_sent"] += len(bid_changes) + len(ask_changes)
+        return update
+
+    @classmethod
+    def get_update(cls, instrument_key: str) -> Optional[DepthUpdate]:
+        """Instrument-ன் current book (last update)"""
+        return cls._books.get(instrument_key)
+
+    @classmethod
+    def evict(cls, instrument_keys: Iterable[str]):
+        """Feed-ல் இருந்து போன instruments-ன் books நீக்கு"""
+        for key in instrument_keys:
+            update = cls._books.pop(key, None)
+            if update is not None:
+                cls._evicted_seq[key] = update.seq
+
+    @classmethod
+    def get_books(cls, instrument_keys: Optional[Set[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Current full books - HTTP resync (GET /stream/depth)"""
+        return {
+            key: update.snapshot_dict()
+            for key, update in cls._books.items()
+            if not instrument_keys or key in instrument_keys
+        }
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(cls._stats, instruments=len(cls._books))
+        if stats["levels_total"]:
+            stats["levels_saved_pct"] = round(100 * (1 - stats["levels_sent"] / stats["levels_total"]), 1)
+        return stats
+
+
+class DepthDeltaCursor:
+    """
+    One client's last delivered seq per instrument
+
+    Gap (queue drop / புது instrument) → அந்த client-க்கு snapshot.
+    """
+
+    __slots__ = ("last_seq", "resyncs")
+
+    def __init__(self):
+        self.last_seq: Dict[str, int] = {}
+        self.resyncs = 0
+
+    def depth_json(self, update: DepthUpdate) -> Optional[str]:
+        """Delta / snapshot payload, or None if this client already has update.seq"""
+        last = self.last_seq.get(update.instrument_key)
+        if last == update.seq:
+            return None
+        self.last_seq[update.instrument_key] = update.seq
+        if last is not None and last == update.prev_seq:
+            return update.delta_json()
+        if last is not None:
+            self.resyncs += 1
+        return update.snapshot_json()
+
+
+def strip_depth(feed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Feed dict without marketFF.marketLevel (shallow copies - cached
+    feed_dict mutate ஆகாது)
+    """
+    market_ff = feed.get("fullFeed", {}).get("marketFF")
+    if not market_ff or "marketLevel" not in market_ff:
+        return feed
+    market_ff = {k: v for k, v in market_ff.items() if k != "marketLevel"}
+    full_feed = dict(feed["fullFeed"], marketFF=market_ff)
+    return dict(feed, fullFeed=full_feed)
+
+
+def _stripped_json(frame: FeedFrame, instrument_key: str) -> str:
+    feed = frame.feed_dict(instrument_key)
+    stripped = strip_depth(feed)
+    return frame.feed_json(instrument_key) if stripped is feed else codec.dumps(stripped)
+
+
+def delta_payload(frame: FeedFrame, instrument_filter: Optional[Set[str]], cursor: DepthDeltaCursor) -> Optional[str]:
+    """
+    /stream/live?depth=delta payload - legacy shape, ஒவ்வொரு feed-லும்
+    marketLevel நீக்கி "depth" (delta / snapshot) சேர்க்கும்
+
+    Returns:
+        JSON string, or None if filter matched nothing
+    """
+    keys = frame.filtered_keys(instrument_filter)
+    if instrument_filter and not keys:
+        return None
+
+    fragments = []
+    for key in keys:
+        fragment = frame.encoded(("nodepth", key), lambda: _stripped_json(frame, key))
+        # Depth மாறவில்லை (client-க்கு ஏற்கனவே போனது) → "depth" key-யே இல்லை
+        update = DepthDiffEngine.update(frame, key)
+        depth = cursor.depth_json(update) if update is not None else None
+        if depth is not None:
+            fragment = f'{fragment[:-1]}, "depth": {depth}}}'
+        fragments.append(f"{codec.dumps(key)}: {fragment}")
+
+    header = frame.header_json()
+    prefix = header[:-1] + ", " if len(header) > 2 else "{"
+    return f'{prefix}"feeds": {{{", ".join(fragments)}}}}}'
+
+
+def snapshot_fragment(cursor: DepthDeltaCursor):
+    """
+    QuoteCache.snapshot_json fragment - ?depth=delta connect snapshot
+
+    marketLevel நீக்கி engine-ன் current book (cursor-ஐ அந்த seq-க்கு prime);
+    அடுத்த live update-லிருந்து deltas.
+    """
+    def fragment(instrument_key: str, frame: FeedFrame) -> str:
+        feed = frame.encoded(("nodepth", instrument_key), lambda: _stripped_json(frame, instrument_key))
+        update = DepthDiffEngine.get_update(instrument_key)
+        depth = cursor.depth_json(update) if update is not None else None
+        if depth is None:
+            return feed
+        return f'{feed[:-1]}, "depth": {depth}}}'
+    return fragment
@@ -0,0 +1,220 @@
+"""
+Feed Connection - One Upstox Market Data WebSocket
+===================================================
+
+FeedService இந்த connections-ஐ pool-ஆக manage பண்ணும். Instrument keys
+connections முழுவதும் shard ஆகும்; ஒவ்வொரு connection-ம் தன் சொந்த
+receive loop run பண்ணும், ஆனால் எல்லாம் ஒரே FeedStreamWriter queue-க்கு
+submit பண்ணும் (merged tick pipeline).
+
+Supervision:
+    Socket drop ஆனா connection தானே reconnect பண்ணும் -
+    jittered exponential backoff → fresh authorized URL → on_connect
+    callback (FeedService subscriptions replay + gap marker).
+    Down ஆக இருந்த interval gap-ஆக record ஆகும்.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import json
+import logging
+import random
+import ssl
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import websockets
+
+from app.core.config import settings
+from app.services.feed_recorder import FeedRecorder
+from app.services.feed_writer import FeedStreamWriter
+
+logger = logging.getLogger(__name__)
+
+GAP_HISTORY = 50  # per-connection gap intervals kept for /feed/status
+STABLE_SECONDS = 5.0  # connection lived this long → backoff resets
+
+# (connection, gap) → None; gap = (start_ms, end_ms) after a reconnect
+ConnectCallback = Callable[["FeedConnection", Optional[Tuple[int, int]]], Awaitable[None]]
+
+
+def reconnect_delay(attempt: int) -> float:
+    """
+    Jittered exponential backoff (seconds)
+
+    attempt 0 → 0.25-0.5s, 1 → 0.5-1s, ... capped at FEED_RECONNECT_MAX_MS
+    Half fixed + half random - பல connections ஒரே நேரத்தில் retry பண்ணாது.
+    """
+    ceiling = min(settings.FEED_RECONNECT_MAX_MS, settings.FEED_RECONNECT_BASE_MS * (2 ** attempt))
+    return (ceiling / 2 + random.uniform(0, ceiling / 2)) / 1000
+
+
+class FeedConnection:
+    """
+    Single market-data socket + its share of the subscriptions
+
+    Health:
+        connected, subscriptions count, messages received,
+        last message age, errors, disconnects, reconnects, downtime
+    """
+
+    def __init__(self, index: int, on_connect: Optional[ConnectCallback] = None):
+        self.index = index
+        self.websocket = None
+        self.task: Optional[asyncio.Task] = None
+        self.running = False
+        self.subscriptions: Set[str] = set()
+        self._on_connect = on_connect
+
+        # Health counters
+        self.connected_at: Optional[float] = None
+        self.last_message_at: Optional[float] = None
+        self.messages = 0
+        self.errors = 0
+        self.disconnects = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+
+        # Gap accounting - down_since set only after the socket has been up once
+        self.down_since: Optional[float] = None
+        self.total_downtime = 0.0
+        self.gaps: Deque[Tuple[int, int]] = deque(maxlen=GAP_HISTORY)
+
+    @property
+    def name(self) -> str:
+        return f"feed-{self.index}"
+
+    def is_connected(self) -> bool:
+        return self.running and self.websocket is not None
+
+    def start(self, url_provider: Callable[[], Awaitable[str]]):
+        """url_provider - ஒவ்வொரு (re)connect-க்கும் fresh authorized URL"""
+        self.running = True
+        self.task = asyncio.create_task(self._supervise(url_provider))
+
+    async def stop(self):
+        self.running = False
+        if self.websocket:
+            await self.websocket.close()
+            self.websocket = None
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def send(self, method: str, instrument_keys: List[str], mode: Optional[str] = None):
+        """sub / unsub request on this socket"""
+        if not self.is_connected():
+            raise RuntimeError(f"{self.name} is not connected")
+
+        data: Dict[str, Any] = {"instrumentKeys": instrument_keys}
+        if mode:
+            data["mode"] = mode
+
+        payload = {
+            "guid": str(uuid.uuid4()),
+            "method": method,
+            "data": data
+        }
+        await self.websocket.send(json.dumps(payload).encode('utf-8'))
+
+    def downtime_seconds(self) -> float:
+        """Closed gaps + the current outage (if down)"""
+        current = time.time() - self.down_since if self.down_since else 0.0
+        return self.total_downtime + current
+
+    def health(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "name": self.name,
+            "connected": self.is_connected(),
+            "subscriptions": len(self.subscriptions),
+            "messages": self.messages,
+            "errors": self.errors,
+            "disconnects": self.disconnects,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+            "down_since": self.down_since,
+            "downtime_seconds": round(self.downtime_seconds(), 3),
+            "gaps": [{"start": start, "end": end} for start, end in self.gaps],
+            "uptime_seconds": round(now - self.connected_at, 1) if self.connected_at and self.is_connected() else 0,
+            "last_message_age_seconds": round(now - self.last_message_at, 3) if self.last_message_at else None,
+        }
+
+    def _close_gap(self) -> Optional[Tuple[int, int]]:
+        if self.down_since is None:
+            return None
+        now = time.time()
+        gap = (int(self.down_since * 1000), int(now * 1000))
+        self.total_downtime += now - self.down_since
+        self.down_since = None
+        self.gaps.append(gap)
+        return gap
+
+    async def _supervise(self, url_provider: Callable[[], Awaitable[str]]):
+        attempt = 0
+        while self.running:
+            previous_connect = self.connected_at
+            try:
+                ws_url = await url_provider()
+                await self._run_loop(ws_url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                logger.error(f"{self.name}: WebSocket connection error: {e}")
+
+            if not self.running:
+                break
+
+            # Socket stayed up for a while - start the backoff over
+            if self.connected_at != previous_connect and time.time() - self.connected_at > STABLE_SECONDS:
+                attempt = 0
+
+            delay = reconnect_delay(attempt)
+            attempt += 1
+            logger.warning(f"{self.name}: reconnecting in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def _run_loop(self, ws_url: str):
+        # ws:// (mock feed) - no TLS
+        ssl_context = ssl.create_default_context() if ws_url.startswith("wss://") else None
+
+        try:
+            async with websockets.connect(ws_url, ssl=ssl_context) as websocket:
+                self.websocket = websocket
+                self.connected_at = time.time()
+                gap = self._close_gap()
+                if gap:
+                    self.reconnects += 1
+                logger.info(f"{self.name}: WebSocket Connected ({settings.FEED_STREAM_FORMAT} stream)")
+
+                if self._on_connect:
+                    await self._on_connect(self, gap)
+
+                async for message in websocket:
+                    if not self.running:
+                        break
+
+                    recv_ns = time.time_ns()
+                    self.messages += 1
+                    self.last_message_at = recv_ns / 1e9
+                    if FeedRecorder.is_recording():
+                        FeedRecorder.record(message, recv_ns)
+                    # Non-blocking - Redis writes happen in FeedStreamWriter batches
+                    FeedStreamWriter.submit(message)
+        finally:
+            was_connected = self.websocket is not None
+            self.websocket = None
+            if was_connected:
+                self.disconnects += 1
+                if self.running:
+                    self.down_since = time.time()
+                logger.info(f"{self.name}: WebSocket Disconnected")
@@ -0,0 +1,572 @@
+"""
+Feed Decoder - market_feed Stream Entries → Typed Frames
+=========================================================
+
+market_feed Redis stream-ல் இருக்கும் entries-ஐ decode பண்ணும் shared library.
+Ingest loop (FeedService) இங்கே encode பண்ணும், எல்லா consumers-ம்
+(live SSE, candles, VWAP) இங்கே decode பண்ணும்.
+
+Stream Entry Formats:
+    {"data": "<json>"}       → Legacy: MessageToDict + codec.dumps (CODEC)
+    {"pb": b"<protobuf>"}    → Binary: Upstox FeedResponse bytes as-is
+    {"gap": "<json>"}        → Feed gap marker: {"start", "end", "instruments"}
+
+Streams:
+    market_feed                   → Combined (எல்லா instruments)
+    market_feed:{instrument_key}  → Sharded (ஒரு instrument மட்டும்)
+
+Binary mode-ல் ingest side-ல் decode/JSON cost இல்லை. Consumer side-ல்
+ஒவ்வொரு frame-ம் ஒரு முறை மட்டும் decode ஆகும்; JSON SSE edge-ல் மட்டும்.
+
+Author: Antony HFT System
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services import codec
+from app.models.candle import BidAskQuote, RawTick
+from app.services.candle_aggregator import parse_raw_tick
+
+logger = logging.getLogger(__name__)
+
+try:
+    from app.proto import MarketDataFeedV3_pb2 as MarketDataFeed_pb2
+    from google.protobuf.json_format import MessageToDict, ParseDict
+    HAS_PROTOBUF = True
+except ImportError:
+    HAS_PROTOBUF = False
+    logger.warning("MarketDataFeedV3_pb2 not found. Protobuf decoding disabled.")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+STREAM_NAME = "market_feed"
+FIELD_JSON = "data"
+FIELD_PROTOBUF = "pb"
+FIELD_GAP = "gap"
+
+FORMAT_JSON = "json"
+FORMAT_PROTOBUF = "protobuf"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENCODE - WebSocket message → Stream entry fields (ingest side)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def shard_stream_name(instrument_key: str) -> str:
+    """Per-instrument stream: market_feed:NSE_FO|61755"""
+    return f"{STREAM_NAME}:{instrument_key}"
+
+
+def _shard_pb_entries(feed_response) -> List[Tuple[str, Dict[str, Any]]]:
+    """FeedResponse → one single-feed FeedResponse per instrument"""
+    entries = []
+    for instrument_key, feed in feed_response.feeds.items():
+        shard = MarketDataFeed_pb2.FeedResponse(type=feed_response.type, currentTs=feed_response.currentTs)
+        shard.feeds[instrument_key].CopyFrom(feed)
+        entries.append((shard_stream_name(instrument_key), {FIELD_PROTOBUF: shard.SerializeToString()}))
+    return entries
+
+
+def _shard_json_entries(data_dict: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Legacy dict → one single-feed JSON payload per instrument"""
+    header = {k: v for k, v in data_dict.items() if k != "feeds"}
+    entries = []
+    for instrument_key, feed in data_dict.get("feeds", {}).items():
+        payload = dict(header, feeds={instrument_key: feed})
+        entries.append((shard_stream_name(instrument_key), {FIELD_JSON: codec.dumps(payload)}))
+    return entries
+
+
+def encode_feed_entries(message: bytes | str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    WebSocket message → [(stream_name, XADD fields), ...]
+
+    Binary mode-ல் protobuf bytes அப்படியே store ஆகும் (no parse).
+    Legacy mode-ல் பழைய MessageToDict + JSON format (codec.dumps).
+
+    FEED_COMBINED_STREAM → market_feed (எல்லா instruments ஒரே entry)
+    FEED_SHARDED_STREAMS → market_feed:{instrument_key} (instrument-க்கு ஒரு entry)
+
+    Returns:
+        Stream entries to XADD (empty if message should be skipped)
+    """
+    entries: List[Tuple[str, Dict[str, Any]]] = []
+    feed_response = None
+    data_dict: Dict[str, Any] = {}
+
+    if isinstance(message, bytes):
+        if settings.FEED_STREAM_FORMAT == FORMAT_PROTOBUF:
+            if settings.FEED_COMBINED_STREAM:
+                entries.append((STREAM_NAME, {FIELD_PROTOBUF: message}))
+            if settings.FEED_SHARDED_STREAMS and HAS_PROTOBUF:
+                feed_response = MarketDataFeed_pb2.FeedResponse()
+                feed_response.ParseFromString(message)
+                entries.extend(_shard_pb_entries(feed_response))
+            return entries
+
+        if not HAS_PROTOBUF:
+            return entries
+
+        feed_response = MarketDataFeed_pb2.FeedResponse()
+        feed_response.ParseFromString(message)
+        data_dict = MessageToDict(feed_response)
+    else:
+        data_dict = codec.loads(message)
+
+    if not data_dict:
+        return entries
+
+    if settings.FEED_COMBINED_STREAM:
+        entries.append((STREAM_NAME, {FIELD_JSON: codec.dumps(data_dict)}))
+    if settings.FEED_SHARDED_STREAMS:
+        entries.extend(_shard_json_entries(data_dict))
+    return entries
+
+
+def encode_gap_entries(start_ms: int, end_ms: int, instrument_keys: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Reconnect gap → marker entries
+
+    Consumers (candles, VWAP, live SSE) இதை வைத்து gap-ஐ cross பண்ணி
+    candle build ஆகாமல் தடுக்கும்.
+    """
+    entries: List[Tuple[str, Dict[str, Any]]] = []
+    if not instrument_keys:
+        return entries
+
+    if settings.FEED_COMBINED_STREAM:
+        payload = {"start": start_ms, "end": end_ms, "instruments": list(instrument_keys)}
+        entries.append((STREAM_NAME, {FIELD_GAP: codec.dumps(payload)}))
+    if settings.FEED_SHARDED_STREAMS:
+        for instrument_key in instrument_keys:
+            payload = {"start": start_ms, "end": end_ms, "instruments": [instrument_key]}
+            entries.append((shard_stream_name(instrument_key), {FIELD_GAP: codec.dumps(payload)}))
+    return entries
+
+
+def encode_quote_values(entries: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, bytes | str]:
+    """
+    Stream entries → {instrument_key: single-feed payload} (last-value cache)
+
+    Shard entries இருந்தால் அதே payloads reuse; combined மட்டும் என்றால் split.
+    Gap markers skip.
+    """
+    values: Dict[str, bytes | str] = {}
+    shard_prefix = f"{STREAM_NAME}:"
+    for stream_name, fields in entries:
+        if stream_name.startswith(shard_prefix):
+            payload = fields.get(FIELD_PROTOBUF, fields.get(FIELD_JSON))
+            if payload is not None:
+                values[stream_name[len(shard_prefix):]] = payload
+    if values:
+        return values
+
+    for stream_name, fields in entries:
+        if stream_name != STREAM_NAME:
+            continue
+        if FIELD_PROTOBUF in fields and HAS_PROTOBUF:
+            feed_response = MarketDataFeed_pb2.FeedResponse()
+            feed_response.ParseFromString(fields[FIELD_PROTOBUF])
+            shards = _shard_pb_entries(feed_response)
+        elif FIELD_JSON in fields:
+            shards = _shard_json_entries(codec.loads(fields[FIELD_JSON]))
+        else:
+            continue
+        for shard_name, shard_fields in shards:
+            values[shard_name[len(shard_prefix):]] = next(iter(shard_fields.values()))
+    return values
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FAST PATH - Protobuf message → RawTick (no MessageToDict / string casts)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _quotes_from_level(market_level) -> List[BidAskQuote]:
+    """MarketLevel.bidAskQuote → BidAskQuote list (5 levels full / 30 levels full_d30)"""
+    construct = BidAskQuote.model_construct
+    return [
+        construct(bidQ=q.bidQ, bidP=q.bidP, askQ=q.askQ, askP=q.askP)
+        for q in market_level.bidAskQuote
+    ]
+
+
+def tick_from_market_ff(instrument_key: str, market_ff) -> RawTick:
+    """
+    MarketFullFeed (full / full_d30 mode) → RawTick
+
+    parse_raw_tick-ன் protobuf version. Fields நேரடியாக typed message-ல்
+    இருந்து படிக்கப்படும்; pydantic validation skip (model_construct).
+    """
+    ltpc = market_ff.ltpc
+    greeks = market_ff.optionGreeks
+    return RawTick.model_construct(
+        instrument_key=instrument_key,
+        ltp=ltpc.ltp,
+        ltt=ltpc.ltt,
+        ltq=ltpc.ltq,
+        cp=ltpc.cp,
+        bid_ask_quote=_quotes_from_level(market_ff.marketLevel),
+        delta=greeks.delta,
+        theta=greeks.theta,
+        gamma=greeks.gamma,
+        vega=greeks.vega,
+        rho=greeks.rho,
+        atp=market_ff.atp,
+        vtt=market_ff.vtt,
+        oi=int(market_ff.oi),
+        iv=market_ff.iv,
+        tbq=int(market_ff.tbq),
+        tsq=int(market_ff.tsq),
+    )
+
+
+def _tick_from_ltpc(instrument_key: str, ltpc) -> RawTick:
+    """LTPC only (ltpc mode / indexFF) - மற்ற fields default"""
+    return RawTick.model_construct(
+        instrument_key=instrument_key,
+        ltp=ltpc.ltp,
+        ltt=ltpc.ltt,
+        ltq=ltpc.ltq,
+        cp=ltpc.cp,
+    )
+
+
+def _tick_from_first_level(instrument_key: str, first_level) -> RawTick:
+    """FirstLevelWithGreeks (option_greeks mode) → RawTick with 1 depth level"""
+    ltpc = first_level.ltpc
+    greeks = first_level.optionGreeks
+    depth = first_level.firstDepth
+    return RawTick.model_construct(
+        instrument_key=instrument_key,
+        ltp=ltpc.ltp,
+        ltt=ltpc.ltt,
+        ltq=ltpc.ltq,
+        cp=ltpc.cp,
+        bid_ask_quote=[
+            BidAskQuote.model_construct(bidQ=depth.bidQ, bidP=depth.bidP, askQ=depth.askQ, askP=depth.askP)
+        ],
+        delta=greeks.delta,
+        theta=greeks.theta,
+        gamma=greeks.gamma,
+        vega=greeks.vega,
+        rho=greeks.rho,
+        vtt=first_level.vtt,
+        oi=int(first_level.oi),
+        iv=first_level.iv,
+    )
+
+
+def decode_feed_tick(instrument_key: str, feed) -> Optional[RawTick]:
+    """
+    Feed message → RawTick, subscription mode-க்கு ஏற்ற fields மட்டும்
+
+    Mode Dispatch (Feed.FeedUnion):
+        ltpc                 → ltp/ltt/ltq/cp
+        fullFeed.marketFF    → full / full_d30 (depth + greeks + atp/vtt/oi/iv/tbq/tsq)
+        fullFeed.indexFF     → ltp/ltt/ltq/cp
+        firstLevelWithGreeks → ltpc + first depth + greeks + vtt/oi/iv
+    """
+    kind = feed.WhichOneof("FeedUnion")
+
+    if kind == "fullFeed":
+        full_feed = feed.fullFeed
+        if full_feed.WhichOneof("FullFeedUnion") == "marketFF":
+            return tick_from_market_ff(instrument_key, full_feed.marketFF)
+        return _tick_from_ltpc(instrument_key, full_feed.indexFF.ltpc)
+
+    if kind == "ltpc":
+        return _tick_from_ltpc(instrument_key, feed.ltpc)
+
+    if kind == "firstLevelWithGreeks":
+        return _tick_from_first_level(instrument_key, feed.firstLevelWithGreeks)
+
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DECODE - Stream entry → FeedFrame (consumer side)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FeedFrame:
+    """
+    Decoded market_feed entry
+
+    Protobuf/JSON இரண்டுக்கும் ஒரே interface. Decode lazy-ஆக ஒரு முறை
+    மட்டும் நடக்கும்; per-instrument feed dicts, JSON fragments, RawTicks
+    cache ஆகும் - TickBus ஒரே frame-ஐ பல clients-க்கு share பண்ணும்போது
+    ஒவ்வொரு instrument-ம் ஒரு முறை மட்டும் serialize/decode ஆகும்.
+
+    Usage:
+        frame = decode_entry(message_id, fields)
+
+        # SSE edge - JSON payload (same shape as legacy stream)
+        payload = frame.to_json(instrument_filter)
+
+        # Candles / VWAP - typed ticks
+        for instrument_key, tick in frame.iter_market_ticks(instrument_filter):
+            ...
+
+        # Gap markers - no feeds, only frame.gap
+        for instrument_key in frame.gap_instruments(instrument_filter):
+            ...
+    """
+
+    __slots__ = (
+        "entry_id", "gap", "stream", "_raw_json", "_raw_pb", "_data", "_response",
+        "_feed_dicts", "_fragments", "_ticks", "_header_json", "_encoded",
+    )
+
+    def __init__(
+        self,
+        entry_id: Any,
+        raw_json: Optional[str] = None,
+        raw_pb: Optional[bytes] = None,
+        gap: Optional[Dict[str, Any]] = None
+    ):
+        self.entry_id = entry_id
+        self.gap = gap
+        # Read ஆன stream (market_feed / market_feed:{key}) - FeedStreamReader set பண்ணும்
+        self.stream = STREAM_NAME
+        self._raw_json = raw_json
+        self._raw_pb = raw_pb
+        self._data: Optional[Dict[str, Any]] = None
+        self._response = None
+        self._feed_dicts: Dict[str, Dict[str, Any]] = {}
+        self._fragments: Dict[str, str] = {}
+        self._ticks: Dict[str, Optional[RawTick]] = {}
+        self._header_json: Optional[str] = None
+        self._encoded: Dict[Any, Any] = {}
+
+    @property
+    def is_protobuf(self) -> bool:
+        return self._raw_pb is not None
+
+    @property
+    def response(self):
+        """Parsed FeedResponse (protobuf entries only)"""
+        if self._response is None and self._raw_pb is not None:
+            response = MarketDataFeed_pb2.FeedResponse()
+            response.ParseFromString(self._raw_pb)
+            self._response = response
+        return self._response
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Parsed JSON dict (legacy entries only)"""
+        if self._data is None:
+            self._data = codec.loads(self._raw_json) if self._raw_json else {}
+        return self._data
+
+    def instrument_keys(self) -> Iterator[str]:
+        if self.is_protobuf:
+            return iter(self.response.feeds.keys())
+        return iter(self.data.get("feeds", {}).keys())
+
+    def gap_instruments(self, instrument_filter: Optional[Set[str]] = None) -> List[str]:
+        """Gap marker-ல் affected instruments (filter applied)"""
+        if not self.gap:
+            return []
+        return [
+            k for k in self.gap.get("instruments", [])
+            if not instrument_filter or k in instrument_filter
+        ]
+
+    def feed_dict(self, instrument_key: str) -> Dict[str, Any]:
+        """Single instrument feed in MessageToDict shape (cached)"""
+        if not self.is_protobuf:
+            return self.data.get("feeds", {}).get(instrument_key, {})
+
+        cached = self._feed_dicts.get(instrument_key)
+        if cached is None:
+            cached = MessageToDict(self.response.feeds[instrument_key])
+            self._feed_dicts[instrument_key] = cached
+        return cached
+
+    def feed_json(self, instrument_key: str) -> str:
+        """codec.dumps(feed_dict(key)) - cached, shared by every client"""
+        cached = self._fragments.get(instrument_key)
+        if cached is None:
+            cached = codec.dumps(self.feed_dict(instrument_key))
+            self._fragments[instrument_key] = cached
+        return cached
+
+    def header_dict(self) -> Dict[str, Any]:
+        """Frame-level fields (type, currentTs, marketInfo) without feeds"""
+        if not self.is_protobuf:
+            return {k: v for k, v in self.data.items() if k != "feeds"}
+
+        response = self.response
+        header: Dict[str, Any] = {
+            "type": MarketDataFeed_pb2.Type.Name(response.type),
+            "currentTs": str(response.currentTs),
+        }
+        if response.HasField("marketInfo"):
+            header["marketInfo"] = MessageToDict(response.marketInfo)
+        return header
+
+    def header_json(self) -> str:
+        """codec.dumps(header_dict()) - cached"""
+        if self._header_json is None:
+            self._header_json = codec.dumps(self.header_dict())
+        return self._header_json
+
+    def to_json(self, instrument_filter: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        SSE payload - legacy `{"type", "feeds", "currentTs"}` shape
+
+        Per-instrument fragments cache-ல் இருந்து join ஆகும்; வேறு filter
+        உள்ள client-க்கும் அதே fragments reuse ஆகும்.
+
+        Returns:
+            JSON string, or None if filter matched nothing
+        """
+        if not instrument_filter and not self.is_protobuf:
+            return self._raw_json
+
+        keys = self.filtered_keys(instrument_filter)
+        if instrument_filter and not keys:
+            return None
+
+        header = self.header_json()
+        prefix = header[:-1] + ", " if len(header) > 2 else "{"
+        feeds = ", ".join(f"{codec.dumps(k)}: {self.feed_json(k)}" for k in keys)
+        return f'{prefix}"feeds": {{{feeds}}}}}'
+
+    def encoded(self, cache_key: Any, encode: Callable[[], Any]) -> Any:
+        """
+        Per-frame encode cache - binary /stream/ws formats
+
+        அதே frame-ஐ பெறும் எல்லா clients-க்கும் ஒரு முறை மட்டும் encode.
+        """
+        cached = self._encoded.get(cache_key)
+        if cached is None:
+            cached = encode()
+            self._encoded[cache_key] = cached
+        return cached
+
+    def filtered_keys(self, instrument_filter: Optional[Set[str]] = None) -> List[str]:
+        return [
+            k for k in self.instrument_keys()
+            if not instrument_filter or k in instrument_filter
+        ]
+
+    def to_protobuf(self, instrument_filter: Optional[Set[str]] = None) -> Optional[bytes]:
+        """
+        Upstox FeedResponse bytes (filtered) - /stream/ws?format=protobuf
+
+        Protobuf entry + no filter → stream-ல் உள்ள bytes அப்படியே (zero encode).
+
+        Returns:
+            Serialized FeedResponse, or None if filter matched nothing
+        """
+        if not instrument_filter and self.is_protobuf:
+            return self._raw_pb
+
+        keys = self.filtered_keys(instrument_filter)
+        if instrument_filter and not keys:
+            return None
+        return self.encoded(("pb", tuple(keys)), lambda: self._build_protobuf(keys))
+
+    def _build_protobuf(self, keys: List[str]) -> bytes:
+        if not self.is_protobuf:
+            data = dict(self.header_dict(), feeds={k: self.feed_dict(k) for k in keys})
+            return ParseDict(data, MarketDataFeed_pb2.FeedResponse(), ignore_unknown_fields=True).SerializeToString()
+
+        source = self.response
+        response = MarketDataFeed_pb2.FeedResponse(type=source.type, currentTs=source.currentTs)
+        if source.HasField("marketInfo"):
+            response.marketInfo.CopyFrom(source.marketInfo)
+        for key in keys:
+            response.feeds[key].CopyFrom(source.feeds[key])
+        return response.SerializeToString()
+
+    def market_tick(self, instrument_key: str) -> Optional[RawTick]:
+        """
+        marketFF feed → RawTick (cached; None for index / LTPC-only feeds)
+        """
+        if instrument_key in self._ticks:
+            return self._ticks[instrument_key]
+
+        tick = None
+        if self.is_protobuf:
+            feed = self.response.feeds.get(instrument_key)
+            if (
+                feed is not None
+                and feed.WhichOneof("FeedUnion") == "fullFeed"
+                and feed.fullFeed.WhichOneof("FullFeedUnion") == "marketFF"
+            ):
+                tick = tick_from_market_ff(instrument_key, feed.fullFeed.marketFF)
+        else:
+            market_ff = self.data.get("feeds", {}).get(instrument_key, {}).get("fullFeed", {}).get("marketFF")
+            if market_ff:
+                tick = parse_raw_tick(instrument_key, market_ff)
+
+        self._ticks[instrument_key] = tick
+        return tick
+
+    def iter_market_ticks(self, instrument_filter: Optional[Set[str]] = None) -> Iterator[Tuple[str, RawTick]]:
+        """
+        marketFF feeds → (instrument_key, RawTick)
+
+        Index feeds (indexFF) / LTPC-only feeds skip ஆகும் - candles/VWAP-க்கு
+        marketFF தேவை.
+        """
+        for instrument_key in self.instrument_keys():
+            if instrument_filter and instrument_key not in instrument_filter:
+                continue
+            tick = self.market_tick(instrument_key)
+            if tick is not None:
+                yield instrument_key, tick
+
+
+def _field(fields: Dict[Any, Any], name: str) -> Any:
+    """Binary pool bytes keys / text pool str keys இரண்டையும் handle பண்ணும்"""
+    value = fields.get(name.encode())
+    if value is None:
+        value = fields.get(name)
+    return value
+
+
+def decode_quote_value(value: bytes | str | None) -> Optional[FeedFrame]:
+    """
+    Last-value cache payload → FeedFrame (entry_id None)
+
+    JSON payloads '{'-ல் தொடங்கும்; FeedResponse bytes ஒருபோதும் அப்படி
+    தொடங்காது (field 15 group tag).
+    """
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        if not value.startswith(b"{"):
+            return FeedFrame(None, raw_pb=value) if HAS_PROTOBUF else None
+        value = value.decode("utf-8")
+    return FeedFrame(None, raw_json=value)
+
+
+def decode_entry(entry_id: Any, fields: Dict[Any, Any]) -> Optional[FeedFrame]:
+    """
+    XREAD entry → FeedFrame
+
+    Returns:
+        FeedFrame, or None if entry has no feed payload
+    """
+    raw_pb = _field(fields, FIELD_PROTOBUF)
+    if raw_pb is not None:
+        if not HAS_PROTOBUF:
+            return None
+        return FeedFrame(entry_id, raw_pb=raw_pb)
+
+    raw_json = _field(fields, FIELD_JSON)
+    if raw_json is None:
+        raw_gap = _field(fields, FIELD_GAP)
+        if raw_gap is None:
+            return None
+        return FeedFrame(entry_id, gap=codec.loads(raw_gap))
+    if isinstance(raw_json, bytes):
+        raw_json = raw_json.decode("utf-8")
+    return FeedFrame(entry_id, raw_json=raw_json)
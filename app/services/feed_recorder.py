@@ -0,0 +1,333 @@
+"""
+Feed Recorder & Replay - Raw Frame Capture for Off-Market Runs
+===============================================================
+
+Live Upstox socket இல்லாமல் bad candle reproduce பண்ண / benchmark பண்ண:
+
+1. Recorder
+    - ஒவ்வொரு inbound WebSocket frame-ம் (FeedResponse bytes) receive
+      timestamp-உடன் capture ஆகும்
+    - Day files, gzip compressed (ஒவ்வொரு flush-ம் ஒரு gzip member)
+        {FEED_RECORD_DIR}/feed-2025-12-05.rec.gz
+
+2. Replay
+    - Recorded frames அதே ingest path-ல் (FeedStreamWriter → market_feed)
+      push ஆகும் - candles, VWAP, live SSE எல்லாம் live மாதிரியே run ஆகும்
+    - speed=1 → real-time, speed=N → N மடங்கு வேகம், speed=0 → max speed
+    - Frame order மாறாது, drop ஆகாது (writer queue backpressure)
+
+Record Format (big-endian):
+    [u64 recv_ns][u8 kind][u32 len][payload]
+    kind: 0 = binary (protobuf), 1 = text (JSON)
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytz
+
+from app.core.config import settings
+from app.services.feed_writer import FeedStreamWriter
+
+logger = logging.getLogger(__name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+IST = pytz.timezone('Asia/Kolkata')
+FLUSH_INTERVAL = 1.0  # seconds
+FILE_PREFIX = "feed-"
+FILE_SUFFIX = ".rec.gz"
+
+KIND_BINARY = 0
+KIND_TEXT = 1
+
+_HEADER = struct.Struct(">QBI")
+
+Frame = Tuple[int, bytes | str]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RECORD ENCODING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def encode_frame(recv_ns: int, message: bytes | str) -> bytes:
+    if isinstance(message, str):
+        payload = message.encode("utf-8")
+        return _HEADER.pack(recv_ns, KIND_TEXT, len(payload)) + payload
+    return _HEADER.pack(recv_ns, KIND_BINARY, len(message)) + message
+
+
+def iter_recording(path: str) -> Iterator[Frame]:
+    """
+    Recording file → (recv_ns, message) in capture order (streaming read)
+
+    Crash / disk full-ல் கடைசி gzip member பாதியில் நின்றிருக்கலாம் -
+    அதுவரை உள்ள frames yield ஆகும், பிறகு warning-உடன் stop.
+    """
+    with gzip.open(path, "rb") as f:
+        while True:
+            try:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                recv_ns, kind, length = _HEADER.unpack(header)
+                payload = f.read(length)
+            except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+                logger.warning(f"Truncated gzip member at end of {path}: {e}")
+                return
+            if len(payload) < length:
+                logger.warning(f"Truncated frame at end of {path}")
+                return
+            yield recv_ns, payload.decode("utf-8") if kind == KIND_TEXT else payload
+
+
+def recording_path(day: str, base_dir: Optional[str] = None) -> str:
+    return os.path.join(base_dir or settings.FEED_RECORD_DIR, f"{FILE_PREFIX}{day}{FILE_SUFFIX}")
+
+
+def resolve_recording(name: str) -> str:
+    """
+    "2025-12-05" / "feed-2025-12-05.rec.gz" → path inside FEED_RECORD_DIR
+
+    API-ல் இருந்து வரும் names FEED_RECORD_DIR-க்கு வெளியே போக முடியாது.
+    """
+    name = os.path.basename(name)
+    if not name.endswith(FILE_SUFFIX):
+        return recording_path(name)
+    return os.path.join(settings.FEED_RECORD_DIR, name)
+
+
+def list_recordings() -> List[Dict[str, Any]]:
+    base_dir = settings.FEED_RECORD_DIR
+    if not os.path.isdir(base_dir):
+        return []
+    return [
+        {"file": name, "size_bytes": os.path.getsize(os.path.join(base_dir, name))}
+        for name in sorted(os.listdir(base_dir))
+        if name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX)
+    ]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RECORDER - FeedConnection receive loop-ல் இருந்து call ஆகும்
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FeedRecorder:
+    """
+    Raw inbound frame recorder
+
+    Usage:
+        FeedRecorder.start()
+        FeedRecorder.record(message, time.time_ns())   # never blocks
+        await FeedRecorder.stop()                      # flushes buffer
+    """
+
+    _buffer: List[Frame] = []
+    _task: Optional[asyncio.Task] = None
+    _recording: bool = False
+    _stats: Dict[str, Any] = {}
+
+    @classmethod
+    def is_recording(cls) -> bool:
+        return cls._recording
+
+    @classmethod
+    def start(cls):
+        if cls._recording:
+            return
+        cls._recording = True
+        cls._buffer = []
+        cls._stats = {"frames": 0, "bytes": 0, "flushes": 0, "errors": 0, "file": None}
+        cls._task = asyncio.create_task(cls._flush_loop())
+        logger.info(f"Feed recorder started ({settings.FEED_RECORD_DIR})")
+
+    @classmethod
+    async def stop(cls):
+        if not cls._recording:
+            return
+        cls._recording = False
+        if cls._task:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        await cls._flush()
+        logger.info(f"Feed recorder stopped ({cls._stats.get('frames', 0)} frames)")
+
+    @classmethod
+    def record(cls, message: bytes | str, recv_ns: int):
+        if cls._recording:
+            cls._buffer.append((recv_ns, message))
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        stats = dict(cls._stats)
+        stats["recording"] = cls._recording
+        stats["buffered"] = len(cls._buffer)
+        return stats
+
+    @classmethod
+    async def _flush_loop(cls):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await cls._flush()
+
+    @classmethod
+    async def _flush(cls):
+        if not cls._buffer:
+            return
+        frames, cls._buffer = cls._buffer, []
+        try:
+            await asyncio.to_thread(cls._write, frames)
+        except Exception as e:
+            cls._stats["errors"] += 1
+            logger.error(f"Feed recorder flush failed ({len(frames)} frames): {e}")
+
+    @classmethod
+    def _write(cls, frames: List[Frame]):
+        """Day வாரியாக பிரித்து ஒவ்வொரு file-லும் ஒரு gzip member append"""
+        by_day: Dict[str, List[bytes]] = {}
+        for recv_ns, message in frames:
+            day = datetime.fromtimestamp(recv_ns / 1e9, tz=IST).strftime("%Y-%m-%d")
+            by_day.setdefault(day, []).append(encode_frame(recv_ns, message))
+
+        os.makedirs(settings.FEED_RECORD_DIR, exist_ok=True)
+        for day, records in by_day.items():
+            path = recording_path(day)
+            member = gzip.compress(b"".join(records), compresslevel=6)
+            with open(path, "ab") as f:
+                f.write(member)
+            cls._stats["bytes"] += len(member)
+            cls._stats["file"] = path
+
+        cls._stats["frames"] += len(frames)
+        cls._stats["flushes"] += 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REPLAY - Recording → FeedStreamWriter (same ingest path as live)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FeedReplayer:
+    """
+    Deterministic replay of a recording
+
+    Usage:
+        await FeedReplayer.replay(path, speed=10)   # CLI - runs to completion
+        FeedReplayer.start(path, speed=0)           # API - background task
+        await FeedReplayer.stop()
+    """
+
+    _task: Optional[asyncio.Task] = None
+    _stats: Dict[str, Any] = {}
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._task is not None and not cls._task.done()
+
+    @classmethod
+    def start(cls, path: str, speed: float = 1.0):
+        if cls.is_running():
+            raise RuntimeError("A replay is already running")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Recording not found: {path}")
+        cls._task = asyncio.create_task(cls.replay(path, speed))
+
+    @classmethod
+    async def stop(cls):
+        if cls._task:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        stats = dict(cls._stats)
+        stats["running"] = cls.is_running()
+        return stats
+
+    @classmethod
+    async def replay(cls, path: str, speed: float = 1.0) -> Dict[str, Any]:
+        """
+        Recording-ஐ ingest path-ல் push பண்ணும்
+
+        Args:
+            path: Recording file
+            speed: 1 = real-time, N = N× faster, 0 = as fast as Redis accepts
+
+        Returns:
+            Final replay stats
+        """
+        owns_writer = not FeedStreamWriter.is_running()
+        if owns_writer:
+            FeedStreamWriter.start()
+
+        cls._stats = {
+            "file": path,
+            "speed": speed,
+            "frames": 0,
+            "recorded_seconds": 0.0,
+            "elapsed_seconds": 0.0,
+            "finished": False,
+        }
+        stats = cls._stats
+        frames = iter_recording(path)
+        first_ns: Optional[int] = None
+        wall_start = time.monotonic()
+        logger.info(f"Replay started: {path} (speed={speed or 'max'})")
+
+        try:
+            while True:
+                # Decompression is blocking - read in chunks off the loop
+                chunk = await asyncio.to_thread(_take, frames, 1000)
+                if not chunk:
+                    break
+
+                for recv_ns, message in chunk:
+                    if first_ns is None:
+                        first_ns = recv_ns
+                    offset = (recv_ns - first_ns) / 1e9
+
+                    if speed > 0:
+                        delay = offset / speed - (time.monotonic() - wall_start)
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+
+                    # Blocking put - replay never drops frames
+                    await FeedStreamWriter.put(message)
+                    stats["frames"] += 1
+                    stats["recorded_seconds"] = round(offset, 3)
+                    stats["elapsed_seconds"] = round(time.monotonic() - wall_start, 3)
+
+            stats["finished"] = True
+            logger.info(f"Replay finished: {stats['frames']} frames in {stats['elapsed_seconds']}s")
+        finally:
+            if owns_writer:
+                await FeedStreamWriter.stop()
+        return dict(stats)
+
+
+def _take(frames: Iterator[Frame], count: int) -> List[Frame]:
+    chunk: List[Frame] = []
+    for frame in frames:
+        chunk.append(frame)
+        if len(chunk) >= count:
+            break
+    return chunk
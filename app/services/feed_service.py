@@ -4,28 +4,47 @@ Feed Service - Upstox WebSocket Market Data
 
 Upstox API V3 WebSocket connection and subscription management.
 Real-time market data ingestion to Redis.
+
+FEED_INGEST_PROCESS=true ஆனா இந்த methods feed_worker process-க்கு
+forward ஆகும்; /feed/* endpoints மாறாது.
+
+FEED_CONNECTIONS > 1 ஆனா instrument keys பல WebSocket connections-ல்
+shard ஆகும் (least-loaded, sticky). எல்லா connections-ம் ஒரே
+FeedStreamWriter-க்கு எழுதும் - downstream-க்கு ஒரே merged stream.
+
+Socket drop ஆனா அந்த connection தானே reconnect ஆகி (backoff + re-authorize)
+தன் subscriptions-ஐ mode வாரியாக replay பண்ணும். Down interval
+instrument வாரியாக gap-ஆக record ஆகி market_feed-ல் gap marker எழுதப்படும்.
 """
 
-import asyncio
-import json
-import ssl
 import logging
-import websockets
-import uuid
-from typing import List, Literal
+from collections import deque
+from typing import Deque, Dict, List, Literal, Optional, Tuple
 from app.core.config import settings
 from app.services.upstox_auth import UpstoxAuthService
-from app.db.redis import RedisClient
+from app.services.feed_connection import GAP_HISTORY, FeedConnection
+from app.services.depth_diff import DepthDiffEngine
+from app.services.feed_decoder import encode_gap_entries
+from app.services.feed_recorder import FeedRecorder
+from app.services.feed_writer import FeedStreamWriter
+from app.services.feed_worker import FeedWorkerProcess
 
 logger = logging.getLogger(__name__)
 
 
 class FeedService:
-    _websocket = None
     _is_running = False
-    _task = None
     _subscriptions = set()
     
+    # Connection pool - instrument keys shard ஆகும் (FEED_CONNECTIONS)
+    _connections: List[FeedConnection] = []
+    # Sticky routing: {instrument_key: connection index}
+    _key_connection: Dict[str, int] = {}
+    # Subscription mode per key - reconnect replay-க்கு
+    _modes: Dict[str, str] = {}
+    # {instrument_key: deque[(start_ms, end_ms)]}
+    _gaps: Dict[str, Deque[Tuple[int, int]]] = {}
+    
     # Protected keys - Index keys are always subscribed
     _protected_keys = {
         "NSE_INDEX|Nifty 50",
@@ -34,17 +53,29 @@ class FeedService:
     }
 
     @classmethod
-    async def get_authorized_url(cls):
-        creds = await UpstoxAuthService.get_credentials()
-        if not creds or not creds.get('access_token'):
-            raise ValueError("Access token not found. Please login first.")
+    async def _feed_access_token(cls) -> str:
+        """DB token (OAuth login); UPSTOX_ACCESS_TOKEN fallback - mock feed / no-DB runs"""
+        try:
+            creds = await UpstoxAuthService.get_credentials()
+        except Exception:
+            if not settings.UPSTOX_ACCESS_TOKEN:
+                raise
+            creds = None
         
-        access_token = creds['access_token']
+        if creds and creds.get('access_token'):
+            return creds['access_token']
+        if settings.UPSTOX_ACCESS_TOKEN:
+            return settings.UPSTOX_ACCESS_TOKEN
+        raise ValueError("Access token not found. Please login first.")
+
+    @classmethod
+    async def get_authorized_url(cls):
+        access_token = await cls._feed_access_token()
         
         import httpx
         async with httpx.AsyncClient() as client:
             response = await client.get(
-                "https://api.upstox.com/v3/feed/market-data-feed/authorize",
+                settings.UPSTOX_FEED_AUTHORIZE_URL,
                 headers={
                     "Authorization": f"Bearer {access_token}",
                     "Accept": "application/json"
@@ -58,101 +89,284 @@ class FeedService:
 
     @classmethod
     async def connect(cls):
-        if cls._is_running:
+        if FeedWorkerProcess.is_active():
+            return await FeedWorkerProcess.call("connect")
+
+        if cls._is_running and any(c.running for c in cls._connections):
             return {"message": "Feed already running"}
 
+        # Dead pool - fresh sockets start with no subscriptions
+        for connection in cls._connections:
+            await connection.stop()
+        cls._key_connection.clear()
+        cls._modes.clear()
+        cls._subscriptions.clear()
+
         try:
-            ws_url = await cls.get_authorized_url()
+            # ஒவ்வொரு socket-க்கும் தனி authorized URL (auth errors fail fast here)
+            ws_urls = [await cls.get_authorized_url() for _ in range(max(settings.FEED_CONNECTIONS, 1))]
             cls._is_running = True
-            cls._task = asyncio.create_task(cls._run_loop(ws_url))
-            return {"message": "Feed connecting..."}
+            FeedStreamWriter.start()
+            if settings.FEED_RECORD_ENABLED:
+                FeedRecorder.start()
+            cls._connections = [
+                FeedConnection(index, on_connect=cls._on_connection_up)
+                for index in range(len(ws_urls))
+            ]
+            for connection, ws_url in zip(cls._connections, ws_urls):
+                connection.start(cls._url_provider(ws_url))
+            return {"message": f"Feed connecting ({len(ws_urls)} connections)..."}
         except Exception as e:
             cls._is_running = False
             raise e
 
     @classmethod
     async def disconnect(cls):
+        if FeedWorkerProcess.is_active():
+            return await FeedWorkerProcess.call("disconnect")
+
         cls._is_running = False
-        if cls._websocket:
-            await cls._websocket.close()
-            cls._websocket = None
-        if cls._task:
-            cls._task.cancel()
-            try:
-                await cls._task
-            except asyncio.CancelledError:
-                pass
-            cls._task = None
+        for connection in cls._connections:
+            await connection.stop()
+        cls._connections = []
+        cls._key_connection.clear()
+        cls._modes.clear()
+        cls._subscriptions.clear()
+        await FeedStreamWriter.stop()
+        await FeedRecorder.stop()
         return {"message": "Feed disconnected"}
 
+    @classmethod
+    async def start_recording(cls):
+        """Inbound frames-ஐ FEED_RECORD_DIR-க்கு capture பண்ண ஆரம்பிக்கும்"""
+        if FeedWorkerProcess.is_active():
+            return await FeedWorkerProcess.call("start_recording")
+        FeedRecorder.start()
+        return FeedRecorder.get_stats()
+
+    @classmethod
+    async def stop_recording(cls):
+        if FeedWorkerProcess.is_active():
+            return await FeedWorkerProcess.call("stop_recording")
+        await FeedRecorder.stop()
+        return FeedRecorder.get_stats()
+
+    @classmethod
+    def get_recording_stats(cls) -> dict:
+        if FeedWorkerProcess.is_active():
+            return dict(FeedWorkerProcess.get_status().get("recorder", {}))
+        return FeedRecorder.get_stats()
+
+    @classmethod
+    def _url_provider(cls, first_url: str):
+        """Connect-ல் authorize ஆன URL முதல் முறை; reconnects fresh URL"""
+        pending = [first_url]
+
+        async def provide() -> str:
+            if pending:
+                return pending.pop()
+            return await cls.get_authorized_url()
+
+        return provide
+
+    @classmethod
+    async def _on_connection_up(cls, connection: FeedConnection, gap: Optional[Tuple[int, int]]):
+        """
+        Reconnect hook - gap record + marker, பிறகு subscriptions replay
+
+        Gap marker replay-க்கு முன்னே queue ஆகும், அதனால் consumers
+        gap-க்கு பிறகு வரும் ticks-க்கு முன்னே அதைப் பார்ப்பார்கள்.
+        """
+        keys = sorted(connection.subscriptions)
+        if not keys:
+            return
+
+        if gap:
+            start_ms, end_ms = gap
+            for key in keys:
+                cls._gaps.setdefault(key, deque(maxlen=GAP_HISTORY)).append(gap)
+            FeedStreamWriter.submit_entries(encode_gap_entries(start_ms, end_ms, keys))
+            logger.warning(
+                f"{connection.name}: feed gap {(end_ms - start_ms) / 1000:.1f}s "
+                f"for {len(keys)} instruments, resubscribing"
+            )
+
+        by_mode: Dict[str, List[str]] = {}
+        for key in keys:
+            by_mode.setdefault(cls._modes.get(key, "full"), []).append(key)
+        for mode, mode_keys in by_mode.items():
+            await connection.send("sub", mode_keys, mode)
+
+    @classmethod
+    def _require_connected(cls, message: str = "WebSocket is not connected. Call /connect first."):
+        if not cls.is_connected():
+            raise RuntimeError(message)
+
+    @classmethod
+    def _assign_connection(cls, instrument_key: str) -> FeedConnection:
+        """
+        Key-க்கு connection தேர்வு - ஏற்கனவே routed ஆனா அதே connection,
+        இல்லையென்றால் least-loaded live connection
+        """
+        index = cls._key_connection.get(instrument_key)
+        if index is not None and index < len(cls._connections):
+            return cls._connections[index]
+
+        limit = settings.FEED_MAX_KEYS_PER_CONNECTION
+        candidates = [
+            c for c in cls._connections
+            if c.is_connected() and (limit <= 0 or len(c.subscriptions) < limit)
+        ]
+        if not candidates:
+            raise RuntimeError("No feed connection has capacity for more instruments")
+
+        connection = min(candidates, key=lambda c: len(c.subscriptions))
+        cls._key_connection[instrument_key] = connection.index
+        # Reserve now so the next key in the same batch sees the load
+        connection.subscriptions.add(instrument_key)
+        return connection
+
+    @classmethod
+    def _group_by_connection(cls, instrument_keys) -> Dict[int, List[str]]:
+        """Already-routed keys → {connection index: [keys]}"""
+        groups: Dict[int, List[str]] = {}
+        for key in instrument_keys:
+            index = cls._key_connection.get(key)
+            if index is not None:
+                groups.setdefault(index, []).append(key)
+        return groups
+
+    @classmethod
+    async def _send_subscribe(cls, instrument_keys: List[str], mode: str):
+        groups: Dict[int, List[str]] = {}
+        try:
+            for key in instrument_keys:
+                groups.setdefault(cls._assign_connection(key).index, []).append(key)
+        except RuntimeError:
+            cls._release(groups)
+            raise
+
+        for index, keys in groups.items():
+            try:
+                await cls._connections[index].send("sub", keys, mode)
+            except Exception:
+                cls._release({index: keys})
+                raise
+            cls._subscriptions.update(keys)
+            for key in keys:
+                cls._modes[key] = mode
+
+    @classmethod
+    def _release(cls, groups: Dict[int, List[str]]):
+        """Drop routing for keys that never got subscribed"""
+        for index, keys in groups.items():
+            cls._connections[index].subscriptions.difference_update(keys)
+            for key in keys:
+                cls._key_connection.pop(key, None)
+
+    @classmethod
+    async def _send_unsubscribe(cls, instrument_keys: List[str]):
+        for index, keys in cls._group_by_connection(instrument_keys).items():
+            connection = cls._connections[index]
+            if connection.is_connected():
+                await connection.send("unsub", keys)
+            connection.subscriptions.difference_update(keys)
+            for key in keys:
+                cls._key_connection.pop(key, None)
+                cls._modes.pop(key, None)
+        cls._subscriptions.difference_update(instrument_keys)
+
     @classmethod
     async def subscribe(cls, instrument_keys: List[str], mode: Literal["full", "full_d30", "ltpc"]):
-        if not cls._websocket or not cls._is_running:
-            raise RuntimeError("WebSocket is not connected. Call /connect first.")
+        if FeedWorkerProcess.is_active():
+            return await FeedWorkerProcess.call("subscribe", instrument_keys, mode)
+
+        cls._require_connected()
         
         new_keys = [key for key in instrument_keys if key not in cls._subscriptions]
         
         if not new_keys:
             return {"message": "All instruments are already subscribed"}
         
-        payload = {
-            "guid": str(uuid.uuid4()),
-            "method": "sub",
-            "data": {
-                "mode": mode,
-                "instrumentKeys": new_keys
-            }
-        }
-        
-        await cls._websocket.send(json.dumps(payload).encode('utf-8'))
-        cls._subscriptions.update(new_keys)
+        await cls._send_subscribe(new_keys, mode)
         return {"message": f"Subscribed to {len(new_keys)} new instruments in {mode} mode"}
 
     @classmethod
     async def unsubscribe(cls, instrument_keys: List[str]):
-        if not cls._websocket or not cls._is_running:
-            raise RuntimeError("WebSocket is not connected.")
-        
-        payload = {
-            "guid": str(uuid.uuid4()),
-            "method": "unsub",
-            "data": {
-                "instrumentKeys": instrument_keys
-            }
-        }
-        
-        await cls._websocket.send(json.dumps(payload).encode('utf-8'))
-        cls._subscriptions.difference_update(instrument_keys)
-        return {"message": f"Unsubscribed from {len(instrument_keys)} instruments"}
+        if FeedWorkerProcess.is_active():
+            result = await FeedWorkerProcess.call("unsubscribe", instrument_keys)
+        else:
+            cls._require_connected("WebSocket is not connected.")
+            await cls._send_unsubscribe(instrument_keys)
+            result = {"message": f"Unsubscribed from {len(instrument_keys)} instruments"}
+
+        # ?depth=delta books - feed-ல் இனி வராது
+        DepthDiffEngine.evict(instrument_keys)
+        return result
 
     @classmethod
     def get_subscriptions(cls) -> List[str]:
+        if FeedWorkerProcess.is_active():
+            return list(FeedWorkerProcess.get_status().get("subscriptions", []))
         return list(cls._subscriptions)
 
     @classmethod
     def is_connected(cls) -> bool:
         """Check if WebSocket is currently connected and running"""
-        return cls._is_running and cls._websocket is not None
+        if FeedWorkerProcess.is_active():
+            return bool(FeedWorkerProcess.get_status().get("connected"))
+        return cls._is_running and any(c.is_connected() for c in cls._connections)
+
+    @classmethod
+    def get_connection_health(cls) -> List[dict]:
+        """Per-connection health for /feed/status"""
+        if FeedWorkerProcess.is_active():
+            return list(FeedWorkerProcess.get_status().get("connections", []))
+        return [connection.health() for connection in cls._connections]
+
+    @classmethod
+    def get_gaps(cls, instrument_keys: Optional[List[str]] = None) -> Dict[str, List[dict]]:
+        """Recorded feed gaps per instrument: {key: [{start, end, duration_ms}]}"""
+        if FeedWorkerProcess.is_active():
+            gaps = FeedWorkerProcess.get_status().get("gaps", {})
+            if instrument_keys:
+                return {k: gaps[k] for k in instrument_keys if k in gaps}
+            return dict(gaps)
+
+        keys = instrument_keys if instrument_keys else list(cls._gaps.keys())
+        return {
+            key: [
+                {"start": start, "end": end, "duration_ms": end - start}
+                for start, end in cls._gaps[key]
+            ]
+            for key in keys if key in cls._gaps
+        }
 
     @classmethod
     async def update_subscriptions(
         cls, 
         new_instrument_keys: List[str], 
-        mode: Literal["full", "full_d30", "ltpc"] = "full"
+        mode: Literal["full", "full_d30", "ltpc"] = "full",
+        keep_keys: Optional[List[str]] = None
     ) -> dict:
         """
         Dynamic subscription management:
         - Subscribe to new keys
-        - Unsubscribe from old keys (except protected index keys)
+        - Unsubscribe from old keys (except protected index keys and
+          keep_keys - stream clients இன்னும் பார்க்கும் keys)
         """
-        if not cls._websocket or not cls._is_running:
-            raise RuntimeError("WebSocket is not connected. Call /connect first.")
+        if FeedWorkerProcess.is_active():
+            result = await FeedWorkerProcess.call("update_subscriptions", new_instrument_keys, mode, keep_keys)
+            DepthDiffEngine.evict(result.get("unsubscribed", []))
+            return result
+
+        cls._require_connected()
         
         new_keys_set = set(new_instrument_keys)
         current_keys = cls._subscriptions
         
         keys_to_subscribe = new_keys_set - current_keys
-        keys_to_unsubscribe = (current_keys - new_keys_set) - cls._protected_keys
+        keys_to_unsubscribe = (current_keys - new_keys_set) - cls._protected_keys - set(keep_keys or ())
         
         result = {
             "subscribed": [],
@@ -161,83 +375,18 @@ class FeedService:
             "protected_keys": list(cls._protected_keys & current_keys)
         }
         
-        # Unsubscribe from old option keys
+        # Unsubscribe from old option keys (routed to their own connections)
         if keys_to_unsubscribe:
-            unsub_payload = {
-                "guid": str(uuid.uuid4()),
-                "method": "unsub",
-                "data": {
-                    "instrumentKeys": list(keys_to_unsubscribe)
-                }
-            }
-            await cls._websocket.send(json.dumps(unsub_payload).encode('utf-8'))
-            cls._subscriptions.difference_update(keys_to_unsubscribe)
+            await cls._send_unsubscribe(list(keys_to_unsubscribe))
             result["unsubscribed"] = list(keys_to_unsubscribe)
+            DepthDiffEngine.evict(keys_to_unsubscribe)
         
-        # Subscribe to new keys
+        # Subscribe to new keys (sharded across connections)
         if keys_to_subscribe:
-            sub_payload = {
-                "guid": str(uuid.uuid4()),
-                "method": "sub",
-                "data": {
-                    "mode": mode,
-                    "instrumentKeys": list(keys_to_subscribe)
-                }
-            }
-            await cls._websocket.send(json.dumps(sub_payload).encode('utf-8'))
-            cls._subscriptions.update(keys_to_subscribe)
+            await cls._send_subscribe(list(keys_to_subscribe), mode)
             result["subscribed"] = list(keys_to_subscribe)
         
         result["current_subscriptions"] = list(cls._subscriptions)
         result["total_count"] = len(cls._subscriptions)
         
         return result
-
-    @classmethod
-    async def _run_loop(cls, ws_url: str):
-        redis_client = RedisClient.get_pool()
-        ssl_context = ssl.create_default_context()
-        
-        # Import Protobuf
-        try:
-            from app.proto import MarketDataFeedV3_pb2 as MarketDataFeed_pb2
-            from google.protobuf.json_format import MessageToDict
-            HAS_PROTOBUF = True
-        except ImportError:
-            HAS_PROTOBUF = False
-            logger.warning("MarketDataFeedV3_pb2 not found. Protobuf decoding disabled.")
-        
-        try:
-            async with websockets.connect(ws_url, ssl=ssl_context) as websocket:
-                cls._websocket = websocket
-                logger.info("WebSocket Connected")
-                
-                async for message in websocket:
-                    if not cls._is_running:
-                        break
-                    
-                    try:
-                        data_dict = {}
-                        
-                        if isinstance(message, bytes):
-                            if HAS_PROTOBUF:
-                                feed_response = MarketDataFeed_pb2.FeedResponse()
-                                feed_response.ParseFromString(message)
-                                data_dict = MessageToDict(feed_response)
-                            else:
-                                continue
-                        else:
-                            data_dict = json.loads(message)
-                        
-                        if data_dict:
-                            await redis_client.xadd("market_feed", {"data": json.dumps(data_dict)})
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing message: {e}")
-                        
-        except Exception as e:
-            logger.error(f"WebSocket connection error: {e}")
-        finally:
-            cls._is_running = False
-            cls._websocket = None
-            logger.info("WebSocket Disconnected")
@@ -0,0 +1,121 @@
+"""
+Feed Stream Reader - XREAD Over Combined / Sharded market_feed
+===============================================================
+
+Stream consumers (live SSE, candles, VWAP) எல்லாம் இந்த reader use பண்ணும்.
+
+Stream Selection:
+    Filter இல்லை                       → market_feed (combined)
+    Filter + FEED_SHARDED_STREAMS     → market_feed:{key} for each filtered key
+
+Filtered client-ன் cost அது கேட்ட instruments-க்கு மட்டும் scale ஆகும்,
+total subscriptions-க்கு இல்லை.
+
+Unfiltered consumers (CandleEngine, /live /vwap filter இல்லாமல்) market_feed
+மட்டும் read பண்ண முடியும் - FEED_COMBINED_STREAM=false-ல் அவை வேலை செய்யாது
+(check_feed_streams startup-ல் fail பண்ணும்).
+
+Author: Antony HFT System
+"""
+
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.services.feed_decoder import STREAM_NAME, FeedFrame, decode_entry, shard_stream_name
+
+
+def feed_stream_names(instrument_filter: Optional[Set[str]] = None) -> List[str]:
+    """Streams a consumer with this filter should XREAD"""
+    if instrument_filter and settings.FEED_SHARDED_STREAMS:
+        return [shard_stream_name(key) for key in sorted(instrument_filter)]
+    return [STREAM_NAME]
+
+
+def check_feed_streams():
+    """
+    Startup validation - stream flags consumers-உடன் பொருந்துகிறதா
+
+    Raises:
+        RuntimeError: எந்த stream-ம் write ஆகாது, அல்லது combined stream
+                      இல்லாமல் CandleEngine (wildcard consumer) enabled
+    """
+    if settings.FEED_COMBINED_STREAM:
+        return
+    if not settings.FEED_SHARDED_STREAMS:
+        raise RuntimeError("FEED_COMBINED_STREAM and FEED_SHARDED_STREAMS are both false - no feed stream is written")
+    if settings.CANDLE_ENGINE_ENABLED:
+        raise RuntimeError(
+            "CANDLE_ENGINE_ENABLED needs FEED_COMBINED_STREAM=true (the engine reads every instrument); "
+            "set CANDLE_ENGINE_ENABLED=false on shard-only processes"
+        )
+
+
+class FeedStreamReader:
+    """
+    Tail reader for market_feed streams
+
+    Usage:
+        reader = FeedStreamReader(instrument_filter, count=10)
+
+        while True:
+            frames = await reader.read()
+            if frames is None:
+                # Block timeout - send keep-alive
+                continue
+            for frame in frames:
+                ...
+    """
+
+    def __init__(
+        self,
+        instrument_filter: Optional[Set[str]] = None,
+        count: int = 10,
+        block: int = 1000,
+        last_id: str = "$"
+    ):
+        self.instrument_filter = instrument_filter
+        self.count = count
+        self.block = block
+        self._last_ids: Dict[str, str | bytes] = {
+            name: last_id for name in feed_stream_names(instrument_filter)
+        }
+
+    def set_streams(self, stream_names: List[str]):
+        """
+        Stream set மாற்றம் (TickBus filter union மாறும்போது)
+
+        ஏற்கனவே read ஆன streams-ன் position மாறாது; புதியவை "$"-ல் இருந்து.
+        """
+        self._last_ids = {
+            name: self._last_ids.get(name, "$") for name in stream_names
+        }
+
+    async def read(self) -> Optional[List[FeedFrame]]:
+        """
+        One XREAD round
+
+        Returns:
+            Decoded frames (may be empty), or None on block timeout
+        """
+        redis = RedisClient.get_binary_pool()
+        streams = await redis.xread(
+            streams=self._last_ids,
+            count=self.count,
+            block=self.block
+        )
+
+        if not streams:
+            return None
+
+        frames: List[FeedFrame] = []
+        for stream_name, messages in streams:
+            if isinstance(stream_name, bytes):
+                stream_name = stream_name.decode()
+            for message_id, fields in messages:
+                self._last_ids[stream_name] = message_id
+                frame = decode_entry(message_id, fields)
+                if frame is not None:
+                    frame.stream = stream_name
+                    frames.append(frame)
+        return frames
@@ -0,0 +1,247 @@
+"""
+Feed Worker Process - Ingest Pipeline Outside the API Event Loop
+=================================================================
+
+FEED_INGEST_PROCESS=true ஆனா WebSocket receive + decode + XADD pipeline
+ஒரு தனி process-ல் run ஆகும். Feed burst வந்தாலும் FastAPI loop
+(/order/place, SSE clients) latency பாதிக்காது.
+
+Architecture:
+    API process                          Worker process (spawn)
+    ───────────                          ──────────────────────
+    /feed/* → FeedService ──commands──→  FeedService (real socket)
+                         ←──replies───   FeedStreamWriter → Redis
+    status cache         ←──status────   (every second + after commands)
+
+Worker-க்கு சொந்த Redis / Postgres pools உண்டு (access token DB-ல் இருந்து).
+API process-ல் இருந்து வரும் commands FeedService methods-ஐ அப்படியே call பண்ணும்.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import logging
+import multiprocessing as mp
+import queue
+import uuid
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COMMAND_TIMEOUT = 15.0  # seconds
+STATUS_INTERVAL = 1.0  # seconds
+
+# Worker-ல் call பண்ணலாம் என்று அனுமதிக்கப்பட்ட FeedService methods
+ALLOWED_METHODS = {
+    "connect",
+    "disconnect",
+    "subscribe",
+    "unsubscribe",
+    "update_subscriptions",
+    "start_recording",
+    "stop_recording",
+}
+
+# Worker exception → API process-ல் அதே class (ValueError → 400 போன்ற handling);
+# மற்றவை RuntimeError
+REMOTE_ERRORS = {
+    error.__name__: error
+    for error in (ValueError, KeyError, TypeError, FileNotFoundError, PermissionError, TimeoutError, ConnectionError)
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WORKER SIDE - runs in the child process
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _status_snapshot() -> Dict[str, Any]:
+    from app.services.feed_service import FeedService
+    from app.services.feed_writer import FeedStreamWriter
+
+    return {
+        "type": "status",
+        "connected": FeedService.is_connected(),
+        "subscriptions": FeedService.get_subscriptions(),
+        "connections": FeedService.get_connection_health(),
+        "gaps": FeedService.get_gaps(),
+        "recorder": FeedService.get_recording_stats(),
+        "writer": FeedStreamWriter.get_stats(),
+    }
+
+
+async def _worker_loop(commands: mp.Queue, events: mp.Queue):
+    from app.db.postgres import PostgresClient
+    from app.db.redis import RedisClient
+    from app.services.feed_service import FeedService
+
+    try:
+        await PostgresClient.create_pool()
+    except Exception as e:
+        logger.error(f"Feed worker Postgres connection failed: {e}")
+
+    loop = asyncio.get_running_loop()
+    events.put(_status_snapshot())
+
+    async def publish_status():
+        while True:
+            await asyncio.sleep(STATUS_INTERVAL)
+            events.put(_status_snapshot())
+
+    status_task = asyncio.create_task(publish_status())
+    logger.info("Feed worker process started")
+
+    try:
+        while True:
+            command = await loop.run_in_executor(None, commands.get)
+            if command is None or command.get("method") == "shutdown":
+                break
+
+            request_id = command.get("id")
+            method = command.get("method")
+            reply: Dict[str, Any] = {"type": "reply", "id": request_id}
+            try:
+                if method not in ALLOWED_METHODS:
+                    raise ValueError(f"Unknown feed command: {method}")
+                handler = getattr(FeedService, method)
+                reply["result"] = await handler(*command.get("args", []), **command.get("kwargs", {}))
+            except Exception as e:
+                reply["error"] = str(e)
+                reply["error_type"] = type(e).__name__
+
+            events.put(reply)
+            events.put(_status_snapshot())
+    finally:
+        status_task.cancel()
+        await FeedService.disconnect()
+        await RedisClient.close_pool()
+        await PostgresClient.close_pool()
+        logger.info("Feed worker process stopped")
+
+
+def _worker_main(commands: mp.Queue, events: mp.Queue):
+    """Process entry point (spawn target)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - feed-worker - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(_worker_loop(commands, events))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# API SIDE - process manager used by FeedService + app lifespan
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FeedWorkerProcess:
+    """
+    Ingest worker manager (API process)
+
+    Usage:
+        FeedWorkerProcess.start()                       # lifespan startup
+        await FeedWorkerProcess.call("subscribe", keys, "full")
+        FeedWorkerProcess.get_status()                  # cached, sync
+        await FeedWorkerProcess.stop()                  # lifespan shutdown
+    """
+
+    _process: Optional[mp.Process] = None
+    _commands: Optional[mp.Queue] = None
+    _events: Optional[mp.Queue] = None
+    _reader_task: Optional[asyncio.Task] = None
+    _pending: Dict[str, asyncio.Future] = {}
+    _status: Dict[str, Any] = {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return settings.FEED_INGEST_PROCESS
+
+    @classmethod
+    def is_active(cls) -> bool:
+        """True only in the API process while the worker is managed"""
+        return cls._process is not None
+
+    @classmethod
+    def start(cls):
+        if cls._process is not None or not cls.is_enabled():
+            return
+
+        ctx = mp.get_context("spawn")
+        cls._commands = ctx.Queue()
+        cls._events = ctx.Queue()
+        cls._process = ctx.Process(
+            target=_worker_main,
+            args=(cls._commands, cls._events),
+            name="feed-ingest-worker",
+            daemon=True,
+        )
+        cls._process.start()
+        cls._reader_task = asyncio.create_task(cls._read_events())
+        logger.info(f"Feed ingest worker started (pid={cls._process.pid})")
+
+    @classmethod
+    async def stop(cls):
+        if cls._process is None:
+            return
+
+        cls._commands.put({"method": "shutdown"})
+        await asyncio.to_thread(cls._process.join, COMMAND_TIMEOUT)
+        if cls._process.is_alive():
+            logger.warning("Feed worker did not stop in time, terminating")
+            cls._process.terminate()
+
+        # Unblock the reader thread
+        cls._events.put(None)
+        if cls._reader_task:
+            await cls._reader_task
+
+        for future in cls._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Feed worker stopped"))
+        cls._pending.clear()
+        cls._process = None
+        cls._reader_task = None
+        cls._status = {}
+
+    @classmethod
+    async def call(cls, method: str, *args, **kwargs) -> Any:
+        """Run a FeedService method inside the worker and return its result"""
+        if cls._process is None or not cls._process.is_alive():
+            raise RuntimeError("Feed worker process is not running")
+
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        cls._pending[request_id] = future
+        cls._commands.put({"id": request_id, "method": method, "args": list(args), "kwargs": kwargs})
+
+        try:
+            return await asyncio.wait_for(future, COMMAND_TIMEOUT)
+        finally:
+            cls._pending.pop(request_id, None)
+
+    @classmethod
+    def get_status(cls) -> Dict[str, Any]:
+        return cls._status
+
+    @classmethod
+    async def _read_events(cls):
+        events = cls._events
+        while True:
+            try:
+                event = await asyncio.to_thread(events.get)
+            except (EOFError, OSError, queue.Empty):
+                break
+            if event is None:
+                break
+
+            if event.get("type") == "status":
+                cls._status = event
+                continue
+
+            future = cls._pending.get(event.get("id"))
+            if future is None or future.done():
+                continue
+            if "error" in event:
+                error = REMOTE_ERRORS.get(event.get("error_type"), RuntimeError)
+                future.set_exception(error(event["error"]))
+            else:
+                future.set_result(event.get("result"))
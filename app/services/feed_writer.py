@@ -0,0 +1,235 @@
+"""
+Feed Stream Writer - Micro-Batched, Pipelined XADD
+===================================================
+
+WebSocket receive loop Redis round-trip-க்காக காத்திருக்காமல் இருக்க:
+
+    WebSocket recv → submit() → [bounded queue] → writer task → Redis pipeline
+
+Writer Loop:
+    1. Queue-ல் முதல் message வரும் வரை wait
+    2. FEED_WRITER_FLUSH_MS window அல்லது FEED_WRITER_BATCH_SIZE வரை collect
+    3. Encode (feed_decoder) → ஒரே pipeline-ல் எல்லா XADD-ம் → execute
+
+Queue full ஆனா (Redis slow) oldest message drop ஆகும், receive loop
+ஒருபோதும் block ஆகாது. Drops counters-ல் தெரியும்.
+
+ஒவ்வொரு flush-லும் instrument-க்கு கடைசி feed அதே pipeline-ல் HSET
+market_quotes (QuoteCache - connect snapshot / GET /quotes).
+
+Pre-encoded entries (reconnect gap markers) submit_entries() மூலம் அதே
+queue-ல் போகும் - ticks-உடன் order மாறாது.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.services.feed_decoder import encode_feed_entries, encode_quote_values
+from app.services.quote_cache import QUOTE_HASH, QuoteCache
+from app.services.stream_retention import stream_maxlen
+
+logger = logging.getLogger(__name__)
+
+
+class FeedStreamWriter:
+    """
+    Ingest writer - FeedService start/stop பண்ணும்
+
+    Usage:
+        FeedStreamWriter.start()
+        FeedStreamWriter.submit(message)   # never blocks
+        FeedStreamWriter.submit_entries(encode_gap_entries(...))
+        await FeedStreamWriter.stop()      # drains the queue
+    """
+
+    _queue: Optional[asyncio.Queue] = None
+    _task: Optional[asyncio.Task] = None
+    _stopping: bool = False
+    _stats: Dict[str, Any] = {}
+
+    @classmethod
+    def _reset_stats(cls):
+        cls._stats = {
+            "messages_in": 0,
+            "messages_written": 0,
+            "entries_written": 0,
+            "dropped": 0,
+            "errors": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "max_queue_depth": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._task is not None and not cls._task.done()
+
+    @classmethod
+    def start(cls):
+        if cls.is_running():
+            return
+        cls._queue = asyncio.Queue(maxsize=settings.FEED_WRITER_QUEUE_SIZE)
+        cls._stopping = False
+        cls._reset_stats()
+        cls._task = asyncio.create_task(cls._run_loop())
+
+    @classmethod
+    async def stop(cls):
+        """Stop after flushing whatever is already queued"""
+        if not cls._task:
+            return
+        cls._stopping = True
+        try:
+            await cls._task
+        finally:
+            cls._task = None
+            cls._stopping = False
+
+    @classmethod
+    def submit_entries(cls, entries: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """Queue already-encoded (stream_name, fields) entries"""
+        if not entries:
+            return True
+        return cls.submit(entries)
+
+    @classmethod
+    def submit(cls, message: bytes | str | List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        Queue a raw WebSocket message (non-blocking)
+
+        Returns:
+            False if an older message had to be dropped to make room
+        """
+        if cls._queue is None:
+            return False
+
+        cls._stats["messages_in"] += 1
+        accepted = True
+        if cls._queue.full():
+            cls._queue.get_nowait()
+            cls._stats["dropped"] += 1
+            accepted = False
+
+        cls._queue.put_nowait(message)
+        depth = cls._queue.qsize()
+        if depth > cls._stats["max_queue_depth"]:
+            cls._stats["max_queue_depth"] = depth
+        return accepted
+
+    @classmethod
+    async def put(cls, message: bytes | str):
+        """
+        Queue a message, waiting for room instead of dropping
+
+        Replay-க்கு மட்டும் - live receive loop submit() use பண்ணும்.
+        """
+        if cls._queue is None:
+            raise RuntimeError("FeedStreamWriter is not running")
+        await cls._queue.put(message)
+        cls._stats["messages_in"] += 1
+        depth = cls._queue.qsize()
+        if depth > cls._stats["max_queue_depth"]:
+            cls._stats["max_queue_depth"] = depth
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        stats = dict(cls._stats)
+        batches = stats.get("batches", 0)
+        stats["running"] = cls.is_running()
+        stats["queue_depth"] = cls._queue.qsize() if cls._queue else 0
+        stats["avg_batch_size"] = round(stats.get("messages_written", 0) / batches, 2) if batches else 0
+        stats["avg_flush_ms"] = round(stats.pop("total_flush_ms", 0.0) / batches, 3) if batches else 0
+        return stats
+
+    @classmethod
+    async def _collect(cls) -> List[bytes | str]:
+        """First message-க்கு wait, பிறகு window/size limit வரை batch"""
+        queue = cls._queue
+        try:
+            # Short timeout so stop() is noticed even when the feed is idle
+            batch = [await asyncio.wait_for(queue.get(), 0.5)]
+        except asyncio.TimeoutError:
+            return []
+
+        max_size = settings.FEED_WRITER_BATCH_SIZE
+        deadline = time.monotonic() + settings.FEED_WRITER_FLUSH_MS / 1000
+
+        while len(batch) < max_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or cls._stopping:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    @classmethod
+    async def _flush(cls, batch: List[bytes | str]):
+        redis_client = RedisClient.get_binary_pool()
+        pipe = redis_client.pipeline(transaction=False)
+        entry_count = 0
+        # Batch-க்குள் பின்னால் வந்தது overwrite - ஒரு HSET மட்டும்
+        quotes: Dict[str, bytes | str] = {}
+
+        for message in batch:
+            try:
+                entries = message if isinstance(message, list) else encode_feed_entries(message)
+                for stream_name, fields in entries:
+                    pipe.xadd(
+                        stream_name, fields,
+                        maxlen=stream_maxlen(stream_name), approximate=True
+                    )
+                    entry_count += 1
+                if settings.QUOTE_CACHE_ENABLED:
+                    quotes.update(encode_quote_values(entries))
+            except Exception as e:
+                cls._stats["errors"] += 1
+                logger.error(f"Error processing message: {e}")
+
+        if entry_count == 0:
+            return
+        if quotes:
+            pipe.hset(QUOTE_HASH, mapping=quotes)
+
+        start = time.perf_counter()
+        await pipe.execute()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if quotes:
+            QuoteCache.store(quotes)
+
+        stats = cls._stats
+        stats["batches"] += 1
+        stats["messages_written"] += len(batch)
+        stats["entries_written"] += entry_count
+        stats["last_batch_size"] = len(batch)
+        stats["max_batch_size"] = max(stats["max_batch_size"], len(batch))
+        stats["last_flush_ms"] = round(elapsed_ms, 3)
+        stats["max_flush_ms"] = max(stats["max_flush_ms"], round(elapsed_ms, 3))
+        stats["total_flush_ms"] += elapsed_ms
+
+    @classmethod
+    async def _run_loop(cls):
+        # stop() → queue drain ஆன பிறகு தான் exit
+        while not (cls._stopping and cls._queue.empty()):
+            batch = await cls._collect()
+            if not batch:
+                continue
+            try:
+                await cls._flush(batch)
+            except Exception as e:
+                cls._stats["errors"] += 1
+                logger.error(f"Feed writer flush failed ({len(batch)} messages): {e}")
@@ -0,0 +1,145 @@
+"""
+Quote Cache - Last Value per Instrument (Memory + Redis)
+=========================================================
+
+Streams `$`-ல் இருந்து தொடங்குவதால் புதிதாக திறந்த dashboard அடுத்த tick
+வரும் வரை காலியாக இருக்கும். Ingest writer ஒவ்வொரு flush-லும் instrument-க்கு
+கடைசி feed-ஐ இங்கே வைக்கும்:
+
+    FeedStreamWriter._flush → XADD pipeline-லேயே HSET market_quotes
+                            → அதே process-ல் memory dict update
+
+Storage:
+    market_quotes (Redis hash)  field = instrument_key
+                                value = single-feed payload (stream entry format -
+                                        FeedResponse bytes அல்லது legacy JSON)
+
+Read:
+    Ingest இதே process-ல் (FEED_INGEST_PROCESS=false) → memory (no Redis hop)
+    Worker process / பல uvicorn workers          → ஒரே HMGET
+
+Consumers:
+    GET /api/v1/quotes?instruments=...     → batch snapshot
+    /stream/live, /stream/vwap, /stream/ws → connect-ல் முதலில் snapshot
+
+Author: Antony HFT System
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.services import codec
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.services.feed_decoder import FeedFrame, decode_quote_value
+
+logger = logging.getLogger(__name__)
+
+QUOTE_HASH = "market_quotes"
+SNAPSHOT_TYPE = "initial_feed"
+
+
+class QuoteCache:
+    """
+    Process-wide last-value cache
+
+    Usage:
+        # Ingest (FeedStreamWriter)
+        pipe.hset(QUOTE_HASH, mapping=values)
+        QuoteCache.store(values)
+
+        # Read
+        frames = await QuoteCache.get_frames({"NSE_FO|61755"})
+        payload = QuoteCache.snapshot_json(frames)
+    """
+
+    _frames: Dict[str, FeedFrame] = {}
+    _local_ingest: bool = False
+    _stats: Dict[str, int] = {"updates": 0, "memory_reads": 0, "redis_reads": 0}
+
+    @classmethod
+    def store(cls, values: Dict[str, bytes | str]):
+        """Ingest side - Redis HSET-உடன் அதே values (decode lazy)"""
+        frames = cls._frames
+        for instrument_key, value in values.items():
+            frame = decode_quote_value(value)
+            if frame is not None:
+                frames[instrument_key] = frame
+        cls._local_ingest = True
+        cls._stats["updates"] += len(values)
+
+    @classmethod
+    async def get_frames(cls, instrument_keys: Optional[Iterable[str]] = None) -> Dict[str, FeedFrame]:
+        """
+        Latest single-feed frame per instrument
+
+        Args:
+            instrument_keys: None / empty → cache-ல் உள்ள எல்லா instruments
+
+        Returns:
+            {instrument_key: FeedFrame} - tick வராத instruments இருக்காது
+        """
+        keys = list(instrument_keys) if instrument_keys else None
+
+        if cls._local_ingest:
+            cls._stats["memory_reads"] += 1
+            if keys is None:
+                return dict(cls._frames)
+            return {key: cls._frames[key] for key in keys if key in cls._frames}
+
+        cls._stats["redis_reads"] += 1
+        redis = RedisClient.get_binary_pool()
+        if keys is None:
+            raw = await redis.hgetall(QUOTE_HASH)
+            pairs = ((k.decode() if isinstance(k, bytes) else k, v) for k, v in raw.items())
+        else:
+            pairs = zip(keys, await redis.hmget(QUOTE_HASH, keys))
+
+        frames: Dict[str, FeedFrame] = {}
+        for instrument_key, value in pairs:
+            frame = decode_quote_value(value)
+            if frame is not None:
+                frames[instrument_key] = frame
+        return frames
+
+    @classmethod
+    async def get_snapshot(cls, instrument_filter: Optional[Set[str]] = None) -> Dict[str, FeedFrame]:
+        """get_frames() - cache disabled / Redis error → empty (stream தொடரும்)"""
+        if not settings.QUOTE_CACHE_ENABLED:
+            return {}
+        try:
+            return await cls.get_frames(instrument_filter)
+        except Exception as e:
+            logger.error(f"Quote snapshot failed: {e}")
+            return {}
+
+    @staticmethod
+    def snapshot_json(frames: Dict[str, FeedFrame], fragment=None) -> Optional[str]:
+        """
+        {"type": "initial_feed", "feeds": {key: feed, ...}} - /stream/live
+        payload shape (Upstox-ன் subscribe snapshot type), cached feed_json
+        fragments join மட்டும்
+
+        Args:
+            fragment: (instrument_key, frame) → feed JSON (default frame.feed_json)
+        """
+        if not frames:
+            return None
+        parts = []
+        for instrument_key, frame in frames.items():
+            feed = fragment(instrument_key, frame) if fragment else frame.feed_json(instrument_key)
+            parts.append(f"{codec.dumps(instrument_key)}: {feed}")
+        return f'{{"type": "{SNAPSHOT_TYPE}", "feeds": {{{", ".join(parts)}}}}}'
+
+    @staticmethod
+    def snapshot_dict(frames: Dict[str, FeedFrame]) -> Dict[str, Any]:
+        return {"type": SNAPSHOT_TYPE, "feeds": {key: frame.feed_dict(key) for key, frame in frames.items()}}
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return dict(
+            cls._stats,
+            enabled=settings.QUOTE_CACHE_ENABLED,
+            source="memory" if cls._local_ingest else "redis",
+            instruments=len(cls._frames),
+        )
@@ -0,0 +1,214 @@
+"""
+Stream Client Registry - Admission Control, Idle Detection, Client Stats
+=========================================================================
+
+/stream/* SSE மற்றும் /stream/ws clients எல்லாம் இங்கே register ஆகும்.
+
+    1. Admission  → STREAM_MAX_CLIENTS நிரம்பினால் StreamCapacityError (API → 503)
+    2. Tracking   → events/bytes sent, TickBus queue depth + drops, lag
+    3. Idle       → ஒரு send STREAM_IDLE_TIMEOUT_SECONDS-க்கு மேல் முடியவில்லை
+                    (dead TCP / stalled browser) → client task cancel
+
+SSE generator-ல் `yield` return ஆவது = முந்தைய chunk send முடிந்தது.
+Yield-க்கும் resume-க்கும் இடையே நேரம் = அந்த chunk-ன் send time; அது
+நீண்டால் link stuck. அமைதியான streams (orders) idle ஆகாது - data
+இல்லாதது stall இல்லை.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from app.services import codec
+from app.core.config import settings
+from app.services.tick_bus import TickSubscription
+
+logger = logging.getLogger(__name__)
+
+REAP_INTERVAL = 5.0  # seconds
+
+
+class StreamCapacityError(RuntimeError):
+    """STREAM_MAX_CLIENTS reached"""
+
+
+def slow_consumer_event(client: Optional["StreamClient"], error: Exception) -> str:
+    """SlowConsumerError → final SSE event (generator then returns)"""
+    if client is not None:
+        client.disconnect_reason = "slow_consumer"
+    logger.warning(f"Disconnecting slow stream client {client.id if client else '-'}: {error}")
+    return f"event: error\ndata: {codec.dumps({'error': 'slow_consumer', 'detail': str(error)})}\n\n"
+
+
+class StreamClient:
+    """One connected stream client"""
+
+    def __init__(self, client_id: int, kind: str, remote: str, instrument_filter: Optional[Set[str]]):
+        self.id = client_id
+        self.kind = kind
+        self.remote = remote
+        self.instruments = len(instrument_filter) if instrument_filter else None
+        self.connected_at = time.time()
+        self.registered_at = time.monotonic()
+        self.last_send_at: Optional[float] = None
+        self.sending_since: Optional[float] = None
+        self.events = 0
+        self.bytes = 0
+        self.lag_ms: Optional[int] = None
+        self.subscription: Optional[TickSubscription] = None
+        self.task: Optional[asyncio.Task] = None
+        self.disconnect_reason: Optional[str] = None
+
+    def on_sending(self):
+        self.sending_since = time.monotonic()
+
+    def on_sent(self, size: int):
+        self.sending_since = None
+        self.events += 1
+        self.bytes += size
+        self.last_send_at = time.monotonic()
+
+    def on_frames(self, entry_ms: int):
+        """Bus frame stream-ல் append ஆனதில் இருந்து client pull பண்ணும் வரை"""
+        self.lag_ms = max(0, int(time.time() * 1000) - entry_ms)
+
+    def stalled_seconds(self) -> float:
+        """Current send in flight for this long (0 = not sending)"""
+        if self.sending_since is None:
+            return 0.0
+        return time.monotonic() - self.sending_since
+
+    def idle_seconds(self) -> float:
+        """Since the last completed send (or registration)"""
+        return time.monotonic() - (self.last_send_at or self.registered_at)
+
+    def get_stats(self) -> Dict[str, Any]:
+        subscription = self.subscription
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "remote": self.remote,
+            "instruments": self.instruments,
+            "connected_seconds": round(time.time() - self.connected_at, 1),
+            "idle_seconds": round(self.idle_seconds(), 1),
+            "stalled_seconds": round(self.stalled_seconds(), 1),
+            "events": self.events,
+            "bytes": self.bytes,
+            "lag_ms": self.lag_ms,
+            "queue_depth": subscription.queue.qsize() if subscription else None,
+            "dropped": subscription.dropped if subscription else 0,
+        }
+
+
+class StreamClientRegistry:
+    """
+    Process-wide stream clients
+
+    Usage (SSE endpoint):
+        try:
+            client = StreamClientRegistry.register("live", request.client.host, instrument_filter)
+        except StreamCapacityError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return StreamingResponse(StreamClientRegistry.track(client, generator), ...)
+    """
+
+    _clients: Dict[int, StreamClient] = {}
+    _ids = itertools.count(1)
+    _reaper: Optional[asyncio.Task] = None
+    _stats: Dict[str, int] = {"accepted": 0, "rejected": 0, "idle_disconnects": 0, "slow_disconnects": 0}
+
+    @classmethod
+    def register(cls, kind: str, remote: str = "", instrument_filter: Optional[Set[str]] = None) -> StreamClient:
+        """
+        Raises:
+            StreamCapacityError: STREAM_MAX_CLIENTS நிரம்பியது
+        """
+        max_clients = settings.STREAM_MAX_CLIENTS
+        if max_clients and len(cls._clients) >= max_clients:
+            cls._stats["rejected"] += 1
+            raise StreamCapacityError(f"Stream client limit reached ({max_clients})")
+
+        client = StreamClient(next(cls._ids), kind, remote, instrument_filter)
+        cls._clients[client.id] = client
+        cls._stats["accepted"] += 1
+        cls._ensure_reaper()
+        return client
+
+    @classmethod
+    def unregister(cls, client: StreamClient):
+        cls._clients.pop(client.id, None)
+        if client.disconnect_reason == "slow_consumer":
+            cls._stats["slow_disconnects"] += 1
+        if not cls._clients and cls._reaper is not None:
+            cls._reaper.cancel()
+            cls._reaper = None
+
+    @classmethod
+    async def track(cls, client: StreamClient, generator: AsyncIterator[str]) -> AsyncIterator[str]:
+        """SSE body wrapper - send accounting + unregister on close"""
+        client.task = asyncio.current_task()
+        try:
+            async for chunk in generator:
+                client.on_sending()
+                yield chunk
+                # Resumed → chunk written to the transport
+                client.on_sent(len(chunk))
+        finally:
+            cls.unregister(client)
+
+    @classmethod
+    def client_count(cls) -> int:
+        return len(cls._clients)
+
+    @classmethod
+    def get_clients(cls) -> List[Dict[str, Any]]:
+        return [client.get_stats() for client in cls._clients.values()]
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        by_kind: Dict[str, int] = {}
+        for client in cls._clients.values():
+            by_kind[client.kind] = by_kind.get(client.kind, 0) + 1
+        return dict(
+            cls._stats,
+            connected=len(cls._clients),
+            max_clients=settings.STREAM_MAX_CLIENTS,
+            policy=settings.STREAM_SLOW_CLIENT_POLICY,
+            by_kind=by_kind,
+        )
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # IDLE REAPER
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    def _ensure_reaper(cls):
+        if settings.STREAM_IDLE_TIMEOUT_SECONDS <= 0:
+            return
+        if cls._reaper is None or cls._reaper.done():
+            cls._reaper = asyncio.create_task(cls._reap_loop())
+
+    @classmethod
+    async def _reap_loop(cls):
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            timeout = settings.STREAM_IDLE_TIMEOUT_SECONDS
+            for client in list(cls._clients.values()):
+                # Registered but the response body never started
+                never_started = client.task is None and client.idle_seconds() >= timeout
+                if client.stalled_seconds() < timeout and not never_started:
+                    continue
+                logger.warning(
+                    f"Stream client {client.id} ({client.kind} {client.remote}) send stalled "
+                    f"{client.stalled_seconds():.0f}s - disconnecting"
+                )
+                client.disconnect_reason = "idle"
+                cls._stats["idle_disconnects"] += 1
+                if client.task is not None and not client.task.done():
+                    client.task.cancel()
+                # Body never started / task already gone - nothing else will unregister it
+                cls._clients.pop(client.id, None)
@@ -0,0 +1,181 @@
+"""
+Stream Encoding - /stream/ws Wire Formats (JSON / msgpack / Protobuf)
+======================================================================
+
+Option-chain tables மற்றும் Python strategy clients-க்கு text JSON பெரிசு -
+ஒரு candle-லேயே 30 bid/ask walls. /stream/ws content negotiation மூலம்
+compact binary frames அனுப்பும்.
+
+Negotiation (முதல் match):
+    1. ?format=json|msgpack|protobuf
+    2. Sec-WebSocket-Protocol: "protobuf", "msgpack", "json" (client order)
+    3. json (default)
+
+Formats:
+    json      → text frames {"ch", "data"} (existing shape)
+    msgpack   → binary, same {"ch", "data"} envelope
+                Tick feeds per instrument ஒரு முறை pack ஆகி frame-ல் cache
+    protobuf  → binary StreamMessage (app/proto/AntonyStreamV1.proto)
+                Ticks = Upstox FeedResponse bytes (filter இல்லை → zero encode)
+
+msgpack optional dependency (app/services/codec.py):
+    uv sync --extra stream
+
+Author: Antony HFT System
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.models.candle import Candle1M
+from app.services import codec
+from app.services.codec import HAS_MSGPACK
+from app.services.feed_decoder import HAS_PROTOBUF, FeedFrame
+
+if HAS_PROTOBUF:
+    from google.protobuf.json_format import ParseDict
+    from app.proto import AntonyStreamV1_pb2 as Stream_pb2
+    from app.proto import MarketDataFeedV3_pb2 as MarketDataFeed_pb2
+
+Payload = str | bytes
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENCODERS - one instance per format, shared by every session
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class JsonStreamEncoder:
+    """Text frames - {"ch": ..., "data": ...}"""
+
+    name = "json"
+
+    def tick(self, frame: FeedFrame, instrument_filter: Optional[Set[str]]) -> Optional[Payload]:
+        payload = frame.to_json(instrument_filter)
+        if not payload:
+            return None
+        # Cached payload string - no re-serialization per channel wrapper
+        return f'{{"ch": "tick", "data": {payload}}}'
+
+    def candle(self, candle: Candle1M, partial: bool = False) -> Payload:
+        channel = "candle_partial" if partial else "candle"
+        return f'{{"ch": "{channel}", "data": {codec.encode_model(candle)}}}'
+
+    def message(self, channel: str, data: Any) -> Payload:
+        """vwap / gap / order / control (ack, error, pong)"""
+        return codec.dumps({"ch": channel, "data": data})
+
+
+class MsgpackStreamEncoder(JsonStreamEncoder):
+    """Binary msgpack - same envelope as JSON"""
+
+    name = "msgpack"
+
+    def __init__(self):
+        self._codec = codec.get_codec("msgpack")
+        self._packer = self._codec.packer
+
+    def tick(self, frame: FeedFrame, instrument_filter: Optional[Set[str]]) -> Optional[Payload]:
+        keys = frame.filtered_keys(instrument_filter)
+        if instrument_filter and not keys:
+            return None
+        cache_key = ("msgpack", tuple(keys) if instrument_filter else None)
+        return frame.encoded(cache_key, lambda: self._pack_tick(frame, keys))
+
+    def _pack_tick(self, frame: FeedFrame, keys: List[str]) -> bytes:
+        """
+        Envelope-ஐ கையால் assemble - per-instrument packed feeds
+        (வேறு filter clients-க்கும்) reuse ஆகும்
+        """
+        pack = self._packer.pack
+        header = frame.header_dict()
+        parts = [
+            self._packer.pack_map_header(2), pack("ch"), pack("tick"), pack("data"),
+            self._packer.pack_map_header(len(header) + 1),
+        ]
+        for field, value in header.items():
+            parts.append(pack(field))
+            parts.append(pack(value))
+        parts.append(pack("feeds"))
+        parts.append(self._packer.pack_map_header(len(keys)))
+        for key in keys:
+            parts.append(pack(key))
+            parts.append(frame.encoded(("msgpack", key), lambda: pack(frame.feed_dict(key))))
+        return b"".join(parts)
+
+    def candle(self, candle: Candle1M, partial: bool = False) -> Payload:
+        # Packed candle model-லேயே cache - envelope header மட்டும் புதுசு
+        pack = self._packer.pack
+        channel = "candle_partial" if partial else "candle"
+        header = self._packer.pack_map_header(2) + pack("ch") + pack(channel) + pack("data")
+        return header + codec.encode_model(candle, self._codec)
+
+    def message(self, channel: str, data: Any) -> Payload:
+        return self._codec.dumps({"ch": channel, "data": data})
+
+
+class ProtobufStreamEncoder:
+    """Binary StreamMessage - ticks as Upstox FeedResponse bytes"""
+
+    name = "protobuf"
+
+    def tick(self, frame: FeedFrame, instrument_filter: Optional[Set[str]]) -> Optional[Payload]:
+        feed = frame.to_protobuf(instrument_filter)
+        if feed is None:
+            return None
+        cache_key = ("pb-message", tuple(frame.filtered_keys(instrument_filter)) if instrument_filter else None)
+        return frame.encoded(cache_key, lambda: Stream_pb2.StreamMessage(feed=feed).SerializeToString())
+
+    def candle(self, candle: Candle1M, partial: bool = False) -> Payload:
+        data = candle.model_dump()
+        data["timestamp"] = int(candle.timestamp.timestamp() * 1000)
+        message = Stream_pb2.StreamMessage()
+        ParseDict(data, message.candle_partial if partial else message.candle)
+        return message.SerializeToString()
+
+    def message(self, channel: str, data: Any) -> Payload:
+        if channel == "tick":
+            # Connect snapshot (QuoteCache.snapshot_dict) - FeedResponse initial_feed
+            feed = ParseDict(data, MarketDataFeed_pb2.FeedResponse(), ignore_unknown_fields=True)
+            return Stream_pb2.StreamMessage(feed=feed.SerializeToString()).SerializeToString()
+        if channel == "vwap":
+            return Stream_pb2.StreamMessage(vwap=Stream_pb2.Vwap(**data)).SerializeToString()
+        if channel == "gap":
+            return Stream_pb2.StreamMessage(gap=Stream_pb2.Gap(**data)).SerializeToString()
+        if channel == "order":
+            return Stream_pb2.StreamMessage(order=codec.dumps(data)).SerializeToString()
+        # ack / error / pong - rare, JSON text inside
+        return Stream_pb2.StreamMessage(control=codec.dumps({"ch": channel, "data": data})).SerializeToString()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# NEGOTIATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_ENCODERS: Dict[str, Any] = {"json": JsonStreamEncoder()}
+if HAS_MSGPACK:
+    _ENCODERS["msgpack"] = MsgpackStreamEncoder()
+if HAS_PROTOBUF:
+    _ENCODERS["protobuf"] = ProtobufStreamEncoder()
+
+
+def available_formats() -> List[str]:
+    return list(_ENCODERS)
+
+
+def negotiate_format(requested: Optional[str], subprotocols: List[str]) -> Tuple[Any, Optional[str]]:
+    """
+    ?format= / Sec-WebSocket-Protocol → (encoder, accepted subprotocol)
+
+    Raises:
+        ValueError: ?format= கேட்டது இந்த server-ல் இல்லை
+    """
+    if requested:
+        encoder = _ENCODERS.get(requested)
+        if encoder is None:
+            raise ValueError(f"Unsupported format '{requested}'. Available: {available_formats()}")
+        accepted = requested if requested in subprotocols else None
+        return encoder, accepted
+
+    for subprotocol in subprotocols:
+        if subprotocol in _ENCODERS:
+            return _ENCODERS[subprotocol], subprotocol
+    return _ENCODERS["json"], None
@@ -0,0 +1,200 @@
+"""
+Stream Resume - SSE Last-Event-ID → Redis Stream Catch-Up
+==========================================================
+
+ஒவ்வொரு SSE event-ம் அதை produce பண்ண market_feed entry ID-ஐ `id:`
+ஆக carry பண்ணும். Browser EventSource reconnect-ல் அதை `Last-Event-ID`
+header-ஆக திருப்பி அனுப்பும்:
+
+    1. TickBus subscribe (live frames queue-ல் buffer ஆகும்)
+    2. XRANGE (last_id, +] (capped) → missed frames முதலில்
+    3. Live frames - replay-ல் ஏற்கனவே போன IDs skip (dedupe)
+
+Cap:
+    STREAM_RESUME_MAX_AGE_SECONDS-க்கு மேல் பழைய ID அல்லது
+    STREAM_RESUME_MAX_ENTRIES-க்கு மேல் missed entries →
+    replay இல்லை, `event: resync` (frontend history reload பண்ணணும்).
+
+Candles:
+    rewind_minute=True → last_id இருந்த minute தொடக்கத்தில் இருந்து replay;
+    open candle முழுமையாக rebuild ஆகும். last_id வரை உள்ள frames
+    "warmup" - aggregator-க்கு மட்டும், client-க்கு re-emit இல்லை.
+
+Shard streams (FEED_SHARDED_STREAMS, filtered clients) ஒவ்வொன்றுக்கும் தனி ID
+sequence; IDs timestamp-based என்பதால் அதே ID-ல் இருந்து எல்லா shards-ம்
+range ஆகும் (same-millisecond edge தவிர exact).
+
+Author: Antony HFT System
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.services.feed_decoder import FeedFrame, decode_entry
+from app.services.feed_stream import feed_stream_names
+from app.services.tick_bus import TickBus, TickSubscription
+
+logger = logging.getLogger(__name__)
+
+StreamId = Tuple[int, int]
+
+
+def parse_stream_id(entry_id: Any) -> Optional[StreamId]:
+    """b"1733371200000-3" / "1733371200000" → (ms, seq); invalid → None"""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    if not entry_id:
+        return None
+    ms, _, seq = str(entry_id).strip().partition("-")
+    try:
+        return int(ms), int(seq or 0)
+    except ValueError:
+        return None
+
+
+def event_id(frame: FeedFrame) -> str:
+    """SSE `id:` value for a frame"""
+    entry_id = frame.entry_id
+    return entry_id.decode() if isinstance(entry_id, bytes) else str(entry_id)
+
+
+def resume_stream_names(instrument_filter: Optional[Set[str]]) -> List[str]:
+    """TickBus இந்த client-க்கு deliver பண்ணும் அதே streams (filtered + sharded → shards)"""
+    return feed_stream_names(instrument_filter)
+
+
+class ResumableSubscription:
+    """
+    TickSubscription + Last-Event-ID catch-up
+
+    Usage:
+        subscription = await ResumableSubscription.open(instrument_filter, last_event_id)
+        try:
+            if subscription.resync:
+                yield f"event: resync\\ndata: {codec.dumps(subscription.resync)}\\n\\n"
+            while True:
+                frames = await subscription.get(timeout=1.0)
+                ...
+        finally:
+            subscription.close()
+    """
+
+    def __init__(self, instrument_filter: Optional[Set[str]], subscription: TickSubscription, client: Any = None):
+        self.instrument_filter = instrument_filter
+        self.subscription = subscription
+        self.client = client
+        self.resync: Optional[Dict[str, Any]] = None
+        # False → fresh connect / resync: client-க்கு last-value snapshot தேவை
+        self.resumed = False
+        self.replayed = 0
+        self._backlog: List[FeedFrame] = []
+        self._resume_id: Optional[StreamId] = None
+        self._high_water: Optional[StreamId] = None
+
+    @classmethod
+    async def open(
+        cls,
+        instrument_filter: Optional[Set[str]] = None,
+        last_event_id: Optional[str] = None,
+        rewind_minute: bool = False,
+        client: Any = None,
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None
+    ) -> "ResumableSubscription":
+        """
+        Args:
+            client: StreamClient (stream_clients) - queue depth / drops / lag stats
+            maxsize, policy: TickBus queue override (CandleEngine - client defaults இல்லை)
+        """
+        # Subscribe first - catch-up நடக்கும்போது வரும் live frames இழக்காமல் இருக்க
+        resumable = cls(instrument_filter, TickBus.subscribe(instrument_filter, maxsize, policy), client)
+        if client is not None:
+            client.subscription = resumable.subscription
+        resume_id = parse_stream_id(last_event_id)
+        if resume_id is not None:
+            try:
+                await resumable._catch_up(resume_id, rewind_minute)
+            except Exception as e:
+                logger.error(f"Stream resume from {last_event_id} failed: {e}")
+                resumable.resync = {"reason": "error", "last_event_id": last_event_id}
+        return resumable
+
+    async def _catch_up(self, resume_id: StreamId, rewind_minute: bool):
+        now_ms = int(time.time() * 1000)
+        max_age_ms = settings.STREAM_RESUME_MAX_AGE_SECONDS * 1000
+        last_event_id = f"{resume_id[0]}-{resume_id[1]}"
+
+        if now_ms - resume_id[0] > max_age_ms:
+            self.resync = {
+                "reason": "too_old",
+                "last_event_id": last_event_id,
+                "max_age_seconds": settings.STREAM_RESUME_MAX_AGE_SECONDS,
+            }
+            return
+
+        start = f"({last_event_id}"
+        if rewind_minute:
+            start = f"{resume_id[0] - resume_id[0] % 60_000}-0"
+
+        max_entries = settings.STREAM_RESUME_MAX_ENTRIES
+        redis = RedisClient.get_binary_pool()
+        entries = []
+        for name in resume_stream_names(self.instrument_filter):
+            # +1 → cap exceeded detect பண்ண
+            entries.extend(await redis.xrange(name, min=start, max="+", count=max_entries + 1))
+            if len(entries) > max_entries:
+                self.resync = {"reason": "too_many", "last_event_id": last_event_id, "max_entries": max_entries}
+                return
+
+        frames = [
+            frame for frame in (decode_entry(entry_id, fields) for entry_id, fields in entries)
+            if frame is not None
+        ]
+        frames.sort(key=lambda frame: parse_stream_id(frame.entry_id))
+
+        self._backlog = frames
+        self._resume_id = resume_id
+        self._high_water = parse_stream_id(frames[-1].entry_id) if frames else resume_id
+        self.replayed = sum(1 for frame in frames if not self.is_warmup(frame))
+        self.resumed = True
+
+    def is_warmup(self, frame: FeedFrame) -> bool:
+        """Client ஏற்கனவே பார்த்த frame (rewind_minute replay) - state rebuild மட்டும்"""
+        if self._resume_id is None:
+            return False
+        return parse_stream_id(frame.entry_id) <= self._resume_id
+
+    async def get(self, timeout: float = 1.0) -> Optional[List[FeedFrame]]:
+        """
+        Catch-up frames முதலில், பிறகு live bus frames (duplicates நீக்கி)
+
+        Returns:
+            Frames in stream order, or None on timeout
+
+        Raises:
+            SlowConsumerError: disconnect policy-ல் client queue overflow
+        """
+        if self._backlog:
+            frames, self._backlog = self._backlog, []
+            return frames
+
+        frames = await self.subscription.get(timeout)
+        if frames and self.client is not None:
+            entry_id = parse_stream_id(frames[-1].entry_id)
+            if entry_id is not None:
+                self.client.on_frames(entry_id[0])
+        if frames is None or self._high_water is None:
+            return frames
+
+        high_water = self._high_water
+        fresh = [frame for frame in frames if parse_stream_id(frame.entry_id) > high_water]
+        if len(fresh) == len(frames):
+            # Replay-ஐ தாண்டிவிட்டோம் - இனி compare தேவையில்லை
+            self._high_water = None
+        return fresh
+
+    def close(self):
+        TickBus.unsubscribe(self.subscription)
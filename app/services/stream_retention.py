@@ -0,0 +1,409 @@
+"""
+Stream Retention - Bounded market_feed + On-Disk Archive
+=========================================================
+
+market_feed stream முழு session-ம் grow ஆகி Redis memory ஏறாமல் இருக்க:
+
+1. Approximate trimming
+    - Count: XADD MAXLEN ~ N (ingest side, every write)
+    - Age:   XTRIM MINID ~ <now - retention> (background task)
+
+2. Archiver (background task)
+    - Trim ஆகப்போகும் range-ஐ முதலில் XRANGE பண்ணி disk-க்கு எழுதும்
+    - Day-rotated, gzip compressed segment files
+        {FEED_ARCHIVE_DIR}/market_feed/2025-12-05/seg-0001.bin.gz
+
+3. Index (per day, index.jsonl)
+    - ஒவ்வொரு archive batch-ம் ஒரு gzip member; அதன் offset/length,
+      first/last entry id, first/last timestamp index-ல் record ஆகும்
+    - Time range கொடுத்தா தேவையான members மட்டும் decompress ஆகும்
+
+Segment Record Format (big-endian):
+    [u16 id_len][id][u16 field_count]
+    field_count × ([u16 name_len][name][u32 value_len][value])
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import struct
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytz
+
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.services.feed_decoder import STREAM_NAME
+
+logger = logging.getLogger(__name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+IST = pytz.timezone('Asia/Kolkata')
+ARCHIVE_BATCH = 1000  # XRANGE page size
+LAST_ID_KEY = f"archive:{STREAM_NAME}:last_id"
+LOCK_KEY = f"archive:{STREAM_NAME}:lock"
+INDEX_FILE = "index.jsonl"
+
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+Entry = Tuple[bytes, Dict[bytes, bytes]]
+
+
+def stream_maxlen(stream_name: str) -> Optional[int]:
+    """XADD MAXLEN ~ for this stream (None = unbounded)"""
+    limit = settings.FEED_STREAM_MAXLEN if stream_name == STREAM_NAME else settings.FEED_SHARD_MAXLEN
+    return limit if limit > 0 else None
+
+
+def entry_id_ms(entry_id: bytes | str) -> int:
+    """Redis stream id "1733387940123-0" → 1733387940123"""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    return int(entry_id.split("-", 1)[0])
+
+
+def _as_bytes(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SEGMENT ENCODING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def encode_records(entries: List[Entry]) -> bytes:
+    """Stream entries → length-prefixed records (uncompressed)"""
+    parts: List[bytes] = []
+    for entry_id, fields in entries:
+        entry_id = _as_bytes(entry_id)
+        parts.append(_U16.pack(len(entry_id)))
+        parts.append(entry_id)
+        parts.append(_U16.pack(len(fields)))
+        for name, value in fields.items():
+            name = _as_bytes(name)
+            value = _as_bytes(value)
+            parts.append(_U16.pack(len(name)))
+            parts.append(name)
+            parts.append(_U32.pack(len(value)))
+            parts.append(value)
+    return b"".join(parts)
+
+
+def decode_records(blob: bytes) -> Iterator[Entry]:
+    """Length-prefixed records → stream entries"""
+    view = memoryview(blob)
+    pos = 0
+    end = len(blob)
+    while pos < end:
+        (id_len,) = _U16.unpack_from(view, pos)
+        pos += 2
+        entry_id = bytes(view[pos:pos + id_len])
+        pos += id_len
+        (field_count,) = _U16.unpack_from(view, pos)
+        pos += 2
+        fields: Dict[bytes, bytes] = {}
+        for _ in range(field_count):
+            (name_len,) = _U16.unpack_from(view, pos)
+            pos += 2
+            name = bytes(view[pos:pos + name_len])
+            pos += name_len
+            (value_len,) = _U32.unpack_from(view, pos)
+            pos += 4
+            fields[name] = bytes(view[pos:pos + value_len])
+            pos += value_len
+        yield entry_id, fields
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FEED ARCHIVE - Segment files + index (blocking I/O, run in a thread)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FeedArchive:
+    """
+    Day-rotated segment store for archived market_feed entries
+
+    Usage:
+        archive = FeedArchive(settings.FEED_ARCHIVE_DIR)
+        archive.append(entries)                      # archiver
+        for entry_id, fields in archive.read_range(start_ms, end_ms):
+            ...                                      # read back by time
+    """
+
+    def __init__(self, base_dir: str, stream_name: str = STREAM_NAME):
+        self.root = os.path.join(base_dir, stream_name)
+        self.segment_max_bytes = settings.FEED_ARCHIVE_SEGMENT_MB * 1024 * 1024
+
+    @staticmethod
+    def _day(timestamp_ms: int) -> str:
+        return datetime.fromtimestamp(timestamp_ms / 1000, tz=IST).strftime("%Y-%m-%d")
+
+    def _day_dir(self, day: str) -> str:
+        return os.path.join(self.root, day)
+
+    def _load_index(self, day: str) -> List[Dict[str, Any]]:
+        path = os.path.join(self._day_dir(day), INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _current_segment(self, day: str, index: List[Dict[str, Any]]) -> str:
+        """Latest segment of the day, rotated when it crosses the size limit"""
+        if not index:
+            return "seg-0001.bin.gz"
+        latest = index[-1]["segment"]
+        path = os.path.join(self._day_dir(day), latest)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_max_bytes:
+            number = int(latest[4:8]) + 1
+            return f"seg-{number:04d}.bin.gz"
+        return latest
+
+    def append(self, entries: List[Entry]) -> int:
+        """
+        Entries-ஐ day வாரியாக பிரித்து segment-ல் append பண்ணும்
+
+        ஒவ்வொரு call-ம் (per day) ஒரு gzip member எழுதும்; concatenated
+        gzip members valid gzip file தான்.
+
+        Returns:
+            Number of entries written
+        """
+        by_day: Dict[str, List[Entry]] = {}
+        for entry in entries:
+            by_day.setdefault(self._day(entry_id_ms(entry[0])), []).append(entry)
+
+        for day, day_entries in by_day.items():
+            day_dir = self._day_dir(day)
+            os.makedirs(day_dir, exist_ok=True)
+            index = self._load_index(day)
+            segment = self._current_segment(day, index)
+            path = os.path.join(day_dir, segment)
+
+            member = gzip.compress(encode_records(day_entries))
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(member)
+
+            first_id = _as_bytes(day_entries[0][0]).decode()
+            last_id = _as_bytes(day_entries[-1][0]).decode()
+            record = {
+                "segment": segment,
+                "offset": offset,
+                "length": len(member),
+                "first_id": first_id,
+                "last_id": last_id,
+                "first_ts": entry_id_ms(first_id),
+                "last_ts": entry_id_ms(last_id),
+                "count": len(day_entries),
+            }
+            with open(os.path.join(day_dir, INDEX_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+        return len(entries)
+
+    def read_range(self, start_ms: int, end_ms: int, limit: Optional[int] = None) -> Iterator[Entry]:
+        """
+        Archived entries with start_ms <= id timestamp <= end_ms, in order
+
+        Index மூலம் overlap ஆகும் gzip members மட்டும் படிக்கப்படும்.
+        """
+        emitted = 0
+        day = datetime.fromtimestamp(start_ms / 1000, tz=IST).date()
+        last_day = datetime.fromtimestamp(end_ms / 1000, tz=IST).date()
+
+        while day <= last_day:
+            day_name = day.strftime("%Y-%m-%d")
+            for record in self._load_index(day_name):
+                if record["last_ts"] < start_ms or record["first_ts"] > end_ms:
+                    continue
+                path = os.path.join(self._day_dir(day_name), record["segment"])
+                with open(path, "rb") as f:
+                    f.seek(record["offset"])
+                    member = f.read(record["length"])
+                for entry_id, fields in decode_records(gzip.decompress(member)):
+                    ts = entry_id_ms(entry_id)
+                    if ts < start_ms or ts > end_ms:
+                        continue
+                    yield entry_id, fields
+                    emitted += 1
+                    if limit and emitted >= limit:
+                        return
+            day += timedelta(days=1)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RETENTION SERVICE - Background archive + trim loop
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StreamRetentionService:
+    """
+    Background task - app lifespan-ல் start/stop ஆகும்
+
+    Cycle (every FEED_ARCHIVE_INTERVAL_SECONDS):
+        1. cutoff = now - FEED_STREAM_RETENTION_SECONDS
+        2. Archive enabled → last archived id முதல் cutoff வரை XRANGE → disk
+        3. Retention enabled → XTRIM MINID ~ cutoff (combined + shards)
+
+    Multiple uvicorn workers இருந்தா Redis lock மூலம் ஒருவர் மட்டும் run பண்ணுவார்.
+    """
+
+    _task: Optional[asyncio.Task] = None
+    _owner: str = uuid.uuid4().hex
+    _archive: Optional[FeedArchive] = None
+    _stats: Dict[str, Any] = {
+        "archived_entries": 0,
+        "trimmed_entries": 0,
+        "last_archived_id": None,
+        "last_run": None,
+    }
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return settings.FEED_ARCHIVE_ENABLED or settings.FEED_STREAM_RETENTION_SECONDS > 0
+
+    @classmethod
+    def get_archive(cls) -> FeedArchive:
+        if cls._archive is None:
+            cls._archive = FeedArchive(settings.FEED_ARCHIVE_DIR)
+        return cls._archive
+
+    @classmethod
+    def start(cls):
+        if cls._task or not cls.is_enabled():
+            return
+        cls._task = asyncio.create_task(cls._run_loop())
+        logger.info("Stream retention started")
+
+    @classmethod
+    async def stop(cls):
+        if cls._task:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return {
+            "enabled": cls.is_enabled(),
+            "archive_enabled": settings.FEED_ARCHIVE_ENABLED,
+            "retention_seconds": settings.FEED_STREAM_RETENTION_SECONDS,
+            "maxlen": settings.FEED_STREAM_MAXLEN,
+            **cls._stats,
+        }
+
+    @classmethod
+    async def _run_loop(cls):
+        while True:
+            try:
+                await cls.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stream retention cycle failed: {e}")
+            await asyncio.sleep(settings.FEED_ARCHIVE_INTERVAL_SECONDS)
+
+    @classmethod
+    async def run_once(cls):
+        redis = RedisClient.get_binary_pool()
+        lock_ttl = max(settings.FEED_ARCHIVE_INTERVAL_SECONDS * 2, 10)
+        if not await redis.set(LOCK_KEY, cls._owner, nx=True, ex=lock_ttl):
+            return
+
+        try:
+            now_ms = int(time.time() * 1000)
+            cutoff_ms = now_ms - settings.FEED_STREAM_RETENTION_SECONDS * 1000
+
+            if settings.FEED_ARCHIVE_ENABLED and not await cls._archive_until(redis, cutoff_ms, lock_ttl):
+                logger.warning("Stream retention lock lost during archive - another worker took over")
+                return
+
+            if settings.FEED_STREAM_RETENTION_SECONDS > 0:
+                await cls._trim_before(redis, cutoff_ms)
+
+            cls._stats["last_run"] = now_ms
+        finally:
+            if await redis.get(LOCK_KEY) == cls._owner.encode():
+                await redis.delete(LOCK_KEY)
+
+    @classmethod
+    async def _renew(cls, redis, lock_ttl: int) -> bool:
+        """Lock இன்னும் நம்முடையது என்றால் TTL extend"""
+        if await redis.get(LOCK_KEY) != cls._owner.encode():
+            return False
+        await redis.expire(LOCK_KEY, lock_ttl)
+        return True
+
+    @classmethod
+    async def _archive_until(cls, redis, cutoff_ms: int, lock_ttl: int) -> bool:
+        """
+        last archived id (exclusive) → cutoff_ms (inclusive) வரை disk-க்கு
+
+        முதல் run-ல் backlog பெரிசா இருக்கலாம் - ஒவ்வொரு batch-க்கும் முன்
+        lock renew; வேறு worker எடுத்துவிட்டால் நிறுத்து (இருவரும் append பண்ணக்கூடாது).
+
+        Returns:
+            False if the lock was lost
+        """
+        last_id = await redis.get(LAST_ID_KEY)
+        start = b"(" + last_id if last_id else b"-"
+
+        # MAXLEN trim archiver-ஐ முந்தினா range loss - log பண்ணுவோம்
+        if last_id:
+            first = await redis.xrange(STREAM_NAME, count=1)
+            if first and entry_id_ms(first[0][0]) > entry_id_ms(last_id):
+                logger.warning(
+                    f"market_feed trimmed past archive position {last_id.decode()} - "
+                    f"raise FEED_STREAM_MAXLEN or lower FEED_ARCHIVE_INTERVAL_SECONDS"
+                )
+
+        archive = cls.get_archive()
+        while True:
+            entries = await redis.xrange(STREAM_NAME, min=start, max=str(cutoff_ms), count=ARCHIVE_BATCH)
+            if not entries:
+                break
+            if not await cls._renew(redis, lock_ttl):
+                return False
+
+            await asyncio.to_thread(archive.append, entries)
+            last_id = entries[-1][0]
+            await redis.set(LAST_ID_KEY, last_id)
+            cls._stats["archived_entries"] += len(entries)
+            cls._stats["last_archived_id"] = last_id.decode()
+
+            if len(entries) < ARCHIVE_BATCH:
+                break
+            start = b"(" + last_id
+        return True
+
+    @classmethod
+    async def _trim_before(cls, redis, cutoff_ms: int):
+        """XTRIM MINID ~ cutoff - combined stream and every shard"""
+        min_id = str(cutoff_ms)
+
+        # Archive பின்தங்கி இருந்தா archive ஆகாத entries-ஐ trim பண்ணக்கூடாது
+        if settings.FEED_ARCHIVE_ENABLED:
+            last_id = await redis.get(LAST_ID_KEY)
+            if not last_id:
+                return
+            min_id = str(min(cutoff_ms, entry_id_ms(last_id)))
+
+        trimmed = await redis.xtrim(STREAM_NAME, minid=min_id, approximate=True)
+        async for key in redis.scan_iter(match=f"{STREAM_NAME}:*", _type="STREAM"):
+            trimmed += await redis.xtrim(key, minid=str(cutoff_ms), approximate=True)
+        cls._stats["trimmed_entries"] += trimmed
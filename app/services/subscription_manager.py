@@ -0,0 +1,170 @@
+"""
+Subscription Manager - Stream Interest → Upstream Feed Subscriptions
+=====================================================================
+
+/stream/live?instruments=... திறக்கும் முன் /feed/subscribe தனியாக call
+பண்ண வேண்டியதில்லை. TickBus-ல் filtered subscription வரும்போது அதன்
+instruments-க்கு reference count ஏறும்:
+
+    0 → 1   → FeedService.subscribe (FEED_AUTO_SUBSCRIBE_MODE)
+    1 → 0   → FEED_UNSUBSCRIBE_GRACE_SECONDS காத்திருந்து, அதற்குள் யாரும்
+              திரும்ப வரவில்லை என்றால் FeedService.unsubscribe
+
+Auto-unsubscribe ஆகாதவை:
+    - FeedService._protected_keys (index keys)
+    - /feed/subscribe, /feed/update-subscriptions மூலம் manual-ஆக subscribe
+      ஆனவை (pin) - manager subscribe பண்ணிய keys மட்டும் release ஆகும்
+
+Feed connect ஆகும் முன் வந்த interest-ம், reconnect / worker restart-க்கு
+பிறகும் reconcile loop (RECONCILE_INTERVAL) மூலம் subscribe ஆகும்.
+Disconnect நேரத்தில் grace முடிந்தாலும் unsubscribe connect ஆன பிறகுதான்.
+Wildcard streams (filter இல்லை) எந்த key-க்கும் interest எடுக்காது.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.services.feed_service import FeedService
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_INTERVAL = 1.0  # seconds
+
+
+class SubscriptionManager:
+    """
+    Process-wide reference counts per instrument key
+
+    Usage (TickBus index / unindex):
+        SubscriptionManager.acquire(instrument_filter)
+        SubscriptionManager.release(instrument_filter)
+
+    acquire / release sync - upstream calls background loop-ல் batch ஆகும்.
+    """
+
+    _refs: Dict[str, int] = {}
+    # Manager subscribe பண்ணியவை - இவை மட்டும் auto-unsubscribe ஆகும்
+    _owned: Set[str] = set()
+    # Refcount 0 ஆன நேரம் (monotonic) - grace முடியும் வரை
+    _released_at: Dict[str, float] = {}
+    _task: Optional[asyncio.Task] = None
+    _wake: Optional[asyncio.Event] = None
+    _stats: Dict[str, int] = {"subscribed": 0, "unsubscribed": 0, "errors": 0}
+
+    @classmethod
+    def acquire(cls, instrument_keys: Optional[Iterable[str]]):
+        if not settings.FEED_AUTO_SUBSCRIBE or not instrument_keys:
+            return
+        for key in instrument_keys:
+            cls._refs[key] = cls._refs.get(key, 0) + 1
+            cls._released_at.pop(key, None)
+        cls._notify()
+
+    @classmethod
+    def release(cls, instrument_keys: Optional[Iterable[str]]):
+        if not instrument_keys or not cls._refs:
+            return
+        now = time.monotonic()
+        for key in instrument_keys:
+            count = cls._refs.get(key, 0) - 1
+            if count > 0:
+                cls._refs[key] = count
+                continue
+            if cls._refs.pop(key, None) is not None:
+                cls._released_at[key] = now
+        cls._notify()
+
+    @classmethod
+    def pin(cls, instrument_keys: Iterable[str]):
+        """Manual subscribe - last stream போனாலும் upstream-ல் இருக்கும்"""
+        cls._owned.difference_update(instrument_keys)
+
+    @classmethod
+    def held_keys(cls) -> List[str]:
+        """Streams இப்போது பார்க்கும் keys (grace-ல் உள்ளவையும்)"""
+        return list(cls._refs) + list(cls._released_at)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return dict(
+            cls._stats,
+            enabled=settings.FEED_AUTO_SUBSCRIBE,
+            held=len(cls._refs),
+            owned=len(cls._owned),
+            releasing=len(cls._released_at),
+            grace_seconds=settings.FEED_UNSUBSCRIBE_GRACE_SECONDS,
+        )
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # RECONCILE LOOP
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    def _notify(cls):
+        if cls._task is None or cls._task.done():
+            try:
+                cls._wake = asyncio.Event()
+                cls._task = asyncio.create_task(cls._run_loop())
+            except RuntimeError:
+                # No running loop (sync caller outside the app) - next acquire starts it
+                cls._task = None
+                return
+        cls._wake.set()
+
+    @classmethod
+    async def _run_loop(cls):
+        while True:
+            try:
+                await asyncio.wait_for(cls._wake.wait(), RECONCILE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            cls._wake.clear()
+
+            try:
+                await cls._reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cls._stats["errors"] += 1
+                logger.warning(f"Subscription reconcile failed: {e}")
+
+            if not cls._refs and not cls._released_at:
+                cls._task = None
+                return
+
+    @classmethod
+    async def _reconcile(cls):
+        if not FeedService.is_connected():
+            # Disconnected - grace முடிந்த keys-ம் connect ஆகும் வரை _released_at-ல்
+            # இருக்கும் (reconnect upstream-ல் அவற்றை திரும்ப subscribe பண்ணும்)
+            return
+
+        grace = settings.FEED_UNSUBSCRIBE_GRACE_SECONDS
+        now = time.monotonic()
+        expired = [key for key, released in cls._released_at.items() if now - released >= grace]
+        for key in expired:
+            del cls._released_at[key]
+        releasable = [
+            key for key in expired
+            if key in cls._owned and key not in FeedService._protected_keys
+        ]
+        cls._owned.difference_update(expired)
+
+        current = set(FeedService.get_subscriptions())
+        missing = [key for key in cls._refs if key not in current]
+        if missing:
+            await FeedService.subscribe(missing, settings.FEED_AUTO_SUBSCRIBE_MODE)
+            cls._owned.update(missing)
+            cls._stats["subscribed"] += len(missing)
+            logger.info(f"Auto-subscribed {len(missing)} instruments for stream clients")
+
+        releasable = [key for key in releasable if key in current]
+        if releasable:
+            await FeedService.unsubscribe(releasable)
+            cls._stats["unsubscribed"] += len(releasable)
+            logger.info(f"Auto-unsubscribed {len(releasable)} instruments (no stream clients)")
@@ -0,0 +1,278 @@
+"""
+Tick Bus - One market_feed Reader per Process, Fan-Out to SSE Clients
+======================================================================
+
+முன்பு ஒவ்வொரு /stream/live, /stream/candles, /stream/vwap client-ம் தன்
+சொந்த XREAD loop + decode பண்ணியது. 20 tabs = ஒரே frame 20 முறை decode.
+
+    market_feed ──XREAD──→ TickBus reader (one per worker process)
+                              │  decode once (FeedFrame, shared)
+                              ├─→ instrument index → matching subscribers
+                              └─→ wildcard subscribers (no filter)
+
+Streams:
+    wildcard subscribers → market_feed
+    filtered subscribers → FEED_SHARDED_STREAMS இருந்தால் அவர்கள் keys-ன்
+                           market_feed:{key} union, இல்லையென்றால் market_feed
+    இரண்டும் read ஆகும்போது market_feed frames wildcard-க்கு மட்டும்,
+    shard frames filtered-க்கு மட்டும் (duplicate இல்லை).
+
+Per-client cost = ஒரு queue put. FeedFrame-ல் JSON fragments / RawTicks
+cache ஆவதால் serialize/decode-ம் instrument-க்கு ஒரு முறை மட்டும்.
+
+Queue full ஆனா (slow client) STREAM_SLOW_CLIENT_POLICY படி:
+    drop       → அந்த client-ன் oldest frame drop ஆகும்
+    disconnect → subscription overflowed ஆகும், client-ன் next get()
+                 SlowConsumerError raise பண்ணும் (stream close)
+Reader மற்றும் மற்ற clients பாதிக்கப்படாது.
+
+Filtered subscriptions upstream feed-ல் ref-counted interest எடுக்கும்
+(SubscriptionManager) - client-க்கு தேவையான keys தானாக subscribe ஆகும்.
+
+Author: Antony HFT System
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.feed_decoder import FeedFrame, STREAM_NAME
+from app.services.feed_stream import FeedStreamReader, feed_stream_names
+from app.services.subscription_manager import SubscriptionManager
+
+logger = logging.getLogger(__name__)
+
+POLICY_DROP = "drop"
+POLICY_DISCONNECT = "disconnect"
+
+
+class SlowConsumerError(RuntimeError):
+    """Client queue overflowed under the disconnect policy"""
+
+
+class TickSubscription:
+    """
+    One client's view of the bus
+
+    Usage:
+        subscription = TickBus.subscribe(instrument_filter)
+        try:
+            while True:
+                frames = await subscription.get(timeout=1.0)
+                if frames is None:
+                    # Timeout - send keep-alive
+                    continue
+        finally:
+            TickBus.unsubscribe(subscription)
+    """
+
+    __slots__ = ("instrument_filter", "queue", "policy", "dropped", "delivered", "overflowed")
+
+    def __init__(self, instrument_filter: Optional[Set[str]], maxsize: int, policy: str = POLICY_DROP):
+        self.instrument_filter = instrument_filter
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self.delivered = 0
+        self.overflowed = False
+
+    def put(self, frame: FeedFrame):
+        """Non-blocking - full queue → oldest frame drop (or overflow flag)"""
+        if self.overflowed:
+            self.dropped += 1
+            return
+        if self.queue.full():
+            if self.policy == POLICY_DISCONNECT:
+                self.overflowed = True
+                self.dropped += 1
+                return
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+        self.delivered += 1
+
+    async def get(self, timeout: float = 1.0) -> Optional[List[FeedFrame]]:
+        """
+        Wait for frames, then drain whatever else is queued
+
+        Returns:
+            Frames in stream order, or None on timeout
+
+        Raises:
+            SlowConsumerError: disconnect policy-ல் queue overflow ஆனது
+        """
+        if self.overflowed:
+            raise SlowConsumerError(f"Client queue overflowed ({self.queue.maxsize} frames)")
+        try:
+            first = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        frames = [first]
+        while not self.queue.empty():
+            frames.append(self.queue.get_nowait())
+        return frames
+
+
+class TickBus:
+    """
+    Process-wide market_feed fan-out
+
+    Reader task முதல் subscriber வரும்போது start ஆகும், கடைசி subscriber
+    போனதும் stop ஆகும்.
+    """
+
+    _task: Optional[asyncio.Task] = None
+    _reader: Optional[FeedStreamReader] = None
+    _wildcard: Set[TickSubscription] = set()
+    _by_instrument: Dict[str, Set[TickSubscription]] = {}
+    _stats: Dict[str, int] = {"frames": 0, "deliveries": 0, "errors": 0}
+
+    @classmethod
+    def subscribe(
+        cls,
+        instrument_filter: Optional[Set[str]] = None,
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None
+    ) -> TickSubscription:
+        subscription = TickSubscription(
+            instrument_filter,
+            maxsize or settings.TICK_BUS_QUEUE_SIZE,
+            policy or settings.STREAM_SLOW_CLIENT_POLICY
+        )
+        cls._index(subscription)
+
+        cls._sync_streams()
+        cls._ensure_reader()
+        return subscription
+
+    @classmethod
+    def _index(cls, subscription: TickSubscription):
+        if subscription.instrument_filter:
+            # Upstream feed interest (ref-counted auto subscribe)
+            SubscriptionManager.acquire(subscription.instrument_filter)
+            for key in subscription.instrument_filter:
+                cls._by_instrument.setdefault(key, set()).add(subscription)
+        else:
+            cls._wildcard.add(subscription)
+
+    @classmethod
+    def _unindex(cls, subscription: TickSubscription):
+        if subscription.instrument_filter:
+            SubscriptionManager.release(subscription.instrument_filter)
+            for key in subscription.instrument_filter:
+                subscribers = cls._by_instrument.get(key)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del cls._by_instrument[key]
+        else:
+            cls._wildcard.discard(subscription)
+
+    @classmethod
+    def update_filter(cls, subscription: TickSubscription, instrument_filter: Optional[Set[str]]):
+        """Runtime filter change (/stream/ws) - queue அப்படியே இருக்கும்"""
+        cls._unindex(subscription)
+        subscription.instrument_filter = instrument_filter
+        cls._index(subscription)
+        cls._sync_streams()
+
+    @classmethod
+    def unsubscribe(cls, subscription: TickSubscription):
+        cls._unindex(subscription)
+
+        if not cls._wildcard and not cls._by_instrument:
+            cls._stop_reader()
+        else:
+            cls._sync_streams()
+
+    @classmethod
+    def subscriber_count(cls) -> int:
+        filtered: Set[TickSubscription] = set()
+        for subscribers in cls._by_instrument.values():
+            filtered.update(subscribers)
+        return len(cls._wildcard) + len(filtered)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return dict(
+            cls._stats,
+            running=cls._task is not None and not cls._task.done(),
+            subscribers=cls.subscriber_count(),
+            wildcard_subscribers=len(cls._wildcard),
+            indexed_instruments=len(cls._by_instrument),
+        )
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # READER
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    def _stream_names(cls) -> List[str]:
+        """
+        Wildcard subscribers → market_feed; filtered subscribers → அவர்கள்
+        keys-ன் streams (shards அல்லது market_feed)
+        """
+        names = feed_stream_names(set(cls._by_instrument.keys())) if cls._by_instrument else []
+        if cls._wildcard and STREAM_NAME not in names:
+            names.insert(0, STREAM_NAME)
+        return names or [STREAM_NAME]
+
+    @classmethod
+    def _sync_streams(cls):
+        if cls._reader is not None:
+            cls._reader.set_streams(cls._stream_names())
+
+    @classmethod
+    def _ensure_reader(cls):
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._reader = FeedStreamReader(count=settings.TICK_BUS_READ_COUNT)
+        cls._reader.set_streams(cls._stream_names())
+        cls._task = asyncio.create_task(cls._run_loop())
+
+    @classmethod
+    def _stop_reader(cls):
+        if cls._task is not None:
+            cls._task.cancel()
+        cls._task = None
+        cls._reader = None
+
+    @classmethod
+    async def _run_loop(cls):
+        reader = cls._reader
+        while True:
+            try:
+                frames = await reader.read()
+                if not frames:
+                    continue
+                for frame in frames:
+                    cls._dispatch(frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cls._stats["errors"] += 1
+                logger.error(f"Tick bus read failed: {e}")
+                await asyncio.sleep(1)
+
+    @classmethod
+    def _dispatch(cls, frame: FeedFrame):
+        """Frame-ஐ wildcard + filter match ஆகும் subscribers-க்கு ஒரு முறை மட்டும்"""
+        cls._stats["frames"] += 1
+        keys = frame.gap_instruments() if frame.gap else frame.instrument_keys()
+
+        combined = frame.stream == STREAM_NAME
+        targets: Set[TickSubscription] = set(cls._wildcard) if combined else set()
+        if not combined or not settings.FEED_SHARDED_STREAMS:
+            # Sharded mode-ல் filtered subscribers shards-ல் இருந்து மட்டும்
+            by_instrument = cls._by_instrument
+            for key in keys:
+                subscribers = by_instrument.get(key)
+                if subscribers:
+                    targets.update(subscribers)
+
+        for subscription in targets:
+            subscription.put(frame)
+        cls._stats["deliveries"] += len(targets)
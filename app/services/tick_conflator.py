@@ -0,0 +1,126 @@
+"""
+Tick Conflator - Latest-Value Snapshots for UI Clients
+=======================================================
+
+Browser ஒரு second-க்கு சில முறை மட்டும் redraw பண்ணும்; ஒவ்வொரு tick-ம்
+அனுப்புவது bandwidth + serialization waste.
+
+    /stream/live?max_hz=4
+
+    TickBus frames ──→ latest[instrument] = frame   (older update superseded)
+                           │
+                           └── every 1/max_hz sec → one SSE event
+                               {"type", "currentTs", "feeds": {latest per instrument}}
+
+Superseded updates serialize ஆகவே ஆகாது - flush நேரத்தில் latest frame-ன்
+cached fragment மட்டும் join ஆகும். Gap markers conflate ஆகாது (உடனே போகும்).
+
+Author: Antony HFT System
+"""
+
+import itertools
+from typing import Any, Dict, List, Optional, Set
+
+from app.services import codec
+from app.services.feed_decoder import FeedFrame
+
+
+class TickConflator:
+    """
+    One conflated client's latest-value buffer
+
+    Usage:
+        conflator = TickConflator(instrument_filter, max_hz=4)
+        try:
+            conflator.add(frame)            # every bus frame
+            payload = conflator.flush()     # every 1/max_hz seconds
+        finally:
+            conflator.close()
+    """
+
+    _active: Set["TickConflator"] = set()
+    _ids = itertools.count(1)
+    _stats: Dict[str, int] = {"updates_in": 0, "updates_sent": 0, "superseded": 0, "flushes": 0}
+
+    def __init__(self, instrument_filter: Optional[Set[str]], max_hz: float):
+        self.id = next(TickConflator._ids)
+        self.instrument_filter = instrument_filter
+        self.max_hz = max_hz
+        self.latest: Dict[str, FeedFrame] = {}
+        self.header_frame: Optional[FeedFrame] = None
+        self.updates_in = 0
+        self.updates_sent = 0
+        self.superseded = 0
+        self.flushes = 0
+        TickConflator._active.add(self)
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.max_hz
+
+    def add(self, frame: FeedFrame):
+        """Frame-ல் உள்ள ஒவ்வொரு instrument-க்கும் latest frame மட்டும் வைக்கும்"""
+        instrument_filter = self.instrument_filter
+        latest = self.latest
+        count = 0
+        superseded = 0
+        for key in frame.instrument_keys():
+            if instrument_filter and key not in instrument_filter:
+                continue
+            if key in latest:
+                superseded += 1
+            latest[key] = frame
+            count += 1
+
+        if count:
+            self.header_frame = frame
+            self.updates_in += count
+            self.superseded += superseded
+            TickConflator._stats["updates_in"] += count
+            TickConflator._stats["superseded"] += superseded
+
+    def flush(self) -> Optional[str]:
+        """
+        Pending latest values → one `{"type", "currentTs", "feeds"}` payload
+
+        Returns:
+            JSON string, or None if nothing changed since last flush
+        """
+        if not self.latest:
+            return None
+
+        header = self.header_frame.header_json()
+        prefix = header[:-1] + ", " if len(header) > 2 else "{"
+        feeds = ", ".join(f"{codec.dumps(key)}: {frame.feed_json(key)}" for key, frame in self.latest.items())
+        sent = len(self.latest)
+
+        self.latest = {}
+        self.header_frame = None
+        self.updates_sent += sent
+        self.flushes += 1
+        TickConflator._stats["updates_sent"] += sent
+        TickConflator._stats["flushes"] += 1
+        return f'{prefix}"feeds": {{{feeds}}}}}'
+
+    def close(self):
+        TickConflator._active.discard(self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "max_hz": self.max_hz,
+            "instruments": len(self.instrument_filter) if self.instrument_filter else None,
+            "updates_in": self.updates_in,
+            "updates_sent": self.updates_sent,
+            "superseded": self.superseded,
+            "flushes": self.flushes,
+        }
+
+    @classmethod
+    def get_all_stats(cls) -> Dict[str, Any]:
+        """Process-wide totals + per-client counters (/stream/stats)"""
+        totals = dict(cls._stats)
+        if totals["updates_sent"]:
+            totals["conflation_ratio"] = round(totals["updates_in"] / totals["updates_sent"], 2)
+        clients: List[Dict[str, Any]] = [c.get_stats() for c in sorted(cls._active, key=lambda c: c.id)]
+        return dict(totals, active_clients=len(clients), clients=clients)
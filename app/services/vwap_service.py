@@ -1,10 +1,13 @@
 import asyncio
-import json
 import logging
-from typing import Dict, Optional, Set, AsyncGenerator
+from typing import Any, Dict, List, Optional, Set, AsyncGenerator
 
-from app.db.redis import RedisClient
-from app.services.candle_aggregator import parse_raw_tick
+from app.services import codec
+from app.services.feed_decoder import FeedFrame
+from app.services.stream_resume import ResumableSubscription, event_id
+from app.services.stream_clients import slow_consumer_event
+from app.services.quote_cache import QuoteCache
+from app.services.tick_bus import SlowConsumerError
 from app.models.candle import RawTick
 
 logger = logging.getLogger(__name__)
@@ -28,72 +31,59 @@ class VwapService:
     """
     
     @classmethod
-    async def stream_vwap(cls, instrument_filter: Optional[Set[str]] = None) -> AsyncGenerator[str, None]:
+    async def stream_vwap(
+        cls,
+        instrument_filter: Optional[Set[str]] = None,
+        last_event_id: Optional[str] = None,
+        client: Any = None
+    ) -> AsyncGenerator[str, None]:
         """
         Streams VWAP updates via SSE.
         
+        Args:
+            instrument_filter: Optional instrument keys
+            last_event_id: Reconnect resume point (missed ticks replay ஆகும்)
+            client: StreamClient (admission / slow consumer stats)
+        
         Yields:
-             Server-Sent Event data string: "data: {...}\n\n"
+             Server-Sent Event data string: "id: ...\ndata: {...}\n\n"
         """
-        redis = RedisClient.get_pool()
-        last_id = "$"
+        subscription = await ResumableSubscription.open(instrument_filter, last_event_id, client=client)
         
         # Local state: { instrument_key: {"total_value": float, "total_vol": int, "prev_vtt": int} }
         state: Dict[str, Dict] = {}
         
         try:
+            if subscription.resync:
+                yield f"event: resync\ndata: {codec.dumps(subscription.resync)}\n\n"
+            if not subscription.resumed:
+                # Fresh connect - last-value cache-ல் இருந்து ATP seed, அடுத்த tick-க்கு காத்திருக்காமல்
+                for frame in (await QuoteCache.get_snapshot(instrument_filter)).values():
+                    for vwap_data in cls.vwap_updates(state, frame, instrument_filter):
+                        yield f"data: {codec.dumps(vwap_data)}\n\n"
+            
             while True:
                 try:
-                    streams = await redis.xread(
-                        streams={"market_feed": last_id},
-                        count=100,
-                        block=1000
-                    )
+                    frames = await subscription.get(timeout=1.0)
                     
-                    if not streams:
+                    if frames is None:
                         yield ": keep-alive\n\n"
                         continue
                     
-                    for stream_name, messages in streams:
-                        for message_id, fields in messages:
-                            last_id = message_id
-                            raw_data = fields.get("data")
-                            
-                            if not raw_data:
-                                continue
-                            
-                            try:
-                                data = json.loads(raw_data)
-                                feeds = data.get("feeds", {})
-                                
-                                for instrument_key, feed_data in feeds.items():
-                                    # Filter if needed
-                                    if instrument_filter and instrument_key not in instrument_filter:
-                                        continue
-                                    
-                                    full_feed = feed_data.get("fullFeed", {})
-                                    market_ff = full_feed.get("marketFF")
-                                    
-                                    if not market_ff:
-                                        continue
+                    for frame in frames:
+                        try:
+                            for vwap_data in cls.vwap_updates(state, frame, instrument_filter):
+                                yield f"id: {event_id(frame)}\ndata: {codec.dumps(vwap_data)}\n\n"
                                     
-                                    # Parse tick using existing helper
-                                    tick: RawTick = parse_raw_tick(instrument_key, market_ff)
-                                    
-                                    # Calculate VWAP
-                                    vwap_data = cls._calculate_vwap(state, tick)
-                                    
-                                    if vwap_data:
-                                        yield f"data: {json.dumps(vwap_data)}\n\n"
-                                        
-                            except json.JSONDecodeError:
-                                continue
-                            except Exception as e:
-                                logger.error(f"Error processing tick for VWAP: {e}")
-                                continue
+                        except Exception as e:
+                            logger.error(f"Error processing tick for VWAP: {e}")
+                            continue
                                 
                 except asyncio.CancelledError:
                     raise
+                except SlowConsumerError as e:
+                    yield slow_consumer_event(client, e)
+                    return
                 except Exception as e:
                     logger.error(f"Error in VWAP stream loop: {e}")
                     await asyncio.sleep(1)
@@ -101,6 +91,22 @@ class VwapService:
         except asyncio.CancelledError:
             logger.info("VWAP stream cancelled")
             raise
+        finally:
+            subscription.close()
+
+    @classmethod
+    def vwap_updates(cls, state: Dict[str, Dict], frame: FeedFrame, instrument_filter: Optional[Set[str]] = None) -> List[Dict]:
+        """One bus frame → VWAP updates (SSE stream + /stream/ws vwap channel)"""
+        # Feed gap - missed volume-ஐ last LTP-க்கு assign பண்ணாமல் ATP-ல் இருந்து reseed
+        for instrument_key in frame.gap_instruments(instrument_filter):
+            state.pop(instrument_key, None)
+        
+        updates = []
+        for instrument_key, tick in frame.iter_market_ticks(instrument_filter):
+            vwap_data = cls._calculate_vwap(state, tick)
+            if vwap_data:
+                updates.append(vwap_data)
+        return updates
 
     @staticmethod
     def _calculate_vwap(state: Dict[str, Dict], tick: RawTick) -> Optional[Dict]:
@@ -6,6 +6,8 @@ import { updateCandleData } from './candleData';
 const API_BASE = 'http://localhost:8000';
 
 export const candleStore = writable<any>(null);
+// Latest forming candle (candle_partial event)
+export const partialCandleStore = writable<any>(null);
 // Reactive connection status
 export const isCandleConnected = writable(false);
 
@@ -44,6 +46,19 @@ export function connectCandleStream(instruments?: string[]) {
         }
     });
 
+    // Forming candle (server-side, throttled) - replaces the instrument's current bar
+    eventSource.addEventListener('candle_partial', (event: MessageEvent) => {
+        try {
+            const data = JSON.parse(event.data);
+            partialCandleStore.set(data);
+            if (data && data.instrument_key) {
+                updateCandleData(data);
+            }
+        } catch {
+            // Skip invalid JSON
+        }
+    });
+
     eventSource.onerror = () => {
         isCandleConnected.set(false);
     };
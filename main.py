@@ -1,5 +1,112 @@
+"""
+Antony HFT - Command Line Entry Point
+=====================================
+
+    python main.py record --instruments "NSE_INDEX|Nifty 50,NSE_FO|61755" --mode full
+    python main.py replay 2025-12-05 --speed 10
+    python main.py replay data/recordings/feed-2025-12-05.rec.gz --speed 0
+    python main.py mock-feed --rate 100 --batch 200 --instruments 2000 --depth 30
+
+record - live Upstox feed-ஐ connect பண்ணி raw frames-ஐ FEED_RECORD_DIR-க்கு
+         capture பண்ணும் (Ctrl+C வரை)
+replay - recording-ஐ market_feed-க்கு push பண்ணும்; API server run ஆகும்போது
+         /stream/* consumers live மாதிரியே data பெறுவார்கள்
+mock-feed - local Upstox V3 feed stand-in (load testing, scripts/load_sse.py)
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+
+
+async def run_record(instruments: list[str], mode: str):
+    from app.db.postgres import PostgresClient
+    from app.db.redis import RedisClient
+    from app.services.feed_recorder import FeedRecorder
+    from app.services.feed_service import FeedService
+
+    await PostgresClient.create_pool()
+    try:
+        await FeedService.connect()
+        FeedRecorder.start()
+        # Sockets connect in the background - wait before subscribing
+        while not FeedService.is_connected():
+            await asyncio.sleep(0.2)
+        if instruments:
+            await FeedService.subscribe(instruments, mode)
+        while True:
+            await asyncio.sleep(5)
+            logging.info(f"Recorder: {FeedRecorder.get_stats()}")
+    finally:
+        await FeedService.disconnect()
+        await RedisClient.close_pool()
+        await PostgresClient.close_pool()
+
+
+async def run_replay(path: str, speed: float):
+    from app.db.redis import RedisClient
+    from app.services.feed_recorder import FeedReplayer
+
+    try:
+        stats = await FeedReplayer.replay(path, speed)
+        logging.info(f"Replay stats: {stats}")
+    finally:
+        await RedisClient.close_pool()
+
+
+def run_mock_feed(args):
+    import uvicorn
+    from app.mock import upstox_feed
+
+    upstox_feed.config.rate = args.rate
+    upstox_feed.config.batch = args.batch
+    upstox_feed.config.instruments = args.instruments
+    upstox_feed.config.depth = args.depth
+    upstox_feed.config.seed = args.seed
+    uvicorn.run(upstox_feed.app, host=args.host, port=args.port, log_level="warning")
+
+
 def main():
-    print("Hello from antony-project!")
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Antony HFT command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Record the live feed to FEED_RECORD_DIR")
+    record.add_argument("--instruments", default="", help="Comma-separated instrument keys")
+    record.add_argument("--mode", default="full", choices=["full", "full_d30", "ltpc"])
+
+    replay = commands.add_parser("replay", help="Replay a recording into market_feed")
+    replay.add_argument("file", help="Recording path, file name or day (YYYY-MM-DD)")
+    replay.add_argument("--speed", type=float, default=1.0, help="1 = real-time, N = N× faster, 0 = max")
+
+    mock = commands.add_parser("mock-feed", help="Run the local mock Upstox market data feed")
+    mock.add_argument("--host", default="127.0.0.1")
+    mock.add_argument("--port", type=int, default=9000)
+    mock.add_argument("--rate", type=float, default=10.0, help="Frames/sec per socket (0 = unthrottled)")
+    mock.add_argument("--batch", type=int, default=100, help="Instruments per frame")
+    mock.add_argument("--instruments", type=int, default=500, help="Mock instrument universe size")
+    mock.add_argument("--depth", type=int, default=0, help="Depth levels (0 = mode default)")
+    mock.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "record":
+            instruments = [key for key in args.instruments.split(",") if key]
+            asyncio.run(run_record(instruments, args.mode))
+        elif args.command == "replay":
+            from app.services.feed_recorder import resolve_recording
+            path = args.file if os.path.exists(args.file) else resolve_recording(args.file)
+            asyncio.run(run_replay(path, args.speed))
+        elif args.command == "mock-feed":
+            run_mock_feed(args)
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+"""
+Codec Benchmark
+===============
+
+app/services/codec.py backends on our real payloads:
+
+    tick    → full_d30 feed dict (MessageToDict shape, /stream/live fragment)
+    candle  → Candle1M built by build_candle from synthetic ticks
+              (dumps_model - SSE / JSONB / ws payload)
+    frame   → full FeedResponse dict (legacy JSON stream entry) - encode + decode
+
+Installed backends மட்டும் run ஆகும் (json எப்போதும்; orjson / msgpack optional).
+Encode-once cache-ன் பலனையும் காட்டும்: N clients-க்கு ஒரு முறை encode vs N முறை.
+
+Usage:
+    uv run python scripts/bench_codecs.py [iterations] [clients]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.getcwd())
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from google.protobuf.json_format import MessageToDict
+
+from app.proto import MarketDataFeedV3_pb2 as pb
+from app.services import codec
+from app.services.candle_aggregator import build_candle
+from app.services.feed_decoder import tick_from_market_ff
+from bench_tick_decode import build_frame
+
+
+def build_payloads():
+    response = pb.FeedResponse()
+    response.ParseFromString(build_frame(50))
+    frame_dict = MessageToDict(response)
+    key = next(iter(response.feeds))
+    tick_dict = frame_dict["feeds"][key]
+
+    # One minute of ticks → the candle the engine would emit
+    market_ff = response.feeds[key].fullFeed.marketFF
+    base = tick_from_market_ff(key, market_ff)
+    minute_ms = base.ltt - base.ltt % 60_000
+    ticks = [
+        base.model_copy(update={"ltt": minute_ms + i * 500, "ltp": base.ltp + random.uniform(-1, 1), "vtt": base.vtt + i * 75})
+        for i in range(120)
+    ]
+    candle = build_candle(key, minute_ms, ticks)
+    return tick_dict, frame_dict, candle
+
+
+def timed(fn, iterations: int) -> float:
+    """µs per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    random.seed(42)
+    tick_dict, frame_dict, candle = build_payloads()
+    print(f"backends: {codec.available_codecs()}  (CODEC resolves to '{codec.text_codec.name}')")
+    print(f"{iterations} iterations, encode-once comparison for {clients} clients\n")
+    print(f"{'codec':<9}{'payload':<8}{'bytes':>8}{'encode µs':>11}{'decode µs':>11}")
+
+    for name in codec.available_codecs():
+        backend = codec.get_codec(name)
+        for label, obj in (("tick", tick_dict), ("frame", frame_dict)):
+            encoded = backend.dumps(obj)
+            encode_us = timed(lambda: backend.dumps(obj), iterations)
+            decode_us = timed(lambda: backend.loads(encoded), iterations)
+            print(f"{name:<9}{label:<8}{len(encoded):>8}{encode_us:>11.2f}{decode_us:>11.2f}")
+
+        encoded = backend.dumps_model(candle)
+        encode_us = timed(lambda: backend.dumps_model(candle), iterations)
+        decode_us = timed(lambda: backend.loads(encoded), iterations)
+        print(f"{name:<9}{'candle':<8}{len(encoded):>8}{encode_us:>11.2f}{decode_us:>11.2f}")
+
+    # Encode-once: every client re-encoding vs one cached encode shared by all
+    print()
+    backend = codec.text_codec
+    per_client_us = timed(lambda: [backend.dumps_model(candle) for _ in range(clients)], iterations)
+    cached_us = timed(
+        lambda: [codec.encode_model(candle, backend) for _ in range(clients)],
+        iterations
+    )
+    print(f"candle x {clients} clients ({backend.name}): per-client encode {per_client_us:.1f} µs, "
+          f"encode-once {cached_us:.1f} µs ({per_client_us / cached_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
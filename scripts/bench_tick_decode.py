@@ -0,0 +1,108 @@
+"""
+Tick Decode Benchmark
+=====================
+
+Legacy path vs fast path, per full_d30 tick:
+
+    legacy: FeedResponse → MessageToDict → json.dumps → json.loads → parse_raw_tick
+    fast:   FeedResponse → tick_from_market_ff (direct protobuf field reads)
+
+Usage:
+    uv run python scripts/bench_tick_decode.py [instruments] [frames]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from google.protobuf.json_format import MessageToDict
+
+from app.proto import MarketDataFeedV3_pb2 as pb
+from app.services.candle_aggregator import parse_raw_tick
+from app.services.feed_decoder import tick_from_market_ff
+
+
+def build_frame(instrument_count: int, depth: int = 30) -> bytes:
+    """Synthetic full_d30 FeedResponse with `instrument_count` option feeds"""
+    response = pb.FeedResponse(type=pb.live_feed, currentTs=int(time.time() * 1000))
+    for i in range(instrument_count):
+        market_ff = response.feeds[f"NSE_FO|{60000 + i}"].fullFeed.marketFF
+        ltp = round(random.uniform(10, 500), 2)
+        market_ff.ltpc.ltp = ltp
+        market_ff.ltpc.ltt = int(time.time() * 1000)
+        market_ff.ltpc.ltq = 75
+        market_ff.ltpc.cp = ltp * 1.1
+        for level in range(depth):
+            q = market_ff.marketLevel.bidAskQuote.add()
+            q.bidQ = random.randint(75, 20000)
+            q.bidP = round(ltp - 0.05 * (level + 1), 2)
+            q.askQ = random.randint(75, 20000)
+            q.askP = round(ltp + 0.05 * (level + 1), 2)
+        market_ff.optionGreeks.delta = 0.45
+        market_ff.optionGreeks.theta = -12.3
+        market_ff.optionGreeks.gamma = 0.0012
+        market_ff.optionGreeks.vega = 8.1
+        market_ff.optionGreeks.rho = 0.02
+        market_ff.atp = ltp
+        market_ff.vtt = random.randint(100_000, 10_000_000)
+        market_ff.oi = random.randint(10_000, 1_000_000)
+        market_ff.iv = 0.14
+        market_ff.tbq = random.randint(10_000, 500_000)
+        market_ff.tsq = random.randint(10_000, 500_000)
+    return response.SerializeToString()
+
+
+def bench_legacy(frames: list[bytes]) -> int:
+    ticks = 0
+    for raw in frames:
+        response = pb.FeedResponse()
+        response.ParseFromString(raw)
+        # Ingest side
+        encoded = json.dumps(MessageToDict(response))
+        # Consumer side
+        data = json.loads(encoded)
+        for key, feed in data.get("feeds", {}).items():
+            market_ff = feed.get("fullFeed", {}).get("marketFF")
+            if market_ff:
+                parse_raw_tick(key, market_ff)
+                ticks += 1
+    return ticks
+
+
+def bench_fast(frames: list[bytes]) -> int:
+    ticks = 0
+    for raw in frames:
+        response = pb.FeedResponse()
+        response.ParseFromString(raw)
+        for key, feed in response.feeds.items():
+            tick_from_market_ff(key, feed.fullFeed.marketFF)
+            ticks += 1
+    return ticks
+
+
+def run(name: str, fn, frames: list[bytes]) -> float:
+    start = time.perf_counter()
+    ticks = fn(frames)
+    elapsed = time.perf_counter() - start
+    per_tick_us = elapsed / ticks * 1e6
+    print(f"{name:<8} {ticks:>8} ticks  {elapsed * 1000:>9.1f} ms  {per_tick_us:>7.2f} µs/tick")
+    return per_tick_us
+
+
+if __name__ == "__main__":
+    instruments = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    frame_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    random.seed(42)
+    frames = [build_frame(instruments) for _ in range(frame_count)]
+    print(f"{frame_count} frames x {instruments} full_d30 instruments "
+          f"({sum(map(len, frames)) / len(frames) / 1024:.1f} KiB/frame)")
+
+    legacy_us = run("legacy", bench_legacy, frames)
+    fast_us = run("fast", bench_fast, frames)
+    print(f"speedup  {legacy_us / fast_us:.1f}x")
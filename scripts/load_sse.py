@@ -0,0 +1,154 @@
+"""
+SSE Load Test - Mock Feed → Backend → N SSE Clients
+===================================================
+
+1. (--setup) /feed/connect + subscribe the mock universe (/mock/instruments)
+2. N concurrent SSE clients on /stream/live (or candles / vwap)
+3. Every second: events/sec, tick latency p50/p99 (currentTs → client),
+   writer queue depth + drops from /feed/status
+
+Start the mock feed and the backend first:
+    uv run python main.py mock-feed --rate 100 --batch 200 --instruments 2000
+    UPSTOX_FEED_AUTHORIZE_URL=http://localhost:9000/v3/feed/market-data-feed/authorize \\
+    UPSTOX_ACCESS_TOKEN=mock uv run uvicorn app.main:app --port 8000
+
+Usage:
+    uv run python scripts/load_sse.py --setup --clients 50 --duration 60
+    uv run python scripts/load_sse.py --endpoint vwap --clients 20 --filter 10
+    uv run python scripts/load_sse.py --clients 200 --max-hz 4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+ENDPOINTS = {"live": "/stream/live", "candles": "/stream/candles", "vwap": "/stream/vwap"}
+
+
+class Stats:
+    def __init__(self):
+        self.events = 0
+        self.bytes = 0
+        self.errors = 0
+        self.latencies_ms: list[float] = []
+        self.connected = 0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def setup_feed(client: httpx.AsyncClient, api: str, mock: str, mode: str) -> list[str]:
+    keys = (await client.get(f"{mock}/mock/instruments")).json()["instrument_keys"]
+    (await client.post(f"{api}/feed/connect")).raise_for_status()
+    for _ in range(50):
+        status = (await client.get(f"{api}/feed/status")).json()
+        if status.get("connected"):
+            break
+        await asyncio.sleep(0.2)
+    # Subscribe in chunks - one huge sub message is not what the broker accepts either
+    for i in range(0, len(keys), 500):
+        response = await client.post(
+            f"{api}/feed/subscribe",
+            json={"instrument_keys": keys[i:i + 500], "mode": mode}
+        )
+        response.raise_for_status()
+    print(f"Subscribed {len(keys)} mock instruments ({mode})")
+    return keys
+
+
+async def sse_client(url: str, stats: Stats, stop: asyncio.Event):
+    try:
+        async with httpx.AsyncClient(timeout=None) as client:
+            async with client.stream("GET", url) as response:
+                stats.connected += 1
+                async for line in response.aiter_lines():
+                    if stop.is_set():
+                        break
+                    if not line.startswith("data: "):
+                        continue
+                    stats.events += 1
+                    stats.bytes += len(line)
+                    payload = json.loads(line[6:])
+                    current_ts = payload.get("currentTs")
+                    if current_ts:
+                        stats.latencies_ms.append(time.time() * 1000 - int(current_ts))
+    except Exception:
+        stats.errors += 1
+    finally:
+        stats.connected -= 1
+
+
+async def report(client: httpx.AsyncClient, api: str, stats: Stats, stop: asyncio.Event):
+    last_events = 0
+    while not stop.is_set():
+        await asyncio.sleep(1)
+        latencies, stats.latencies_ms = stats.latencies_ms, []
+        writer = {}
+        try:
+            writer = (await client.get(f"{api}/feed/status")).json().get("writer", {})
+        except Exception:
+            pass
+        print(
+            f"clients={stats.connected:4d} events/s={stats.events - last_events:7d} "
+            f"p50={percentile(latencies, 50):7.1f}ms p99={percentile(latencies, 99):7.1f}ms "
+            f"queue={writer.get('queue_depth', '-')} dropped={writer.get('dropped', '-')} "
+            f"flush_ms={writer.get('avg_flush_ms', '-')} errors={stats.errors}"
+        )
+        last_events = stats.events
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="SSE pipeline load test against the mock feed")
+    parser.add_argument("--api", default="http://localhost:8000/api/v1")
+    parser.add_argument("--mock", default="http://localhost:9000")
+    parser.add_argument("--endpoint", default="live", choices=list(ENDPOINTS))
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=int, default=30, help="Seconds")
+    parser.add_argument("--filter", type=int, default=0, help="Instruments per client filter (0 = all)")
+    parser.add_argument("--setup", action="store_true", help="Connect the feed + subscribe the mock universe")
+    parser.add_argument("--mode", default="full", choices=["full", "full_d30", "ltpc"])
+    parser.add_argument("--max-hz", type=float, default=0, help="/stream/live conflation rate (0 = every tick)")
+    args = parser.parse_args()
+
+    stats = Stats()
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        keys: list[str] = []
+        if args.setup:
+            keys = await setup_feed(client, args.api, args.mock, args.mode)
+        elif args.filter:
+            keys = (await client.get(f"{args.mock}/mock/instruments")).json()["instrument_keys"]
+
+        tasks = []
+        for i in range(args.clients):
+            url = f"{args.api}{ENDPOINTS[args.endpoint]}"
+            params = []
+            if args.filter and keys:
+                start = (i * args.filter) % len(keys)
+                params.append("instruments=" + ",".join(keys[start:start + args.filter]))
+            if args.max_hz and args.endpoint == "live":
+                params.append(f"max_hz={args.max_hz}")
+            if params:
+                url += "?" + "&".join(params)
+            tasks.append(asyncio.create_task(sse_client(url, stats, stop)))
+
+        reporter = asyncio.create_task(report(client, args.api, stats, stop))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, reporter, return_exceptions=True)
+
+    print(f"Total events: {stats.events}, bytes: {stats.bytes}, client errors: {stats.errors}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+/stream/ws Client - Binary Format Example & Payload Size Check
+==============================================================
+
+Python strategy clients-க்கு reference: /stream/ws-ல் msgpack / protobuf
+frames decode பண்ணி, ஒவ்வொரு second-ம் messages + bytes print பண்ணும்.
+ஒரே subscription-ஐ format மாற்றி run பண்ணி payload size compare பண்ணலாம்.
+
+Usage:
+    uv run python scripts/stream_ws_client.py --format protobuf --instruments NSE_FO|61755
+    uv run python scripts/stream_ws_client.py --format msgpack --channels tick,candle,vwap
+    uv run python scripts/stream_ws_client.py --format json --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import websockets
+
+sys.path.append(os.getcwd())
+
+
+def make_decoder(fmt: str):
+    """Binary frame → (channel, data)"""
+    if fmt == "msgpack":
+        import msgpack
+
+        def decode(message):
+            envelope = msgpack.unpackb(message)
+            return envelope["ch"], envelope["data"]
+        return decode
+
+    if fmt == "protobuf":
+        from app.proto import AntonyStreamV1_pb2 as Stream_pb2
+        from app.proto import MarketDataFeedV3_pb2 as MarketDataFeed_pb2
+
+        def decode(message):
+            envelope = Stream_pb2.StreamMessage()
+            envelope.ParseFromString(message)
+            kind = envelope.WhichOneof("payload")
+            if kind == "feed":
+                feed = MarketDataFeed_pb2.FeedResponse()
+                feed.ParseFromString(envelope.feed)
+                return "tick", feed
+            if kind == "control":
+                control = json.loads(envelope.control)
+                return control["ch"], control["data"]
+            if kind == "order":
+                return "order", json.loads(envelope.order)
+            return kind, getattr(envelope, kind)
+        return decode
+
+    def decode(message):
+        envelope = json.loads(message)
+        return envelope["ch"], envelope["data"]
+    return decode
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Binary /stream/ws client")
+    parser.add_argument("--url", default="ws://localhost:8000/api/v1/stream/ws")
+    parser.add_argument("--format", default="protobuf", choices=["json", "msgpack", "protobuf"])
+    parser.add_argument("--channels", default="tick", help="Comma-separated: tick,candle,vwap,order")
+    parser.add_argument("--instruments", default="", help="Comma-separated keys (empty = all)")
+    parser.add_argument("--duration", type=int, default=10, help="Seconds")
+    args = parser.parse_args()
+
+    decode = make_decoder(args.format)
+    counts: dict[str, int] = {}
+    total_bytes = 0
+    window_bytes = 0
+
+    async with websockets.connect(args.url, subprotocols=[args.format], max_size=None) as ws:
+        await ws.send(json.dumps({
+            "op": "subscribe",
+            "channels": args.channels.split(","),
+            "instruments": [k for k in args.instruments.split(",") if k],
+        }))
+
+        started = time.monotonic()
+        next_report = started + 1
+        while time.monotonic() - started < args.duration:
+            try:
+                message = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+
+            total_bytes += len(message)
+            window_bytes += len(message)
+            channel, _ = decode(message)
+            counts[channel] = counts.get(channel, 0) + 1
+
+            if time.monotonic() >= next_report:
+                print(f"{args.format}: {window_bytes / 1024:8.1f} KiB/s  {counts}")
+                window_bytes = 0
+                next_report += 1
+
+    messages = sum(counts.values())
+    print(f"Total: {messages} messages, {total_bytes} bytes, "
+          f"{total_bytes / messages if messages else 0:.0f} bytes/message")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())